@@ -0,0 +1,3 @@
+"""Performance benchmarks. These are not part of the test suite. Run the whole suite
+with ``poetry run python -m benchmarks``, or a single comparison script directly, e.g.
+``poetry run python -m benchmarks.broadphase``."""
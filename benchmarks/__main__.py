@@ -0,0 +1,50 @@
+"""Run the benchmark suite, optionally comparing against a stored baseline.
+
+Usage: ``poetry run python -m benchmarks [--output FILE] [--compare FILE]``
+"""
+import argparse
+import sys
+
+from benchmarks.suite import BENCHMARKS, load, regressions, run, save
+
+
+def main() -> int:
+    """Run the suite and print the results.
+
+    :return: Exit status: 1 if a regression against the baseline was found.
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "names", nargs="*", help=f"benchmarks to run: {', '.join(BENCHMARKS)}"
+    )
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="fraction a result may be worse than the baseline (default: 0.1)",
+    )
+    args = parser.parse_args()
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+
+    results = run(args.names or list(BENCHMARKS))
+    for name, result in results.items():
+        print(f"{name:>20}: {result.value:.6g} {result.unit}")
+
+    if args.output:
+        save(results, args.output)
+
+    if args.compare:
+        flagged = regressions(results, load(args.compare), args.threshold)
+        for regression in flagged:
+            print(f"REGRESSION {regression}")
+        if flagged:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
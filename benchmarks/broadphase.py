@@ -0,0 +1,53 @@
+"""Compare the spatial hash broadphase against testing every pair of objects, for a
+growing number of balls in a play area bounded by two walls."""
+import random
+import timeit
+from functools import partial
+from itertools import combinations
+from typing import List
+
+from pong.broadphase import SpatialHash
+from pong.game_objects import Ball, GameObject, Wall
+
+WIDTH = 1024
+HEIGHT = 768
+
+
+def make_objects(count: int) -> List[GameObject]:
+    """Two walls, and a number of balls scattered over the play area."""
+    rng = random.Random(count)
+    objects: List[GameObject] = [Wall(0, 0, WIDTH, 19), Wall(0, HEIGHT - 19, WIDTH, 19)]
+    objects += [
+        Ball(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT), 30, 30)
+        for _ in range(count)
+    ]
+    return objects
+
+
+def all_pairs(objects: List[GameObject]) -> int:
+    """Collision count, testing every pair."""
+    return sum(obj1.collision(obj2) for obj1, obj2 in combinations(objects, 2))
+
+
+def spatial_hash(broadphase: SpatialHash, objects: List[GameObject]) -> int:
+    """Collision count, testing candidate pairs from the broadphase only."""
+    return sum(obj1.collision(obj2) for obj1, obj2 in broadphase.pairs(objects))
+
+
+def main() -> None:
+    """Print the time per tick of both approaches, for each object count."""
+    print(f"{'objects':>8} {'all pairs (ms)':>15} {'spatial hash (ms)':>18}")
+    for count in (5, 10, 50, 100, 250, 500, 1000):
+        objects = make_objects(count)
+        broadphase = SpatialHash(brute_force_limit=0)
+        number = max(1, 2000 // count)
+        brute = timeit.timeit(partial(all_pairs, objects), number=number) / number
+        hashed = (
+            timeit.timeit(partial(spatial_hash, broadphase, objects), number=number)
+            / number
+        )
+        print(f"{count:>8} {brute * 1000:>15.3f} {hashed * 1000:>18.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""The benchmark suite. Each benchmark measures one number, and knows whether a higher
+or a lower number is better, so that results can be compared against a stored baseline.
+
+Benchmarks that need a window use a hidden one, but still need a display (or
+``PYGLET_HEADLESS=true`` on machines with EGL).
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+import timeit
+from typing import Callable, Dict, List, NamedTuple
+
+import numpy as np
+
+from pong.ai import ComputerController
+from pong.controller import Controller
+from pong.env import VectorEnv
+from pong.game_objects import Ball, Paddle
+from pong.netplay import RollbackSession, SimulatedNetwork, UdpTransport
+from pong.raster import Rasterizer
+from pong.simulation import Match
+from pong.telemetry import Telemetry
+
+
+class Result(NamedTuple):
+    """The outcome of a single benchmark."""
+
+    value: float
+    unit: str
+    higher_is_better: bool
+
+
+Results = Dict[str, Result]
+
+# Starts the game the way pong.main does, and prints the time the first frame was drawn
+STARTUP_SCRIPT = """
+import time
+from pyglet.window import Window
+from pong.game import Pong
+from pong.screens import TitleScreen
+pong = Pong(Window(width=1024, height=768, visible=False))
+pong.load()
+pong.show(TitleScreen)
+pong.on_draw()
+pong.window.flip()
+print(time.perf_counter())
+"""
+
+
+def game_screen_ticks() -> Result:
+    """Ticks per second of GameScreen.update, with both players holding a direction."""
+    # pylint: disable=import-outside-toplevel
+    from pyglet.window import Window
+
+    from pong.game import Pong
+    from pong.game_screen import GameScreen
+
+    pong = Pong(Window(width=1024, height=768, visible=False))
+    pong.load()
+    pong.controllers[0].player_up = True
+    pong.controllers[1].player_down = True
+    screen = pong.get_screen(GameScreen)
+    number = 20000
+    elapsed = min(timeit.repeat(lambda: screen.update(0.01), number=number, repeat=5))
+    pong.window.close()
+    return Result(number / elapsed, "ticks/s", True)
+
+
+def collision_pairs() -> Result:
+    """Pairs per second tested by GameObject.collision, half of them colliding."""
+    ball = Ball(0, 0, 30, 30)
+    near = Paddle(20, 20, 25, 115, Controller(0, 1))
+    far = Paddle(500, 500, 25, 115, Controller(0, 1))
+    number = 200000
+
+    def test_pairs() -> None:
+        ball.collision(near)
+        ball.collision(far)
+
+    elapsed = min(timeit.repeat(test_pairs, number=number, repeat=5))
+    return Result(2 * number / elapsed, "pairs/s", True)
+
+
+def computer_polls() -> Result:
+    """Polls per second of a ComputerController, over a match between two of them,
+    including the polls that predict the ball again after a bounce."""
+    number = 20000
+    timings = []
+    for _ in range(5):
+        computer = ComputerController()
+        match = Match(1024, 768, [ComputerController(), computer])
+        elapsed = 0.0
+        for _ in range(number):
+            start = time.perf_counter()
+            computer.poll(match)
+            elapsed += time.perf_counter() - start
+            match.update()
+        timings.append(elapsed)
+    return Result(number / min(timings), "polls/s", True)
+
+
+def env_steps() -> Result:
+    """Environment steps per second of a VectorEnv, with one worker per CPU."""
+    count = 256
+    number = 100
+    with VectorEnv(count) as environments:
+        environments.reset()
+        actions = np.arange(count) % 3
+        elapsed = min(
+            timeit.repeat(lambda: environments.step(actions), number=number, repeat=3)
+        )
+    return Result(count * number / elapsed, "steps/s", True)
+
+
+def rasterize() -> Result:
+    """Frames per second of a Rasterizer drawing a match at full size, in color."""
+    match = Match(1024, 768, [ComputerController(), ComputerController()])
+    rasterizer = Rasterizer(1024, 768)
+    number = 1000
+
+    def frame() -> None:
+        match.update()
+        rasterizer.render(match)
+
+    elapsed = min(timeit.repeat(frame, number=number, repeat=5))
+    return Result(number / elapsed, "frames/s", True)
+
+
+def rollback() -> Result:
+    """Milliseconds taken to roll a networked match back as far as it may go, and
+    simulate it again up to the present. Must stay well under a frame."""
+    controllers = [Controller(0, 1, player_up=True), Controller(2, 3, player_down=True)]
+    transport = UdpTransport(("127.0.0.1", 0), ("127.0.0.1", 0))
+    session = RollbackSession(
+        Match(1024, 768, controllers), 0, SimulatedNetwork(transport, loss=1)
+    )
+    while not session.stalled:
+        session.advance()
+    number = 1000
+    elapsed = min(timeit.repeat(lambda: session.rollback(0), number=number, repeat=5))
+    transport.close()
+    return Result(elapsed / number * 1000, "ms", False)
+
+
+def asset_load() -> Result:
+    """Seconds taken by AssetManager.load."""
+    # pylint: disable=import-outside-toplevel
+    from pyglet.window import Window
+
+    from pong.assets import AssetManager
+
+    window = Window(width=1024, height=768, visible=False)
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        AssetManager().load(1024, 768)
+        timings.append(time.perf_counter() - start)
+    window.close()
+    return Result(min(timings), "s", False)
+
+
+def startup() -> Result:
+    """Seconds from launching a fresh process, so that nothing is already imported, to
+    the first title screen frame. perf_counter is system-wide on Linux, so it can be
+    compared across processes."""
+    timings = []
+    for _ in range(3):
+        launched = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", STARTUP_SCRIPT],
+            check=True,
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+        ).stdout
+        timings.append(float(output.split()[-1]) - launched)
+    return Result(min(timings), "s", False)
+
+
+def telemetry_emits() -> Result:
+    """Events per second that Telemetry.emit takes from the game loop. Events are
+    written to /dev/null, and whatever the writer cannot keep up with is dropped, so
+    only the cost to the caller is measured."""
+    telemetry = Telemetry(os.devnull)
+    number = 10000
+
+    def emit() -> None:
+        telemetry.emit("hit", tick=0, side="left", speed=6, direction=0.0)
+
+    elapsed = min(timeit.repeat(emit, number=number, repeat=5))
+    telemetry.close()
+    return Result(number / elapsed, "events/s", True)
+
+
+BENCHMARKS: Dict[str, Callable[[], Result]] = {
+    "game_screen_ticks": game_screen_ticks,
+    "collision_pairs": collision_pairs,
+    "computer_polls": computer_polls,
+    "env_steps": env_steps,
+    "rasterize": rasterize,
+    "rollback": rollback,
+    "asset_load": asset_load,
+    "startup": startup,
+    "telemetry_emits": telemetry_emits,
+}
+
+
+def run(names: List[str]) -> Results:
+    """Run some of the benchmarks.
+
+    :param names: Names of the benchmarks to run.
+    :return: Result of each benchmark, by name.
+    """
+    return {name: BENCHMARKS[name]() for name in names}
+
+
+def save(results: Results, path: str) -> None:
+    """Write results to a JSON file."""
+    with open(path, "w") as output:
+        json.dump({name: result._asdict() for name, result in results.items()}, output)
+
+
+def load(path: str) -> Results:
+    """Read results from a JSON file written by save."""
+    with open(path) as baseline:
+        return {name: Result(**result) for name, result in json.load(baseline).items()}
+
+
+def regressions(results: Results, baseline: Results, threshold: float) -> List[str]:
+    """Find benchmarks that got worse than a baseline by more than some fraction.
+
+    :param results: Results of the current run.
+    :param baseline: Results to compare against.
+    :param threshold: Fraction by which a result may be worse before it is flagged.
+    :return: Description of each regression.
+    """
+    flagged = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name].value
+        change = (result.value - before) / before
+        if not result.higher_is_better:
+            change = -change
+        if change < -threshold:
+            flagged.append(
+                f"{name}: {before:.6g} -> {result.value:.6g} {result.unit} "
+                f"({abs(change):.1%} worse)"
+            )
+    return flagged
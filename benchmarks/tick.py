@@ -0,0 +1,26 @@
+"""Time a single Match tick, with both players holding a direction, in both collision
+modes."""
+import timeit
+
+from pong.controller import Controller
+from pong.simulation import Match
+
+
+def make_match(continuous: bool) -> Match:
+    """A match in which the left player holds up and the right player holds down."""
+    controllers = [Controller(0, 1, player_up=True), Controller(2, 3, player_down=True)]
+    return Match(1024, 768, controllers, continuous=continuous)
+
+
+def main() -> None:
+    """Print the best time per tick in microseconds."""
+    for continuous in (False, True):
+        match = make_match(continuous)
+        number = 20000
+        elapsed = min(timeit.repeat(match.update, number=number, repeat=5))
+        mode = "continuous" if continuous else "discrete"
+        print(f"{mode:>10}: {elapsed / number * 1e6:.2f} us/tick")
+
+
+if __name__ == "__main__":
+    main()
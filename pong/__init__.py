@@ -1 +1,5 @@
 """Top-level module"""
+from time import perf_counter
+
+# When the interpreter was done starting up, and began importing the game
+STARTED = perf_counter()
@@ -0,0 +1,156 @@
+"""Computer players.
+
+Rather than simulating the match forward to find out where the ball will be, the
+ComputerController works it out in closed form. Between bounces off a paddle, the ball
+travels in a straight line, reflected off the top and bottom walls. Unfolding those
+reflections gives a single straight line, so the height at which the ball crosses the
+paddle is found by walking along that line to the paddle, and folding the result back
+into the space between the walls.
+
+The ball only changes direction or speed when it bounces, so the prediction is cached,
+and only worked out again when one of them has changed. Most ticks cost a comparison
+and a subtraction, so thousands of computer players can be run at once.
+"""
+import math
+import random
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from pong.controller import Controller
+from pong.game_objects import Ball, Paddle, Wall
+
+if TYPE_CHECKING:
+    from pong.simulation import Match  # pragma: no cover
+
+
+def fold(position: float, low: float, high: float) -> float:
+    """Fold a position that has travelled in a straight line, ignoring the walls, back
+    into the space between them, as if it had bounced off them.
+
+    :param position: Position, ignoring the walls.
+    :param low: Lowest position between the walls.
+    :param high: Highest position between the walls.
+    :return: Position between the walls.
+    """
+    span = high - low
+    if span <= 0:
+        return low
+    offset = (position - low) % (2 * span)
+    return low + (offset if offset <= span else 2 * span - offset)
+
+
+def intercept(ball: Ball, plane: float, low: float, high: float) -> Optional[float]:
+    """Where the bottom of the ball will be when its left edge reaches a vertical
+    plane, assuming it only bounces off the walls on the way.
+
+    :param ball: The ball.
+    :param plane: Horizontal position of the plane.
+    :param low: Lowest position of the bottom of the ball, resting on the bottom wall.
+    :param high: Highest position of the bottom of the ball, under the top wall.
+    :return: The height, or None if the ball is not moving towards the plane.
+    """
+    delta_x = math.cos(ball.direction)
+    distance = plane - ball.x
+    if abs(delta_x) < 1e-9 or distance * delta_x < 0:
+        return None
+    return fold(ball.y + distance / delta_x * math.sin(ball.direction), low, high)
+
+
+@dataclass
+class ComputerController(Controller):
+    """A controller that plays by itself.
+
+    Each time the ball bounces, the controller waits reaction_ticks before it starts
+    moving to where the ball will arrive, and misjudges that by up to error pixels.
+    While the ball is moving away, it heads back to the middle.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    player_up_key: int = 0
+    player_down_key: int = 0
+    reaction_ticks: int = 0
+    error: float = 0.0
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        self.rng = random.Random(self.seed)
+        # What is known about the match being played
+        self.match: Optional["Match"] = None
+        self.paddle: Optional[Paddle] = None
+        self.plane = 0.0
+        self.low = 0.0
+        self.high = 0.0
+        # The current prediction, and what it was made from
+        self.trajectory: Tuple[float, ...] = ()
+        self.target = 0.0
+        self.wait = 0
+        self.predictions = 0
+
+    def poll(self, match: "Match") -> None:
+        """Decide which way to move the paddle, predicting the ball again if it has
+        bounced, or been served again, since the last tick.
+
+        :param match: The match being played.
+        """
+        paddle = self.paddle
+        if match is not self.match or paddle is None:
+            paddle = self.learn(match)
+
+        ball = match.ball
+        trajectory = ball.direction, ball.speed, match.left_score, match.right_score
+        if trajectory != self.trajectory:
+            self.trajectory = trajectory
+            self.predict(match, paddle)
+            self.wait = self.reaction_ticks
+
+        if self.wait:
+            self.wait -= 1
+            return
+
+        # Stop within a step of the target, so that the paddle does not jitter
+        offset = self.target - paddle.y
+        self.player_up = offset > paddle.speed
+        self.player_down = offset < -paddle.speed
+
+    def learn(self, match: "Match") -> Paddle:
+        """Find the paddle this controller moves, and the walls the ball bounces off.
+
+        :param match: The match being played.
+        :return: The paddle.
+        """
+        paddle = next(
+            obj
+            for obj in match.game_objects
+            if isinstance(obj, Paddle) and obj.controller is self
+        )
+        walls = [obj for obj in match.game_objects if isinstance(obj, Wall)]
+        middle = match.height / 2
+        ball = match.ball
+        self.low = max(wall.y + wall.height for wall in walls if wall.y < middle)
+        self.high = min(wall.y for wall in walls if wall.y > middle) - ball.height
+        if paddle.x > match.width / 2:
+            self.plane = paddle.x - ball.width
+        else:
+            self.plane = paddle.x + paddle.width
+        self.match = match
+        self.paddle = paddle
+        self.trajectory = ()
+        return paddle
+
+    def predict(self, match: "Match", paddle: Paddle) -> None:
+        """Work out where the paddle should go to meet the ball.
+
+        :param match: The match being played.
+        :param paddle: The paddle this controller moves.
+        """
+        self.predictions += 1
+        ball = match.ball
+        height = intercept(ball, self.plane, self.low, self.high)
+        if height is None:
+            # Wait in the middle for the ball to come back
+            height = match.height / 2 - ball.height / 2
+        elif self.error:
+            height += self.rng.uniform(-self.error, self.error)
+        # Center the paddle on the ball
+        self.target = height + ball.height / 2 - paddle.height / 2
@@ -1,10 +1,19 @@
 """This module contains the main AssetManager object, along with the data structures
 and helpers required to serve assets like textures and music to the game."""
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from enum import Enum, auto
-from typing import Dict
+from typing import Dict, Optional, Tuple
 
-from pyglet.image import Texture, load
-from pyglet.window import Window
+from pyglet.image import AbstractImage, Texture, TextureRegion, load
+from pyglet.image.atlas import TextureAtlas  # pylint: disable=E0611
+
+from pong.simulation import paddle_size, wall_size
+
+ATLAS_SIZE = 512
+UPLOADS_PER_FRAME = 2
+# Number of scales whose assets are kept, besides the logical size
+VARIANT_CACHE_SIZE = 4
 
 
 class AssetTag(Enum):
@@ -15,38 +24,154 @@ class AssetTag(Enum):
     WALL = auto()
 
 
+# Several assets may be drawn from the same source image
+ASSET_SOURCES: Dict[AssetTag, str] = {
+    AssetTag.BALL: "assets/ball.png",
+    AssetTag.BAR: "assets/bar.png",
+    AssetTag.WALL: "assets/bar.png",
+}
+
+
 class AssetManager:
     """The AssetManager serves as a container for all the application's assets. A single
     instance of the class should be constructed when the game is loaded, and then
     persist for the lifetime of the application. Each asset is loaded only once (at
     startup), and then can be accessed directly.
+
+    Every source image is decoded once, and packed into a single texture atlas. Assets
+    are regions of that atlas, so everything drawn from them shares one texture.
+
+    Assets can also be loaded in the background: files are read and decoded on worker
+    threads, while uploading them to the atlas (which needs the GL context) is done a
+    few images at a time from the main thread, by calling pump once per frame. The
+    workers only start at the first call to pump, as they hold up the main thread while
+    they decode, so that the game can draw its first frame before then.
+
+    Assets are sized for the logical play area. Variants of them scaled for drawing at
+    another size are made from the same atlas regions, so nothing is loaded or decoded
+    again. The variants of the few most recently used scales are kept.
     """
 
+    # pylint: disable=too-many-instance-attributes
+
     def __init__(self) -> None:
+        self.atlas = TextureAtlas(ATLAS_SIZE, ATLAS_SIZE)
         self.textures: Dict[AssetTag, Texture] = {}
+        self.sizes: Dict[AssetTag, Tuple[int, int]] = {}
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.started = False
+        # Future is only subscriptable from Python 3.9, but annotations of attributes
+        # are never evaluated
+        # pylint: disable=unsubscriptable-object
+        self.decoding: Dict[str, Future[AbstractImage]] = {}
+        self.regions: Dict[str, TextureRegion] = {}
+        self.variants: "OrderedDict[float, Dict[AssetTag, Texture]]" = OrderedDict()
+
+    @property
+    def progress(self) -> float:
+        """Fraction of the source images that have been loaded, from 0 to 1."""
+        return len(self.regions) / len(set(ASSET_SOURCES.values()))
+
+    @property
+    def ready(self) -> bool:
+        """Whether every asset is loaded, and can be retrieved."""
+        return len(self.textures) == len(ASSET_SOURCES)
 
-    def load(self, window: Window) -> None:
-        """Performs the actual loading of the assets into memory. Should be called
-        exactly once, when the application starts."
+    def load(self, width: int, height: int) -> None:
+        """Performs the actual loading of the assets into memory, and waits for it to
+        complete. Should be called exactly once, when the application starts."
 
-        :param window: Game window.
+        :param width: Width of the logical play area.
+        :param height: Height of the logical play area.
         """
-        self.textures[AssetTag.BALL] = load("assets/ball.png").get_texture()
+        self.load_async(width, height)
+        self.finish()
 
-        bar_img = load("assets/bar.png")
-        bar_img.width = int(0.025 * window.width)
-        bar_img.height = int(0.15 * window.height)
-        self.textures[AssetTag.BAR] = bar_img.get_texture()
+    def load_async(self, width: int, height: int) -> None:
+        """Load the assets in the background, and return immediately. Should be called
+        exactly once, when the application starts. pump must then be called regularly
+        from the main thread, until the manager is ready.
 
-        wall_img = load("assets/bar.png")
-        wall_img.width = window.width
-        wall_img.height = int(0.025 * window.height)
-        self.textures[AssetTag.WALL] = wall_img.get_texture()
+        :param width: Width of the logical play area.
+        :param height: Height of the logical play area.
+        """
+        self.sizes = {
+            AssetTag.BAR: paddle_size(width, height),
+            AssetTag.WALL: wall_size(width, height),
+        }
+
+    def pump(self, max_uploads: int = UPLOADS_PER_FRAME, block: bool = False) -> None:
+        """Upload images that have finished decoding to the atlas, starting the workers
+        that decode them if this is the first call. Must be called from the main thread.
+
+        :param max_uploads: Most images to upload in this call.
+        :param block: Wait for images that are still being decoded.
+        """
+        if not self.started:
+            self.started = True
+            self.executor = ThreadPoolExecutor(thread_name_prefix="asset-loader")
+            self.decoding = {
+                path: self.executor.submit(load, path)
+                for path in sorted(set(ASSET_SOURCES.values()))
+            }
+
+        for path, future in list(self.decoding.items()):
+            if max_uploads <= 0:
+                break
+            if block or future.done():
+                self.regions[path] = self.atlas.add(future.result())
+                del self.decoding[path]
+                max_uploads -= 1
 
-    def get_asset(self, tag: AssetTag) -> Texture:
+        for tag, path in ASSET_SOURCES.items():
+            if tag not in self.textures and path in self.regions:
+                self.textures[tag] = self._region(tag, self.regions[path])
+
+        if self.executor and not self.decoding:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    def finish(self) -> None:
+        """Wait for all assets to load. Does nothing if they already have."""
+        self.pump(len(ASSET_SOURCES), block=True)
+
+    def _region(
+        self, tag: AssetTag, source: TextureRegion, scale: float = 1.0
+    ) -> TextureRegion:
+        """The region of the atlas an asset is drawn from."""
+        if tag not in self.sizes:
+            region = source.get_region(0, 0, source.width, source.height)
+            width, height = source.width, source.height
+        else:
+            # Stretch the region to fit, rather than resizing the image. Its edge
+            # texels are left out, so that filtering never samples the neighbouring
+            # images in the atlas.
+            region = source.get_region(1, 1, source.width - 2, source.height - 2)
+            width, height = self.sizes[tag]
+        region.width = max(1, round(width * scale))
+        region.height = max(1, round(height * scale))
+        return region
+
+    def get_asset(self, tag: AssetTag, scale: float = 1.0) -> Texture:
         """Retrieve an asset from the manager.
 
         :param tag: Name of the asset to retrieve.
+        :param scale: Size to draw the asset at, relative to the logical play area.
         :return: The asset.
         """
-        return self.textures[tag]
+        if scale == 1.0:
+            return self.textures[tag]
+
+        variants = self.variants
+        variant = variants.get(scale)
+        if variant is None:
+            variant = {
+                tag: self._region(tag, self.regions[path], scale)
+                for tag, path in ASSET_SOURCES.items()
+            }
+            variants[scale] = variant
+            if len(variants) > VARIANT_CACHE_SIZE:
+                variants.popitem(last=False)
+        else:
+            variants.move_to_end(scale)
+        return variant[tag]
@@ -0,0 +1,130 @@
+"""Broadphase collision detection.
+
+Testing every pair of objects for collision grows quadratically with the number of
+objects. The broadphase narrows that down to candidate pairs whose bounding boxes share
+a cell of a uniform grid, so only objects that are near each other are ever tested.
+"""
+from itertools import combinations
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from pong.game_objects import GameObject
+
+Cell = Tuple[int, int]
+
+CELL_SIZE = 64
+# Below this many objects, hashing costs more than it saves
+BRUTE_FORCE_LIMIT = 24
+
+
+class SpatialHash:
+    """Uniform grid broadphase. Each object is hashed into every cell its bounding box
+    touches, and pairs are only generated between objects sharing a cell.
+
+    Static objects (such as walls) are never paired with each other. They are assumed
+    not to move, so they are only hashed again when the set of static objects changes.
+    With only a handful of objects, every pair is generated instead.
+
+    The grid built for the last set of pairs can then be asked for the objects near any
+    other object (see near), such as a ball that sweeps its own path.
+    """
+
+    def __init__(
+        self, cell_size: int = CELL_SIZE, brute_force_limit: int = BRUTE_FORCE_LIMIT
+    ) -> None:
+        self.cell_size = cell_size
+        self.brute_force_limit = brute_force_limit
+        self.static_cells: Dict[Cell, List[GameObject]] = {}
+        self.static_ids: Tuple[int, ...] = ()
+        self.dynamic_cells: Dict[Cell, List[GameObject]] = {}
+        self.objects: Sequence[GameObject] = ()
+        self.hashed = False
+
+    def cells(self, obj: GameObject, reach: float = 0) -> Iterator[Cell]:
+        """Every cell touched by the bounding box of an object, edges included.
+
+        :param obj: Object to hash.
+        :param reach: Distance to grow the bounding box by on every side.
+        :return: Iterator over the cells.
+        """
+        size = self.cell_size
+        left = int((obj.x - reach) // size)
+        right = int((obj.x + obj.width + reach) // size)
+        bottom = int((obj.y - reach) // size)
+        top = int((obj.y + obj.height + reach) // size)
+        for cell_x in range(left, right + 1):
+            for cell_y in range(bottom, top + 1):
+                yield cell_x, cell_y
+
+    def owner(self, obj1: GameObject, obj2: GameObject) -> Cell:
+        """The single cell responsible for reporting a pair, so that objects sharing
+        several cells are only reported once. This is the cell holding the lower left
+        corner of the overlap of both bounding boxes.
+        """
+        size = self.cell_size
+        return int(max(obj1.x, obj2.x) // size), int(max(obj1.y, obj2.y) // size)
+
+    def _index_static(self, objects: Sequence[GameObject]) -> None:
+        static = [obj for obj in objects if obj.static]
+        static_ids = tuple(id(obj) for obj in static)
+        if static_ids == self.static_ids:
+            return
+
+        self.static_cells.clear()
+        self.static_ids = static_ids
+        for obj in static:
+            for cell in self.cells(obj):
+                self.static_cells.setdefault(cell, []).append(obj)
+
+    def pairs(
+        self, objects: Sequence[GameObject]
+    ) -> Iterator[Tuple[GameObject, GameObject]]:
+        """Generate candidate pairs of objects that may be colliding. Every colliding
+        pair is generated exactly once, but not every pair generated is colliding.
+
+        :param objects: Objects to pair up.
+        :return: Iterator over candidate pairs.
+        """
+        self.objects = objects
+        self.hashed = len(objects) >= self.brute_force_limit
+        if not self.hashed:
+            for obj1, obj2 in combinations(objects, 2):
+                if not (obj1.static and obj2.static):
+                    yield obj1, obj2
+            return
+
+        self._index_static(objects)
+        dynamic_cells: Dict[Cell, List[GameObject]] = {}
+        self.dynamic_cells = dynamic_cells
+
+        for obj in objects:
+            if obj.static:
+                continue
+            for cell in self.cells(obj):
+                for other in self.static_cells.get(cell, ()):
+                    if self.owner(obj, other) == cell:
+                        yield other, obj
+                occupants = dynamic_cells.setdefault(cell, [])
+                for other in occupants:
+                    if self.owner(obj, other) == cell:
+                        yield other, obj
+                occupants.append(obj)
+
+    def near(self, obj: GameObject, reach: float) -> List[GameObject]:
+        """Candidates for colliding with an object anywhere within some distance of
+        where it is, out of the objects last paired up. Every object that could collide
+        is included, but not every object included could.
+
+        :param obj: Object to find candidates for. It need not have been paired up.
+        :param reach: Furthest the object can move.
+        :return: Candidates, without the object itself.
+        """
+        if not self.hashed:
+            return [other for other in self.objects if other is not obj]
+        found: Dict[int, GameObject] = {}
+        for cell in self.cells(obj, reach):
+            for other in self.static_cells.get(cell, ()):
+                found[id(other)] = other
+            for other in self.dynamic_cells.get(cell, ()):
+                found[id(other)] = other
+        found.pop(id(obj), None)
+        return list(found.values())
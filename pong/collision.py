@@ -0,0 +1,104 @@
+"""Continuous collision detection between axis-aligned bounding boxes.
+
+Testing for overlap once per tick misses fast objects that move further than an
+obstacle is thick in a single tick. Sweeping the bounding box of a moving object along
+its displacement instead finds the exact time at which it first touches an obstacle.
+"""
+import math
+from typing import TYPE_CHECKING, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:
+    # Only for annotations: game_objects imports sweep from here
+    # pylint: disable=cyclic-import
+    from pong.game_objects import GameObject  # pragma: no cover
+
+
+class Impact(NamedTuple):
+    """Where along its displacement a moving object first touches an obstacle."""
+
+    time: float
+    """Fraction of the displacement covered before touching, from 0 to 1."""
+
+    normal_x: int
+    """Horizontal component of the surface normal that was hit: -1, 0 or 1."""
+
+    normal_y: int
+    """Vertical component of the surface normal that was hit: -1, 0 or 1."""
+
+
+def _axis(
+    position: float, size: float, distance: float, obstacle: float, obstacle_size: float
+) -> Optional[Tuple[float, float]]:
+    """Times of entry into and exit from an obstacle along a single axis."""
+    if distance > 0:
+        return (
+            (obstacle - (position + size)) / distance,
+            (obstacle + obstacle_size - position) / distance,
+        )
+    if distance < 0:
+        return (
+            (obstacle + obstacle_size - position) / distance,
+            (obstacle - (position + size)) / distance,
+        )
+    if position + size < obstacle or position > obstacle + obstacle_size:
+        return None
+    return -math.inf, math.inf
+
+
+def _normal(position: float, size: float, obstacle: float, obstacle_size: float) -> int:
+    """Direction from the center of an obstacle to the center of an object overlapping
+    it, along a single axis."""
+    return 1 if position + size / 2 > obstacle + obstacle_size / 2 else -1
+
+
+def sweep(
+    mover: "GameObject", delta_x: float, delta_y: float, obstacle: "GameObject"
+) -> Optional[Impact]:
+    """Find when a moving object first touches a stationary one.
+
+    Objects that are already overlapping, as when a paddle has moved into the ball,
+    impact straight away. Objects moving apart do not impact.
+
+    :param mover: Object that is moving.
+    :param delta_x: Horizontal displacement of the mover.
+    :param delta_y: Vertical displacement of the mover.
+    :param obstacle: Stationary object in the way.
+    :return: The impact, or None if the mover does not touch the obstacle.
+    """
+    depth_x = min(mover.x + mover.width, obstacle.x + obstacle.width) - max(
+        mover.x, obstacle.x
+    )
+    depth_y = min(mover.y + mover.height, obstacle.y + obstacle.height) - max(
+        mover.y, obstacle.y
+    )
+    if depth_x > 0 and depth_y > 0:
+        # Pushed out along the axis penetrated least, or both if they are equal
+        normal_x = 0
+        normal_y = 0
+        if depth_x <= depth_y:
+            normal_x = _normal(mover.x, mover.width, obstacle.x, obstacle.width)
+        if depth_y <= depth_x:
+            normal_y = _normal(mover.y, mover.height, obstacle.y, obstacle.height)
+        if delta_x * normal_x + delta_y * normal_y >= 0:
+            return None
+        return Impact(0.0, normal_x, normal_y)
+
+    x_times = _axis(mover.x, mover.width, delta_x, obstacle.x, obstacle.width)
+    if x_times is None:
+        return None
+    y_times = _axis(mover.y, mover.height, delta_y, obstacle.y, obstacle.height)
+    if y_times is None:
+        return None
+
+    entry = max(x_times[0], y_times[0])
+    leave = min(x_times[1], y_times[1])
+    if entry > leave or entry < 0 or entry > 1:
+        return None
+
+    normal_x = 0
+    normal_y = 0
+    if x_times[0] >= y_times[0]:
+        normal_x = -1 if delta_x > 0 else 1
+    if y_times[0] >= x_times[0]:
+        normal_y = -1 if delta_y > 0 else 1
+    return Impact(entry, normal_x, normal_y)
@@ -0,0 +1,143 @@
+"""Player input abstractions. Nothing in this module depends on a window, so the
+simulation can read controllers without a display being available.
+
+Keys reach controllers through a Keymap, which finds the controller and action bound to
+a key with a single lookup, however many controllers there are. Key events are not
+applied straight away, but timestamped and held in an InputQueue, so that when several
+simulation steps are run at once to catch up, each one only sees the keys that had been
+pressed by the time it covers.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Deque, Dict, Iterable, Set, Tuple
+
+if TYPE_CHECKING:
+    # Only for annotations: the simulation imports controllers itself
+    # pylint: disable=cyclic-import
+    from pong.simulation import Match  # pragma: no cover
+
+# Actions a key can be bound to
+UP, DOWN = range(2)
+
+
+@dataclass
+class Controller:
+    """Abstraction over controls for a single player."""
+
+    player_up_key: int
+    player_down_key: int
+    player_up: bool = False
+    player_down: bool = False
+
+    def hold(self, action: int, held: bool) -> None:
+        """Press or release the control for an action.
+
+        :param action: UP or DOWN.
+        :param held: Whether the control is now held.
+        """
+        if action == UP:
+            self.player_up = held
+        else:
+            self.player_down = held
+
+    def poll(self, match: "Match") -> None:
+        """Called at the start of every tick of a match this controller plays in,
+        before anything moves. Controllers driven by the keyboard do nothing here, but
+        computer players decide what to press.
+
+        :param match: The match being played.
+        """
+
+
+Binding = Tuple[Controller, int]
+
+
+class Keymap:
+    """Index from key symbols to the controller and action each is bound to."""
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, controllers: Iterable[Controller] = ()) -> None:
+        """
+        :param controllers: Controllers whose keys to bind.
+        """
+        self.bindings: Dict[int, Binding] = {}
+        self.bind(controllers)
+
+    def bind(self, controllers: Iterable[Controller]) -> None:
+        """Rebuild the index. Must be called again whenever the controllers, or their
+        keys, change. A key of 0 is unbound; if controllers share a key, the last one
+        given gets it.
+
+        :param controllers: Controllers whose keys to bind.
+        """
+        self.bindings = {}
+        for controller in controllers:
+            for symbol, action in (
+                (controller.player_up_key, UP),
+                (controller.player_down_key, DOWN),
+            ):
+                if symbol:
+                    self.bindings[symbol] = controller, action
+
+
+class InputQueue:
+    """Key events, timestamped as they arrive, waiting to be applied to the simulation
+    step they happened during."""
+
+    def __init__(self, keymap: Keymap) -> None:
+        """
+        :param keymap: Bindings of the keys events are queued for.
+        """
+        self.keymap = keymap
+        self.events: Deque[Tuple[float, int, bool]] = deque()
+        # Keys whose release was held back until the next step
+        self.released: Dict[int, Binding] = {}
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def push(self, timestamp: float, symbol: int, held: bool) -> None:
+        """Queue a key event. Events for keys that are not bound are ignored.
+
+        :param timestamp: Time of the event. Events must be pushed in time order.
+        :param symbol: Key pressed or released.
+        :param held: Whether the key was pressed, rather than released.
+        """
+        if symbol in self.keymap.bindings:
+            self.events.append((timestamp, symbol, held))
+
+    def apply(self, until: float) -> None:
+        """Apply every event up to some time to the controllers, in order, before a
+        simulation step. A key pressed and released again before the same step is only
+        released before the next one, so that even the shortest tap moves a paddle.
+
+        :param until: Time the step covers up to. Later events are left queued.
+        """
+        for controller, action in self.released.values():
+            controller.hold(action, False)
+        self.released = {}
+
+        bindings = self.keymap.bindings
+        pressed: Set[int] = set()
+        events = self.events
+        while events and events[0][0] <= until:
+            _, symbol, held = events.popleft()
+            binding = bindings.get(symbol)
+            if binding is None:
+                # Unbound since the event was queued
+                continue
+            if held:
+                pressed.add(symbol)
+                self.released.pop(symbol, None)
+            elif symbol in pressed:
+                self.released[symbol] = binding
+                continue
+            controller, action = binding
+            controller.hold(action, held)
+
+    def clear(self) -> None:
+        """Drop every queued event."""
+        self.events.clear()
+        self.released = {}
@@ -0,0 +1,340 @@
+"""The game as a reinforcement learning environment.
+
+A PongEnv runs a headless Match, in which the agent controls one paddle and a
+ComputerController the other. It follows the classic Gym interface: reset returns the
+first observation, and step takes an action and returns the next observation, the
+reward, whether the episode is done, and an info dict.
+
+A VectorEnv steps many environments at once, split between worker processes. Actions,
+observations, rewards and done flags are exchanged through shared memory, so stepping
+sends a single short message to each worker, however many environments it runs.
+"""
+import math
+import multiprocessing
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from pong.ai import ComputerController
+from pong.controller import Controller
+from pong.raster import Rasterizer
+from pong.simulation import Match
+
+# Ball position and velocity, then the position and velocity of the agent's paddle and
+# the opponent's paddle
+OBSERVATION_SIZE = 8
+# Actions: hold nothing, hold up, hold down
+STAY, UP, DOWN = range(3)
+# Every array in the shared memory of a VectorEnv starts on a cache line
+ALIGNMENT = 64
+
+StepResult = Tuple[np.ndarray, float, bool, Dict[str, Any]]
+
+
+class PongEnv:
+    """A single match, played against a computer opponent, point by point."""
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        width: int = 1024,
+        height: int = 768,
+        side: int = 0,
+        points: int = 1,
+        max_ticks: int = 10000,
+        frame_skip: int = 1,
+        opponent: Optional[Controller] = None,
+        seed: int = 0,
+        observation: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        :param width: Width of the play area.
+        :param height: Height of the play area.
+        :param side: Index of the paddle the agent controls: 0 for left, 1 for right.
+        :param points: Points either player must score to end an episode.
+        :param max_ticks: Ticks after which an episode ends regardless.
+        :param frame_skip: Ticks each action is held for.
+        :param opponent: Controller of the other paddle. Defaults to a computer player.
+        :param seed: Seed for the mistakes of the default opponent.
+        :param observation: Array of OBSERVATION_SIZE float32 to write observations
+            into. Defaults to a new one.
+        """
+        self.side = side
+        self.points = points
+        self.max_ticks = max_ticks
+        self.frame_skip = frame_skip
+
+        self.agent = Controller(0, 0)
+        self.opponent = opponent or ComputerController(
+            reaction_ticks=10, error=20, seed=seed
+        )
+        controllers = [self.opponent, self.opponent]
+        controllers[side] = self.agent
+        self.match = Match(width, height, controllers)
+        self.paddles = self.match.paddles[side], self.match.paddles[1 - side]
+
+        if observation is None:
+            observation = np.zeros(OBSERVATION_SIZE, dtype=np.float32)
+        self.observation = observation
+        self.ticks = 0
+        self.rasterizer: Optional[Rasterizer] = None
+
+    def reset(self) -> np.ndarray:
+        """Start a new episode.
+
+        :return: The first observation.
+        """
+        self.match.restart()
+        self.ticks = 0
+        self.observe()
+        return self.observation
+
+    def step(self, action: int) -> StepResult:
+        """Hold the controls for an action for frame_skip ticks.
+
+        :param action: STAY, UP or DOWN.
+        :return: The next observation; the reward, which is 1 for each point the agent
+            scored and -1 for each point it conceded; whether the episode is done; and
+            an info dict holding the scores.
+        """
+        self.agent.player_up = bool(action == UP)
+        self.agent.player_down = bool(action == DOWN)
+
+        match = self.match
+        before = match.left_score - match.right_score
+        for _ in range(self.frame_skip):
+            match.update()
+        self.ticks += self.frame_skip
+        reward = float(match.left_score - match.right_score - before)
+        if self.side:
+            reward = -reward
+
+        done = (
+            max(match.left_score, match.right_score) >= self.points
+            or self.ticks >= self.max_ticks
+        )
+        self.observe()
+        info = {"left_score": match.left_score, "right_score": match.right_score}
+        return self.observation, reward, done, info
+
+    def observe(self) -> None:
+        """Write the current state of the match into the observation. Positions are
+        scaled to between 0 and 1 by the size of the play area, and velocities by the
+        same amount."""
+        match = self.match
+        ball = match.ball
+        width = match.width
+        height = match.height
+        observation = self.observation
+        observation[0] = ball.x / width
+        observation[1] = ball.y / height
+        observation[2] = ball.speed * math.cos(ball.direction) / width
+        observation[3] = ball.speed * math.sin(ball.direction) / height
+        for i, paddle in enumerate(self.paddles):
+            controller = paddle.controller
+            velocity = paddle.speed * (controller.player_up - controller.player_down)
+            observation[4 + 2 * i] = paddle.y / height
+            observation[5 + 2 * i] = velocity / height
+
+    def render(self, scale: float = 1.0, grayscale: bool = False) -> np.ndarray:
+        """Draw the match as pixels, without a window (see Rasterizer).
+
+        :param scale: Size of the frame, relative to the play area.
+        :param grayscale: Whether the frame has a single channel, rather than three.
+        :return: The frame. The same array is returned every time, and is overwritten
+            by the next call.
+        """
+        rasterizer = self.rasterizer
+        if rasterizer is None or (rasterizer.scale, rasterizer.grayscale) != (
+            scale,
+            grayscale,
+        ):
+            rasterizer = Rasterizer(
+                self.match.width, self.match.height, scale, grayscale
+            )
+            self.rasterizer = rasterizer
+        return rasterizer.render(self.match)
+
+
+def run_worker(  # pylint: disable=too-many-arguments,too-many-locals
+    connection: Connection,
+    memory_name: str,
+    count: int,
+    start: int,
+    stop: int,
+    options: Dict[str, Any],
+) -> None:
+    """Run some of the environments of a VectorEnv, in a worker process, until told to
+    stop.
+
+    :param connection: Pipe to the VectorEnv, on which commands arrive.
+    :param memory_name: Name of the shared memory of the VectorEnv.
+    :param count: Number of environments in the VectorEnv.
+    :param start: Index of the first environment this worker runs.
+    :param stop: Index after the last environment this worker runs.
+    :param options: Arguments for each PongEnv. Each environment adds its index to
+        the seed, so that their opponents make different mistakes.
+    """
+    memory = SharedMemory(memory_name)
+    observations, actions, rewards, dones = VectorEnv.buffers(memory, count)
+    seed = options.pop("seed", 0)
+    environments = [
+        PongEnv(seed=seed + i, observation=observations[i], **options)
+        for i in range(start, stop)
+    ]
+    try:
+        while True:
+            command = connection.recv()
+            if command == "reset":
+                for environment in environments:
+                    environment.reset()
+            elif command == "step":
+                for i, environment in enumerate(environments, start):
+                    _, rewards[i], dones[i], _ = environment.step(actions[i])
+                    if dones[i]:
+                        environment.reset()
+            else:
+                break
+            connection.send(None)
+    finally:
+        del observations, actions, rewards, dones, environments
+        memory.close()
+
+
+class VectorEnv:
+    """Many PongEnvs, run by a pool of worker processes.
+
+    Environments that finish an episode are reset straight away, so the observation
+    returned for them is the first of the next episode.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(
+        self, count: int, workers: Optional[int] = None, **options: Any
+    ) -> None:
+        """
+        :param count: Number of environments.
+        :param workers: Number of worker processes. Defaults to one per CPU, but never
+            more than there are environments.
+        :param options: Arguments for each PongEnv.
+        """
+        self.count = count
+        workers = min(count, workers or multiprocessing.cpu_count())
+
+        self.memory = SharedMemory(create=True, size=self.memory_size(count))
+        buffers = self.buffers(self.memory, count)
+        self.observations, self.actions, self.rewards, self.dones = buffers
+
+        self.connections: List[Connection] = []
+        self.processes: List[multiprocessing.Process] = []
+        for worker in range(workers):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=run_worker,
+                args=(
+                    child,
+                    self.memory.name,
+                    count,
+                    count * worker // workers,
+                    count * (worker + 1) // workers,
+                    options,
+                ),
+                daemon=True,
+            )
+            process.start()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    @staticmethod
+    def layout(count: int) -> List[Tuple[Any, Tuple[int, ...], int]]:
+        """Type, shape and offset of each array in shared memory, for some number of
+        environments. Each offset is rounded up to ALIGNMENT bytes, so that no array is
+        misaligned for its type, whatever the size of the one before it.
+
+        :param count: Number of environments in the VectorEnv.
+        :return: The observations, actions, rewards and done flags, in that order.
+        """
+        offset = 0
+        layout: List[Tuple[Any, Tuple[int, ...], int]] = []
+        for dtype, shape in (
+            (np.float32, (count, OBSERVATION_SIZE)),
+            (np.int8, (count,)),
+            (np.float32, (count,)),
+            (np.bool_, (count,)),
+        ):
+            layout.append((dtype, shape, offset))
+            size = np.dtype(dtype).itemsize * int(np.prod(shape))
+            offset += -(-size // ALIGNMENT) * ALIGNMENT
+        return layout
+
+    @staticmethod
+    def memory_size(count: int) -> int:
+        """Bytes of shared memory needed for some number of environments."""
+        dtype, shape, offset = VectorEnv.layout(count)[-1]
+        size: int = np.dtype(dtype).itemsize * int(np.prod(shape))
+        return offset + size
+
+    @staticmethod
+    def buffers(
+        memory: SharedMemory, count: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Views of the observations, actions, rewards and done flags in shared memory.
+
+        :param memory: Shared memory of a VectorEnv.
+        :param count: Number of environments in the VectorEnv.
+        :return: The four arrays.
+        """
+        arrays = [
+            np.ndarray(shape, dtype=dtype, buffer=memory.buf, offset=offset)
+            for dtype, shape, offset in VectorEnv.layout(count)
+        ]
+        # pylint: disable=unbalanced-tuple-unpacking
+        observations, actions, rewards, dones = arrays
+        return observations, actions, rewards, dones
+
+    def command(self, command: str) -> None:
+        """Send a command to every worker, and wait for them all to carry it out."""
+        for connection in self.connections:
+            connection.send(command)
+        for connection in self.connections:
+            connection.recv()
+
+    def reset(self) -> np.ndarray:
+        """Start a new episode in every environment.
+
+        :return: The first observation of each environment, one per row. The array is
+            overwritten by the next call to reset or step.
+        """
+        self.command("reset")
+        return self.observations
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Step every environment.
+
+        :param actions: Action for each environment.
+        :return: Observations, rewards and done flags, one per environment. The arrays
+            are overwritten by the next call to reset or step.
+        """
+        self.actions[:] = actions
+        self.command("step")
+        return self.observations, self.rewards, self.dones
+
+    def close(self) -> None:
+        """Stop the workers, and free the shared memory."""
+        for connection in self.connections:
+            connection.send("close")
+        for process in self.processes:
+            process.join()
+        del self.observations, self.actions, self.rewards, self.dones
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self) -> "VectorEnv":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
@@ -1,69 +1,256 @@
 """Top level objects describing the Game application."""
 
-from dataclasses import dataclass
-from typing import TYPE_CHECKING, Optional
+import sys
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Set, Type, TypeVar
 
 from pyglet.app import exit as pyglet_exit
-from pyglet.clock import schedule_interval, unschedule
-from pyglet.graphics import Batch
+from pyglet.clock import schedule_interval, schedule_once, unschedule
 from pyglet.window import Window, key
 
 from pong.assets import AssetManager
+from pong.controller import Controller, InputQueue, Keymap
+from pong.profiler import FrameProfiler, StartupTimer
+from pong.timestep import FixedTimestep
+from pong.viewport import Viewport
 
 if TYPE_CHECKING:
-    from pong.screens import Screen  # pragma: no cover
+    # Only needed once the game has started, so imported where they are used
+    from pong.hud import ProfilerOverlay  # pragma: no cover
+    from pong.netplay import Transport  # pragma: no cover
+    from pong.replay import Replay  # pragma: no cover
+    from pong.screen import Screen  # pragma: no cover
+    from pong.telemetry import Telemetry  # pragma: no cover
 
+SIMULATION_STEP = 0.01
+FRAME_INTERVAL = 1 / 60
+TRACE_PATH = "pong-trace.json"
+# Up and down keys of each player, in the order their paddles are placed (see paddle_x)
+PLAYER_KEYS = [(key.W, key.S), (key.UP, key.DOWN), (key.R, key.F), (key.I, key.K)]
 
-@dataclass
-class Controller:
-    """Abstraction over controls for a single player."""
-
-    player_up_key: int
-    player_down_key: int
-    player_up: bool = False
-    player_down: bool = False
+ScreenT = TypeVar("ScreenT", bound="Screen")
 
 
 class Pong:
     """This application represents the game as a whole. It contains the game window,
     and other objects that elements of a scene might need access to. It can set an
-    active screen, and should be passed to each new Screen."""
+    active screen, and should be passed to each new Screen.
+
+    Screens are pooled: each type of screen is constructed once, the first time it is
+    needed, and then reused every time it is shown again.
+
+    Input is handled as it arrives: key events are passed on to the active screen, and
+    queued, with the time they arrived, for the controllers their keys are bound to.
+    Each simulation step then applies the events that happened up to the time it
+    covers. While the active screen is static, the game stops ticking
+    altogether, and since the window is only redrawn after a tick or an event, an idle
+    game uses no CPU until a key is pressed.
+
+    The game is played on a logical play area of a fixed size, which the viewport
+    scales to fit the window. The window can be resized, or made fullscreen with F11,
+    at any time, without changing how the game plays."""
+
+    # pylint: disable=too-many-instance-attributes
 
-    def __init__(self, window: Window) -> None:
+    def __init__(
+        self, window: Window, players: int = 2, width: int = 1024, height: int = 768
+    ) -> None:
+        """
+        :param window: Window to draw the game in.
+        :param players: Number of controllers, from 2 to 4, each bound to the keys in
+            PLAYER_KEYS.
+        :param width: Width of the logical play area.
+        :param height: Height of the logical play area.
+        """
         self.window = window
-        self.keys = key.KeyStateHandler()
+        self.viewport = Viewport(width, height)
+        self.viewport.fit(window.width, window.height)
         self.asset_manager = AssetManager()
-        self.batch = Batch()
-        self.controllers = [Controller(key.W, key.S), Controller(key.UP, key.DOWN)]
+        self.controllers = [Controller(*keys) for keys in PLAYER_KEYS[:players]]
+        # Bound to the controllers on load. Bind again after changing them.
+        self.keymap = Keymap()
+        self.inputs = InputQueue(self.keymap)
+        # Source of the time key events arrive at, in the same units as the frame time
+        self.clock: Callable[[], float] = perf_counter
         self.screen: Optional["Screen"] = None
+        self.screens: Dict[Type["Screen"], "Screen"] = {}
+        self.prewarming: Set[Type["Screen"]] = set()
+        self.timestep = FixedTimestep(SIMULATION_STEP)
+        self.ticking = False
+        # Whether a frame has been drawn yet. Assets only start loading afterwards.
+        self.drawn = False
+        self.profiler = FrameProfiler(FRAME_INTERVAL)
+        self.profiler_overlay: Optional["ProfilerOverlay"] = None
+        # The phases of startup are reported once the first frame is drawn, if this is
+        # set
+        self.startup: Optional[StartupTimer] = None
+        # Each match played is recorded to this file, if it is set
+        self.record_path: Optional[str] = None
+        # Each match played follows the controls of this recording, if it is set
+        self.replay: Optional["Replay"] = None
+        # Each match played is kept in step with another peer over this transport, if
+        # it is set. This peer owns the controller at the index given by side.
+        self.transport: Optional["Transport"] = None
+        self.side = 0
+        # Events of each match played are emitted to this, if it is set
+        self.telemetry: Optional["Telemetry"] = None
 
     def load(self) -> None:
-        """Run once on startup to initialize assets and event handlers.
+        """Run once on startup to initialize assets and event handlers. Assets are
+        loaded in the background, from the first tick after the first frame is drawn,
+        so this returns before they are ready.
         """
 
         def on_key_press(symbol: int, _: int) -> None:
             if symbol == key.ESCAPE:
                 pyglet_exit()
+            elif symbol == key.F3:
+                self.toggle_profiler()
+            elif symbol == key.F4:
+                self.profiler.export(TRACE_PATH)
+            elif symbol == key.F11:
+                self.window.set_fullscreen(not self.window.fullscreen)
 
-            for controller in self.controllers:
-                if symbol == controller.player_up_key:
-                    controller.player_up = True
-                elif symbol == controller.player_down_key:
-                    controller.player_down = True
+            self.inputs.push(self.clock(), symbol, True)
+            if self.screen:
+                self.screen.on_key_press(symbol)
+            self.wake()
 
         def on_key_release(symbol: int, _: int) -> None:
-            for controller in self.controllers:
-                if symbol == controller.player_up_key:
-                    controller.player_up = False
-                elif symbol == controller.player_down_key:
-                    controller.player_down = False
+            self.inputs.push(self.clock(), symbol, False)
+            if self.screen:
+                self.screen.on_key_release(symbol)
 
+        self.keymap.bind(self.controllers)
         self.window.set_handler("on_key_press", on_key_press)
         self.window.set_handler("on_key_release", on_key_release)
-        self.window.push_handlers(self.keys)
+        self.window.set_handler("on_draw", self.on_draw)
+        self.window.set_handler("on_resize", self.on_resize)
         self.window.set_exclusive_mouse()
 
-        self.asset_manager.load(self.window)
+        self.asset_manager.load_async(self.viewport.width, self.viewport.height)
+
+        self.wake()
+
+    def wake(self) -> None:
+        """Start ticking, unless the game already is, or the active screen is static."""
+        if self.ticking or (self.screen and self.screen.static):
+            return
+        self.ticking = True
+        schedule_interval(self.tick, FRAME_INTERVAL)
+
+    def tick(self, delta_time: float) -> None:
+        """Called once per frame. Runs as many fixed simulation steps on the active
+        screen as the real time that has passed calls for. The window is redrawn
+        after each call.
+
+        Queued key events are applied before the step covering the time they arrived
+        at. The last step of the frame also takes the events that arrived after the
+        time it covers, rather than leaving them to wait for the next frame.
+
+        :param delta_time: Real time passed since the last frame.
+        """
+        if self.drawn and not self.asset_manager.ready:
+            self.asset_manager.pump()
+
+        profiling = self.profiler.enabled
+        if profiling:
+            self.profiler.begin_simulation(delta_time)
+
+        now = self.clock()
+        steps = self.timestep.advance(delta_time)
+        step = self.timestep.step
+        # Time covered by the first step. Each of the others covers one step more.
+        covered = now - self.timestep.accumulator - (steps - 1) * step
+        for i in range(steps):
+            self.inputs.apply(covered + i * step if i < steps - 1 else now)
+            if self.screen:
+                self.screen.update(self.timestep.step)
+
+        if profiling:
+            self.profiler.end_simulation(steps)
+
+        if self.screen and self.screen.static:
+            # Nothing will change until a key is pressed. This frame is still drawn.
+            self.ticking = False
+            unschedule(self.tick)
+
+    def on_resize(self, width: int, height: int) -> None:
+        """Fit the viewport, and the active screen, to the resized window. The window
+        still sets up its own projection afterwards.
+
+        :param width: New width of the window.
+        :param height: New height of the window.
+        """
+        self.viewport.fit(width, height)
+        if self.screen:
+            self.screen.layout()
+        if self.profiler_overlay:
+            self.profiler_overlay.layout(self.window)
+
+    def on_draw(self) -> None:
+        """Draw the active screen, and the profiler overlay if profiling is enabled."""
+        if not self.screen:
+            return
+
+        if self.profiler.enabled and self.profiler_overlay:
+            self.profiler.begin_draw()
+            self.screen.on_draw()
+            self.profiler.end_draw()
+            self.profiler_overlay.draw()
+        else:
+            self.screen.on_draw()
+
+        self.drawn = True
+        if self.startup:
+            self.startup.mark("first frame")
+            print(self.startup.report(), file=sys.stderr)
+            self.startup = None
+
+    def toggle_profiler(self) -> None:
+        """Turn frame profiling, and its overlay, on or off."""
+        # pylint: disable=import-outside-toplevel
+        from pong.hud import ProfilerOverlay
+
+        self.profiler.toggle()
+        if self.profiler_overlay is None:
+            self.profiler_overlay = ProfilerOverlay(self.profiler, self.window)
+
+    def get_screen(self, screen_type: Type[ScreenT]) -> ScreenT:
+        """Get the pooled screen of some type, constructing it if this is the first time
+        it is needed.
+
+        :param screen_type: Type of screen to get.
+        :return: The screen.
+        """
+        screen = self.screens.get(screen_type)
+        if not isinstance(screen, screen_type):
+            screen = screen_type(self)
+            self.screens[screen_type] = screen
+        return screen
+
+    def prewarm(self, screen_type: Type["Screen"]) -> None:
+        """Construct a screen ahead of time, in a later frame, so that showing it does
+        not need to. Does nothing if the screen is already constructed, or going to be.
+
+        :param screen_type: Type of screen to construct.
+        """
+        if screen_type in self.screens or screen_type in self.prewarming:
+            return
+        self.prewarming.add(screen_type)
+
+        def construct(_: float) -> None:
+            self.get_screen(screen_type)
+            self.prewarming.discard(screen_type)
+
+        schedule_once(construct, 0)
+
+    def show(self, screen_type: Type["Screen"]) -> None:
+        """Make the pooled screen of some type the active screen.
+
+        :param screen_type: Type of screen to show.
+        """
+        self.set_screen(self.get_screen(screen_type))
 
     def set_screen(self, next_screen: "Screen") -> None:
         """Change the active screen.
@@ -71,8 +258,10 @@ class Pong:
         :param next_screen: The new screen to be active.
         """
         if self.screen:
-            self.window.pop_handlers()
-            unschedule(self.screen.update)
-        self.window.push_handlers(next_screen.on_draw)
-        schedule_interval(next_screen.update, 0.01)
+            self.screen.exit()
         self.screen = next_screen
+        next_screen.layout()
+        next_screen.enter()
+        if self.profiler.enabled:
+            self.profiler.transition(type(next_screen).__name__)
+        self.wake()
@@ -1,22 +1,49 @@
-"""Any object representable by a Sprite in the game world is in this module."""
+"""Every object in the game world is in this module. Objects are plain data: they hold
+a position and a size, and know nothing about how (or whether) they are drawn."""
 import math
 from abc import abstractmethod
-from typing import List
+from typing import Optional, Sequence
 
-from pyglet.sprite import Sprite
+from pong.collision import Impact, sweep
+from pong.controller import Controller
 
-from pong.game import Controller
+# Kinds of object, as bit flags. An object's contacts hold the kinds of every object it
+# is touching, and again shifted by ABOVE or BELOW for objects that are higher or lower.
+BALL = 1 << 0
+PADDLE = 1 << 1
+WALL = 1 << 2
+ABOVE = 3
+BELOW = 6
 
 
 class GameObject:
-    """Base class. An object representable by a Sprite in the game world. At a minimum,
-    this will consist of a Sprite and a list of other GameObjects with which this
-    object is colliding. Subclasses may extend this behavior to hold more gameplay
-    related attributes."""
+    """Base class. An object in the game world. At a minimum, this will consist of an
+    axis-aligned bounding box and a bitmask of contacts with other GameObjects this
+    object is colliding with. Subclasses may extend this behavior to hold more gameplay
+    related attributes.
 
-    def __init__(self, sprite: Sprite) -> None:
-        self.sprite = sprite
-        self.collisions: List[GameObject] = []
+    Static objects never move, so they can never collide with each other.
+
+    Game objects use __slots__ rather than an instance dict: they are small, created in
+    large numbers when many matches are simulated, and their attributes are read in the
+    innermost loop of every tick.
+    """
+
+    # pylint: disable=invalid-name
+
+    __slots__ = ("x", "y", "width", "height", "start_x", "start_y", "contacts")
+
+    kind: int = 0
+    static: bool = False
+
+    def __init__(self, x: float, y: float, width: int, height: int) -> None:
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.start_x = x
+        self.start_y = y
+        self.contacts = 0
 
     @abstractmethod
     def update(self) -> None:
@@ -32,98 +59,147 @@ class GameObject:
         :param obj: Other object to test for collision.
         :return:
         """
-        self_right = self.sprite.x + self.sprite.width
-        self_left = self.sprite.x
-        self_top = self.sprite.y + self.sprite.height
-        self_bottom = self.sprite.y
-        obj_right = obj.sprite.x + obj.sprite.width
-        obj_left = obj.sprite.x
-        obj_top = obj.sprite.y + obj.sprite.height
-        obj_bottom = obj.sprite.y
-
         separate = (
-            self_right < obj_left
-            or self_left > obj_right
-            or self_top < obj_bottom
-            or self_bottom > obj_top
+            self.x + self.width < obj.x
+            or self.x > obj.x + obj.width
+            or self.y + self.height < obj.y
+            or self.y > obj.y + obj.height
         )
         return not separate
 
+    def touch(self, obj: "GameObject") -> None:
+        """Record that another object is colliding with this one.
+
+        :param obj: Other object that is colliding.
+        """
+        contact = obj.kind
+        if obj.y > self.y:
+            contact |= contact << ABOVE
+        elif obj.y < self.y:
+            contact |= contact << BELOW
+        self.contacts |= contact
+
 
 class Ball(GameObject):
     """The game ball."""
 
+    __slots__ = ("speed", "direction", "acceleration", "bounces")
+
+    kind = BALL
     initial_speed: int = 5
     initial_direction: float = math.pi / 4
     initial_acceleration: int = 1
+    max_bounces: int = 8
 
-    def __init__(self, sprite: Sprite) -> None:
-        super().__init__(sprite)
-        self.start_x: int = self.sprite.x
-        self.start_y: int = self.sprite.y
+    def __init__(self, x: float, y: float, width: int, height: int) -> None:
+        super().__init__(x, y, width, height)
         self.speed: int = Ball.initial_speed
         self.direction: float = Ball.initial_direction
         self.acceleration: int = Ball.initial_acceleration
+        # Wall bounces during the last update
+        self.bounces = 0
 
     def reset(self) -> None:
         """Reset this object."""
-        self.sprite.update(self.start_x, self.start_y)
+        self.x = self.start_x
+        self.y = self.start_y
         self.speed = Ball.initial_speed
         self.direction = Ball.initial_direction
         self.acceleration = Ball.initial_acceleration
+        self.bounces = 0
 
     def update(self) -> None:
         """Update the object."""
         # Paddle collisions
-        if any(isinstance(obj, Paddle) for obj in self.collisions):
+        if self.contacts & PADDLE:
             self.direction = -self.direction + math.pi
             self.speed += self.acceleration
 
         # Wall collisions
-        if any(isinstance(obj, Wall) for obj in self.collisions):
+        self.bounces = 0
+        if self.contacts & WALL:
             self.direction = -self.direction
+            self.bounces = 1
 
-        self.sprite.update(
-            self.sprite.x + self.speed * math.cos(self.direction),
-            self.sprite.y + self.speed * math.sin(self.direction),
-        )
+        self.x += self.speed * math.cos(self.direction)
+        self.y += self.speed * math.sin(self.direction)
+
+    def advance(self, obstacles: Sequence[GameObject]) -> None:
+        """Update the object using continuous collision detection. Rather than reacting
+        to overlaps found at the start of the tick, the ball is swept along its path,
+        and bounces off the first obstacle it touches, at the point of contact. The rest
+        of the movement continues in the new direction, so several bounces can happen
+        within a single tick, and the ball never passes through a thin obstacle.
+
+        :param obstacles: Objects the ball can bounce off. Other balls are ignored.
+        """
+        remaining = 1.0
+        self.bounces = 0
+        for _ in range(self.max_bounces):
+            delta_x = self.speed * math.cos(self.direction) * remaining
+            delta_y = self.speed * math.sin(self.direction) * remaining
+
+            impact: Optional[Impact] = None
+            struck: Optional[GameObject] = None
+            for obstacle in obstacles:
+                if isinstance(obstacle, Ball):
+                    continue
+                found = sweep(self, delta_x, delta_y, obstacle)
+                if found and (impact is None or found.time < impact.time):
+                    impact, struck = found, obstacle
+
+            if impact is None:
+                self.x += delta_x
+                self.y += delta_y
+                return
+
+            self.x += delta_x * impact.time
+            self.y += delta_y * impact.time
+            remaining *= 1 - impact.time
+
+            if impact.normal_x:
+                self.direction = -self.direction + math.pi
+                if isinstance(struck, Paddle):
+                    self.speed += self.acceleration
+            if impact.normal_y:
+                self.direction = -self.direction
+                self.bounces += 1
 
 
 class Paddle(GameObject):
     """A player-controlled paddle."""
 
-    def __init__(self, sprite: Sprite, controller: Controller) -> None:
-        super().__init__(sprite)
-        self.start_x: int = self.sprite.x
-        self.start_y: int = self.sprite.y
+    __slots__ = ("controller", "speed")
+
+    kind = PADDLE
+    initial_speed: int = 10
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self, x: float, y: float, width: int, height: int, controller: Controller
+    ) -> None:
+        super().__init__(x, y, width, height)
         self.controller = controller
-        self.speed: int = 10
+        self.speed: int = Paddle.initial_speed
 
     def reset(self) -> None:
         """Reset this object"""
 
     def update(self) -> None:
         """Update the object."""
-        if self.controller.player_up and not any(
-            isinstance(obj, Wall) and obj.sprite.y > self.sprite.y
-            for obj in self.collisions
-        ):
-            self.sprite.update(self.sprite.x, self.sprite.y + self.speed)
+        if self.controller.player_up and not self.contacts & WALL << ABOVE:
+            self.y += self.speed
 
-        if self.controller.player_down and not any(
-            isinstance(obj, Wall) and obj.sprite.y < self.sprite.y
-            for obj in self.collisions
-        ):
-            self.sprite.update(self.sprite.x, self.sprite.y - self.speed)
+        if self.controller.player_down and not self.contacts & WALL << BELOW:
+            self.y -= self.speed
 
 
 class Wall(GameObject):
     """Wall that forms one of the boundaries of the play area."""
 
-    def __init__(self, sprite: Sprite) -> None:
-        super().__init__(sprite)
-        self.start_x: int = self.sprite.x
-        self.start_y: int = self.sprite.y
+    __slots__ = ()
+
+    kind = WALL
+    static = True
 
     def reset(self) -> None:
         """Reset this object"""
@@ -0,0 +1,307 @@
+"""The screen matches are played on.
+
+It lives apart from the other screens, and is only imported once the title screen has
+been drawn, so that everything a match needs is loaded while the title is on show
+rather than before it.
+"""
+import math
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Type
+
+from pyglet.sprite import Sprite
+from pyglet.window import key
+
+from pong.assets import AssetTag
+from pong.game_objects import Ball, GameObject, Paddle, Wall
+from pong.hud import Counter, digit_font
+from pong.netplay import RollbackSession
+from pong.replay import InputRecorder
+from pong.rewind import RewindBuffer
+from pong.screen import FONT_NAME, Screen
+from pong.simulation import Match
+
+if TYPE_CHECKING:
+    from pong.game import Pong  # pragma: no cover
+    from pong.telemetry import Telemetry  # pragma: no cover
+
+REWIND_SECONDS = 10
+
+
+class GameScreen(Screen):
+    """Main game screen. Runs a Match, and draws its objects and scores.
+
+    If the game has a record path, the controls of each match are recorded to it. If
+    the game has a replay, each match is played from its controls instead, and stops
+    once they run out. If the game has a transport, each match is played against
+    another peer through a RollbackSession. Otherwise, holding backspace rewinds the
+    match, one tick per tick, up to REWIND_SECONDS back, and P pauses it.
+
+    If the game has telemetry, the screen emits an event for each paddle hit, wall
+    bounce, point scored and reset, and the length of each rally, in paddle hits.
+    Hits and points are worked out by comparing the match before and after each tick,
+    and bounces are counted by the ball itself, so the simulation emits nothing.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    sprite_assets: Dict[Type[GameObject], AssetTag] = {
+        Ball: AssetTag.BALL,
+        Paddle: AssetTag.BAR,
+        Wall: AssetTag.WALL,
+    }
+
+    def __init__(self, game: "Pong") -> None:
+        super().__init__(game)
+        game.asset_manager.finish()
+
+        # A replay only plays back faithfully in a match set up like the recorded one
+        if game.replay:
+            self.match = game.replay.match(game.controllers)
+        else:
+            self.match = Match(
+                game.viewport.width,
+                game.viewport.height,
+                game.controllers,
+                ball_size=game.asset_manager.get_asset(AssetTag.BALL).width,
+            )
+
+        # One sprite per game object, positioned from the simulation. Their images and
+        # positions are scaled to the viewport by layout.
+        self.sprites: List[Tuple[GameObject, Sprite]] = [
+            (
+                obj,
+                Sprite(
+                    game.asset_manager.get_asset(self.sprite_assets[type(obj)]),
+                    batch=self.batch,
+                ),
+            )
+            for obj in self.match.game_objects
+        ]
+
+        # Static objects never need their sprites moved. For the others, the position
+        # before the latest step is kept, to interpolate between the two when drawing.
+        self.moving = [(obj, sprite) for obj, sprite in self.sprites if not obj.static]
+        self.previous_x = [obj.x for obj, _sprite in self.moving]
+        self.previous_y = [obj.y for obj, _sprite in self.moving]
+        self.interpolate = False
+
+        score_font = digit_font(FONT_NAME, 25)
+        self.left_score_counter = Counter(score_font, 0, 0, self.batch)
+        self.right_score_counter = Counter(score_font, 0, 0, self.batch)
+
+        self.recorder: Optional[InputRecorder] = None
+        self.session: Optional[RollbackSession] = None
+        self.tick = 0
+        self.history = RewindBuffer(
+            self.match, int(REWIND_SECONDS / game.timestep.step)
+        )
+        self.rewinding = False
+        self.paused = False
+        self.paused_label = self.label(
+            "Paused", game.viewport.width // 2, game.viewport.height // 2, 36
+        )
+        self.paused_label.visible = False
+
+        self.layout()
+        self.reset()
+        self.history.save(self.tick)
+
+    def enter(self) -> None:
+        """Start a new match each time this screen is shown."""
+        self.match.restart()
+        self.tick = 0
+        if self.game.telemetry:
+            self.game.telemetry.emit("reset", tick=self.tick)
+        self.reset()
+        self.history.clear()
+        self.history.save(self.tick)
+        self.rewinding = False
+        self.pause(False)
+        if self.game.record_path:
+            self.recorder = InputRecorder(
+                self.game.record_path, self.match, self.game.controllers
+            )
+        if self.game.transport:
+            self.session = RollbackSession(
+                self.match, self.game.side, self.game.transport
+            )
+
+    def exit(self) -> None:
+        """Finish the recording of the match, if there is one."""
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+
+    def layout(self) -> None:
+        """Swap the sprites to assets scaled for the viewport, and move everything that
+        is not moved by sync."""
+        super().layout()
+        viewport = self.game.viewport
+        scale = viewport.scale
+        asset_manager = self.game.asset_manager
+        for obj, sprite in self.sprites:
+            sprite.image = asset_manager.get_asset(self.sprite_assets[type(obj)], scale)
+            sprite.position = viewport.point(obj.x, obj.y)
+
+        middle = viewport.width // 2
+        top = viewport.height - 50
+        score_font = digit_font(FONT_NAME, max(1, round(25 * scale)))
+        self.left_score_counter.move(score_font, *viewport.point(middle - 40, top))
+        self.right_score_counter.move(score_font, *viewport.point(middle + 40, top))
+
+    def reset(self) -> None:
+        """Reset this screen. Useful for when a player has scored."""
+        self.match.reset()
+        self.interpolate = False
+        self.sync(1.0)
+
+    def sync(self, alpha: float) -> None:
+        """Copy the state of the match into the sprites and counters of this screen.
+        This is the only place sprites are written to, and sprites whose position has
+        not changed since they were last drawn are skipped, so vertex data is only
+        updated once per frame at most, no matter how many steps were simulated.
+
+        :param alpha: How far to place each sprite between the previous and the current
+            position of its object, from 0 to 1.
+        """
+        if not self.interpolate:
+            alpha = 1.0
+        viewport = self.game.viewport
+        scale = viewport.scale
+        for i, (obj, sprite) in enumerate(self.moving):
+            left = obj.x
+            bottom = obj.y
+            if alpha < 1.0:
+                left = self.previous_x[i] + (left - self.previous_x[i]) * alpha
+                bottom = self.previous_y[i] + (bottom - self.previous_y[i]) * alpha
+            left = viewport.x + left * scale
+            bottom = viewport.y + bottom * scale
+            if left != sprite.x or bottom != sprite.y:
+                sprite.position = left, bottom
+
+        self.left_score_counter.set(self.match.left_score)
+        self.right_score_counter.set(self.match.right_score)
+
+    def rewind(self, ticks: int) -> None:
+        """Return the match to the state it was in some ticks ago, or as far back as
+        the history goes. Play carries on from there. The controllers are left alone,
+        as the keys held now may not be the ones held then.
+
+        :param ticks: Number of ticks to go back.
+        """
+        self.tick = max(self.history.oldest, self.tick - ticks)
+        self.history.restore(self.tick, controls=False)
+        self.interpolate = False
+
+    @property
+    def static(self) -> bool:
+        """The game screen is static while paused, and once a replay has run out."""
+        replay = self.game.replay
+        return self.paused or bool(replay and self.tick >= replay.ticks)
+
+    def pause(self, paused: bool) -> None:
+        """Pause or resume the match.
+
+        :param paused: Whether the match should be paused.
+        """
+        self.paused = paused
+        self.paused_label.visible = paused
+
+    def on_key_press(self, symbol: int) -> None:
+        """Pause on P, unless playing over the network, and start rewinding on
+        backspace."""
+        if symbol == key.P and not self.session:
+            self.pause(not self.paused)
+        elif symbol == key.BACKSPACE:
+            self.rewinding = True
+
+    def on_key_release(self, symbol: int) -> None:
+        """Stop rewinding when backspace is released."""
+        if symbol == key.BACKSPACE:
+            self.rewinding = False
+
+    def on_draw(self) -> None:
+        """Draw this screen, interpolating between the last two simulation steps."""
+        self.sync(self.game.timestep.alpha)
+        super().on_draw()
+
+    def update(self, _: float) -> None:
+        """Update this screen. Called each tick. Only the simulation is advanced here;
+        sprites are left alone until the next frame is drawn."""
+        if self.paused:
+            return
+        replay = self.game.replay
+        rewindable = not (replay or self.recorder or self.session)
+        if rewindable and self.rewinding:
+            self.rewind(1)
+            return
+        if replay and self.tick >= replay.ticks:
+            return
+        # Computer players decide before the controls of the tick are recorded, or
+        # replaced by recorded ones. Over the network, the session polls them itself.
+        if not self.session:
+            self.match.poll()
+        if replay:
+            replay.apply(self.tick, self.game.controllers)
+        if self.recorder:
+            self.recorder.record()
+
+        scores = self.match.left_score, self.match.right_score
+        speed = self.match.ball.speed
+        for i, (obj, _sprite) in enumerate(self.moving):
+            self.previous_x[i] = obj.x
+            self.previous_y[i] = obj.y
+        if self.session:
+            if not self.session.advance():
+                return
+        else:
+            self.match.step()
+        self.tick += 1
+        self.history.save(self.tick)
+        # If the ball was reset, there is nothing to interpolate from
+        self.interpolate = (self.match.left_score, self.match.right_score) == scores
+        if self.game.telemetry:
+            self.report(self.game.telemetry, scores, speed)
+
+    def report(
+        self, telemetry: "Telemetry", scores: Tuple[int, int], speed: int
+    ) -> None:
+        """Emit the events of the last tick: a point and the rally before it, or else
+        any paddle hits and wall bounces.
+
+        :param telemetry: Telemetry to emit to.
+        :param scores: Left and right scores before the tick.
+        :param speed: Speed of the ball before the tick.
+        """
+        match = self.match
+        ball = match.ball
+        if (match.left_score, match.right_score) != scores:
+            telemetry.emit(
+                "point",
+                tick=self.tick,
+                side="left" if match.left_score != scores[0] else "right",
+                left_score=match.left_score,
+                right_score=match.right_score,
+            )
+            # The ball speeds up on every hit, and is reset when a point is scored
+            hits = (speed - Ball.initial_speed) // ball.acceleration
+            telemetry.emit("rally", tick=self.tick, hits=hits)
+            # The match resets itself after a point, without going through this screen
+            telemetry.emit("reset", tick=self.tick)
+            return
+
+        # A paddle hit speeds the ball up, and sends it back away from the paddle
+        side = "left" if math.cos(ball.direction) > 0 else "right"
+        for _ in range((ball.speed - speed) // ball.acceleration):
+            telemetry.emit(
+                "hit",
+                tick=self.tick,
+                side=side,
+                speed=ball.speed,
+                direction=ball.direction,
+            )
+        # Several bounces can happen within a tick, and would cancel out in the
+        # direction of the ball, so the ball counts them
+        for _ in range(ball.bounces):
+            telemetry.emit(
+                "bounce", tick=self.tick, speed=ball.speed, direction=ball.direction
+            )
@@ -0,0 +1,143 @@
+"""Cheap on-screen counters, such as scores, and other heads-up displays.
+
+A pyglet Label looks up its font and lays out its text again every time the text is
+changed. Counters only ever show digits, so the digit glyphs are rasterized once per
+font into the shared glyph texture, and changing the value of a counter just swaps the
+glyph region shown by each of a few sprites.
+"""
+from functools import lru_cache
+from time import perf_counter
+from typing import List, Optional
+
+from pyglet.font import load
+from pyglet.font.base import Glyph  # pylint: disable=E0611
+from pyglet.graphics import Batch
+from pyglet.sprite import Sprite
+from pyglet.text import Label
+from pyglet.window import Window
+
+from pong.profiler import FrameProfiler
+
+
+class DigitFont:
+    """The glyphs and metrics of the digits 0-9 in a single font."""
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, font_name: str, font_size: int) -> None:
+        font = load(font_name, font_size)
+        self.glyphs: List[Glyph] = font.get_glyphs("0123456789")
+        self.advance = max(glyph.advance for glyph in self.glyphs)
+        # Offset from the vertical center of a line of text to its baseline
+        self.baseline = -(font.ascent + font.descent) / 2
+
+
+# Fonts are sized to the window, so each resize can call for another size. Only the
+# most recently used sizes are kept.
+@lru_cache(maxsize=8)
+def digit_font(font_name: str, font_size: int) -> DigitFont:
+    """Get the digits of a font, rasterizing them the first time they are needed.
+
+    :param font_name: Name of the font.
+    :param font_size: Size of the font, in points.
+    :return: The digits of the font.
+    """
+    return DigitFont(font_name, font_size)
+
+
+class Counter:
+    """A non-negative number drawn centered on a point, from cached digit glyphs."""
+
+    # pylint: disable=invalid-name
+
+    def __init__(self, font: DigitFont, x: float, y: float, batch: Batch) -> None:
+        self.font = font
+        self.x = x
+        self.y = y
+        self.batch = batch
+        self.sprites: List[Sprite] = []
+        self.value: Optional[int] = None
+        self.set(0)
+
+    def set(self, value: int) -> None:
+        """Change the number shown. Does nothing if it has not changed.
+
+        :param value: New number to show.
+        """
+        if value == self.value:
+            return
+        self.value = value
+
+        digits = str(value)
+        while len(self.sprites) < len(digits):
+            self.sprites.append(Sprite(self.font.glyphs[0], batch=self.batch))
+
+        pen_x = self.x - len(digits) * self.font.advance / 2
+        baseline = self.y + self.font.baseline
+        for i, sprite in enumerate(self.sprites):
+            if i >= len(digits):
+                sprite.visible = False
+                continue
+            glyph = self.font.glyphs[int(digits[i])]
+            sprite.image = glyph
+            sprite.position = (
+                pen_x + i * self.font.advance + glyph.vertices[0],
+                baseline + glyph.vertices[1],
+            )
+            sprite.visible = True
+
+    def move(self, font: DigitFont, x: float, y: float) -> None:
+        """Change the font of the counter, and the point it is centered on.
+
+        :param font: New font.
+        :param x: New horizontal center.
+        :param y: New vertical center.
+        """
+        self.font = font
+        self.x = x
+        self.y = y
+        value = self.value
+        self.value = None
+        self.set(value or 0)
+
+
+class ProfilerOverlay:
+    """Shows a summary of a FrameProfiler in the top left corner of the window. The
+    text is only laid out again a few times per second, so that the overlay does not
+    distort the timings it shows."""
+
+    refresh_interval = 0.25
+
+    def __init__(self, profiler: FrameProfiler, window: Window) -> None:
+        self.profiler = profiler
+        self.batch = Batch()
+        self.label = Label(
+            "",
+            font_name="Courier New",
+            font_size=10,
+            x=10,
+            y=window.height - 10,
+            width=window.width - 20,
+            anchor_y="top",
+            multiline=True,
+            batch=self.batch,
+        )
+        self.refreshed = -self.refresh_interval
+
+    def layout(self, window: Window) -> None:
+        """Keep the overlay in the top left corner of a window that was resized.
+
+        :param window: The resized window.
+        """
+        self.label.begin_update()
+        self.label.y = window.height - 10
+        self.label.width = window.width - 20
+        self.label.end_update()
+
+    def draw(self) -> None:
+        """Draw the overlay, refreshing the summary if it is due."""
+        now = perf_counter()
+        if now - self.refreshed >= self.refresh_interval:
+            self.refreshed = now
+            self.label.text = self.profiler.summary()
+        self.batch.draw()
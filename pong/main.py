@@ -1,17 +1,206 @@
-"""Entry point for the application."""
-from pyglet.app import run
-from pyglet.window import Window
+"""Entry point for the application.
 
-from pong.game import Pong
-from pong.screens import TitleScreen
+Pyglet, and everything that draws, is only imported once it is known that a window is
+needed, so that commands that run headlessly, such as tournaments, work on machines
+without a display.
+"""
+import argparse
+from typing import TYPE_CHECKING, List, Optional
 
+from pong import STARTED, tournament
+from pong.profiler import StartupTimer, launch_time
 
-def main() -> None:
-    """Create the game object and starts the event loop."""
-    pong = Pong(Window(width=1024, height=768))
+if TYPE_CHECKING:
+    from pong.game import Pong  # pragma: no cover
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Create the game object and starts the event loop, or run a command.
+
+    :param argv: Command line arguments, or None to use those of the process.
+    """
+    parser = argparse.ArgumentParser(prog="pong")
+    parser.add_argument("--record", metavar="FILE", help="record each match to FILE")
+    parser.add_argument(
+        "--replay", metavar="FILE", help="watch a match recorded with --record"
+    )
+    parser.add_argument(
+        "--telemetry",
+        metavar="FILE",
+        help="append hits, bounces and points to FILE, as gzipped JSON lines",
+    )
+    parser.add_argument(
+        "--players",
+        type=int,
+        choices=(2, 3, 4),
+        default=2,
+        help="paddles in play, taking turns between sides (default: 2)",
+    )
+    parser.add_argument(
+        "--listen", metavar="PORT", type=int, help="play over UDP, on this port"
+    )
+    parser.add_argument(
+        "--peer", metavar="HOST:PORT", help="address of the other player, with --listen"
+    )
+    parser.add_argument(
+        "--side",
+        choices=("left", "right"),
+        default="left",
+        help="paddle this player controls, with --listen (default: left)",
+    )
+    parser.add_argument(
+        "--computer",
+        choices=("left", "right", "both"),
+        help="let the computer play one side, or both",
+    )
+    parser.add_argument(
+        "--reaction",
+        metavar="TICKS",
+        type=int,
+        default=10,
+        help="ticks the computer takes to react to a bounce (default: 10)",
+    )
+    parser.add_argument(
+        "--error",
+        metavar="PIXELS",
+        type=float,
+        default=20,
+        help="most the computer misjudges the ball by (default: 20)",
+    )
+    parser.add_argument(
+        "--window",
+        metavar="WxH",
+        help="initial size of the window (default: the size of the play area)",
+    )
+    parser.add_argument(
+        "--fullscreen", action="store_true", help="start fullscreen (toggle with F11)"
+    )
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="print how long startup took, once the first frame is drawn",
+    )
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    tournament.add_arguments(
+        commands.add_parser(
+            "tournament",
+            help="play computer players against each other, without a window",
+            description="Play computer players against each other, without a window.",
+        )
+    )
+    args = parser.parse_args(argv)
+    if args.command == "tournament":
+        tournament.run(args)
+        return
+    if (args.listen is None) != (args.peer is None):
+        parser.error("--listen and --peer must be given together")
+    if args.peer and (args.record or args.replay):
+        parser.error("--listen cannot be used with --record or --replay")
+    if args.peer and args.players != 2:
+        parser.error("--listen can only be used with 2 players")
+    if args.window:
+        try:
+            width, height = (int(size) for size in args.window.lower().split("x"))
+        except ValueError:
+            parser.error("--window must be given as WIDTHxHEIGHT, such as 1280x720")
+        if width <= 0 or height <= 0:
+            parser.error("--window must be given as WIDTHxHEIGHT, such as 1280x720")
+        args.window = (width, height)
+    play(args)
+
+
+def play(args: argparse.Namespace) -> None:
+    """Open the game window, and run the event loop until it is closed.
+
+    Only what the title screen needs is imported before its first frame is drawn.
+    Everything else is imported once it is known to be needed, or later still, by the
+    title screen itself.
+
+    :param args: Parsed command line arguments.
+    """
+    # pylint: disable=import-outside-toplevel
+    startup = StartupTimer(launch_time(STARTED)) if args.startup_report else None
+    if startup:
+        startup.mark("interpreter", STARTED)
+
+    from pyglet.app import run
+    from pyglet.window import Window
+
+    from pong.game import Pong
+
+    if startup:
+        startup.mark("imports")
+
+    # The play area is always the same size, however large the window is
+    replay = None
+    if args.replay:
+        from pong.replay import Replay
+
+        replay = Replay(args.replay)
+    width, height = (replay.width, replay.height) if replay else (1024, 768)
+    window_width, window_height = args.window or (width, height)
+    window = Window(
+        width=window_width,
+        height=window_height,
+        resizable=True,
+        fullscreen=args.fullscreen,
+    )
+    if startup:
+        startup.mark("window")
+
+    if replay:
+        pong = Pong(window, players=replay.controllers, width=width, height=height)
+        pong.replay = replay
+    else:
+        pong = Pong(window, players=args.players, width=width, height=height)
+        pong.record_path = args.record
+    pong.startup = startup
+    configure(pong, args)
     pong.load()
-    pong.set_screen(TitleScreen(pong))
+    if startup:
+        startup.mark("load")
+
+    if pong.replay or pong.transport:
+        from pong.game_screen import GameScreen
+
+        pong.show(GameScreen)
+    else:
+        from pong.screens import TitleScreen
+
+        pong.show(TitleScreen)
+    if startup:
+        startup.mark("first screen")
     run()
+    if pong.telemetry:
+        pong.telemetry.close()
+
+
+def configure(pong: "Pong", args: argparse.Namespace) -> None:
+    """Set up telemetry, network play and computer players, as the options ask.
+
+    :param pong: Game to set up, before it is loaded.
+    :param args: Parsed command line arguments.
+    """
+    # pylint: disable=import-outside-toplevel
+    if args.telemetry:
+        from pong.telemetry import Telemetry
+
+        pong.telemetry = Telemetry(args.telemetry)
+    if args.peer:
+        from pong.netplay import UdpTransport
+
+        host, port = args.peer.rsplit(":", 1)
+        pong.transport = UdpTransport(("", args.listen), (host, int(port)))
+        pong.side = 0 if args.side == "left" else 1
+    if args.computer:
+        from pong.ai import ComputerController
+
+        sides = {"left": [0], "right": [1], "both": [0, 1]}[args.computer]
+        for i in range(len(pong.controllers)):
+            if i % 2 in sides:
+                pong.controllers[i] = ComputerController(
+                    reaction_ticks=args.reaction, error=args.error, seed=i
+                )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,317 @@
+"""Networked play between two peers, with rollback.
+
+Each peer owns one controller, and simulates the whole match itself. Every tick, the
+local controls are sent to the other peer over UDP, and the match advances straight
+away, predicting that the remote player is still holding whatever they held on the last
+tick heard from them. When their real controls arrive and turn out to differ from the
+prediction, the match is rolled back to the tick they differ from (see RewindBuffer),
+and re-simulated up to the present with the real controls.
+
+Packets are never acknowledged individually. Instead, each one carries the local
+controls of every tick the other peer has not confirmed receiving yet, so a lost packet
+is made up for by the next one to arrive.
+
+Transports are pluggable, so that a SimulatedNetwork can add latency and packet loss in
+front of a real socket when testing.
+"""
+import heapq
+import random
+import socket
+import time
+from abc import abstractmethod
+from struct import Struct
+from typing import Callable, List, Tuple
+
+from pong.controller import Controller
+from pong.rewind import RewindBuffer
+from pong.simulation import Match
+
+# Next tick the sender needs from the receiver, first tick carried, number of ticks
+PACKET_HEADER = Struct("<IIB")
+MAX_PACKET_SIZE = 512
+# At most 255, as that is all a packet can carry
+MAX_ROLLBACK = 30
+
+Address = Tuple[str, int]
+
+
+class Transport:
+    """Abstract base class for ways of exchanging packets with the other peer."""
+
+    @abstractmethod
+    def send(self, packet: bytes) -> None:
+        """Send a packet to the other peer. Delivery is not guaranteed.
+
+        :param packet: Packet to send.
+        """
+
+    @abstractmethod
+    def receive(self) -> List[bytes]:
+        """Take every packet that has arrived from the other peer. Never blocks.
+
+        :return: Packets, in the order they arrived.
+        """
+
+
+class UdpTransport(Transport):
+    """Exchanges packets over a non-blocking UDP socket."""
+
+    def __init__(self, local: Address, peer: Address) -> None:
+        """
+        :param local: Address to receive packets on. Port 0 picks a free port.
+        :param peer: Address of the other peer.
+        """
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+        self.socket.bind(local)
+        self.peer = peer
+
+    @property
+    def address(self) -> Address:
+        """Address packets are received on."""
+        host, port = self.socket.getsockname()
+        return host, port
+
+    def send(self, packet: bytes) -> None:
+        """Send a packet to the other peer. Delivery is not guaranteed.
+
+        :param packet: Packet to send.
+        """
+        try:
+            self.socket.sendto(packet, self.peer)
+        except OSError:
+            # Nobody listening yet, or the network is unreachable. Whatever was in the
+            # packet is sent again with the next one.
+            pass
+
+    def receive(self) -> List[bytes]:
+        """Take every packet that has arrived from the other peer. Never blocks.
+
+        :return: Packets, in the order they arrived.
+        """
+        packets: List[bytes] = []
+        while True:
+            try:
+                packet, _ = self.socket.recvfrom(MAX_PACKET_SIZE)
+            except OSError:
+                return packets
+            packets.append(packet)
+
+    def close(self) -> None:
+        """Close the socket."""
+        self.socket.close()
+
+
+class SimulatedNetwork(Transport):
+    """Adds latency and packet loss to the packets sent through another transport."""
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        transport: Transport,
+        latency: float = 0.0,
+        loss: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+        seed: int = 0,
+    ) -> None:
+        """
+        :param transport: Transport to send packets through.
+        :param latency: Time each packet is held back before it is sent, in seconds.
+        :param loss: Fraction of packets that are dropped, from 0 to 1.
+        :param clock: Source of the current time, in seconds.
+        :param seed: Seed for choosing which packets are dropped.
+        """
+        self.transport = transport
+        self.latency = latency
+        self.loss = loss
+        self.clock = clock
+        self.random = random.Random(seed)
+        self.delayed: List[Tuple[float, int, bytes]] = []
+        self.sent = 0
+
+    def send(self, packet: bytes) -> None:
+        """Send a packet once the latency has passed, unless it is dropped.
+
+        :param packet: Packet to send.
+        """
+        self.sent += 1
+        if self.random.random() >= self.loss:
+            arrival = self.clock() + self.latency
+            heapq.heappush(self.delayed, (arrival, self.sent, packet))
+        self.flush()
+
+    def receive(self) -> List[bytes]:
+        """Take every packet that has arrived from the other peer. Never blocks.
+
+        :return: Packets, in the order they arrived.
+        """
+        self.flush()
+        return self.transport.receive()
+
+    def flush(self) -> None:
+        """Send the held back packets whose latency has passed."""
+        now = self.clock()
+        while self.delayed and self.delayed[0][0] <= now:
+            self.transport.send(heapq.heappop(self.delayed)[2])
+
+
+def encode(controller: Controller) -> int:
+    """The controls of a controller, as two bits: up, then down."""
+    return controller.player_up | controller.player_down << 1
+
+
+def decode(controls: int, controller: Controller) -> None:
+    """Set a controller to controls encoded by encode."""
+    controller.player_up = bool(controls & 1)
+    controller.player_down = bool(controls & 2)
+
+
+class RollbackSession:
+    """Keeps a match in step with the same match on another peer."""
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(
+        self,
+        match: Match,
+        side: int,
+        transport: Transport,
+        max_rollback: int = MAX_ROLLBACK,
+    ) -> None:
+        """
+        :param match: Match to run, before its first tick.
+        :param side: Index of the controller of the match that this peer owns. The
+            other peer must own the other one.
+        :param transport: Transport to the other peer.
+        :param max_rollback: Most ticks the match may run ahead of the last controls
+            heard from the other peer, or of the last local controls the other peer
+            has confirmed hearing. Once that far ahead, it waits for them.
+        """
+        self.match = match
+        self.local = match.controllers[side]
+        self.remote = match.controllers[1 - side]
+        self.transport = transport
+        self.max_rollback = max_rollback
+
+        # Ticks advanced so far. Snapshots are of the state before each tick.
+        self.tick = 0
+        self.history = RewindBuffer(match, max_rollback + 1)
+        self.history.save(0)
+
+        # Controls of recent ticks, indexed by tick modulo the capacity
+        capacity = max_rollback + 1
+        self.local_controls = bytearray(capacity)
+        self.remote_controls = bytearray(capacity)
+        self.simulated_controls = bytearray(capacity)
+        self.capacity = capacity
+
+        # Every remote tick before this one has been received
+        self.confirmed = 0
+        # Every local tick before this one has been received by the other peer
+        self.acknowledged = 0
+
+        self.rollbacks = 0
+        self.resimulated = 0
+
+    @property
+    def stalled(self) -> bool:
+        """Whether the match is too far ahead of the other peer to advance. Local
+        controls the other peer has not confirmed must all still fit in a packet, and
+        in the window of controls that is kept."""
+        return self.tick - min(self.confirmed, self.acknowledged) >= self.max_rollback
+
+    def advance(self) -> bool:
+        """Exchange controls with the other peer, roll back if a prediction turned out
+        wrong, then advance the match by one tick unless it is stalled. Should be
+        called once per tick.
+
+        :return: Whether the match advanced.
+        """
+        controls = encode(self.local)
+        mispredicted = self.receive()
+        if mispredicted < self.tick:
+            self.rollback(mispredicted)
+            # Re-simulating leaves the local controller holding older controls
+            decode(controls, self.local)
+
+        advanced = not self.stalled
+        if advanced:
+            # A computer player decides on the present state of the match, and what it
+            # decides is sent like any other controls. Re-simulating only replays them,
+            # so it never needs to poll again.
+            self.local.poll(self.match)
+            controls = encode(self.local)
+            self.local_controls[self.tick % self.capacity] = controls
+            self.simulate(self.tick)
+            self.tick += 1
+
+        self.send()
+        return advanced
+
+    def receive(self) -> int:
+        """Take the controls the other peer has sent.
+
+        :return: The earliest tick whose controls were mispredicted, or the current
+            tick if there were none.
+        """
+        mispredicted = self.tick
+        header = PACKET_HEADER.size
+        for packet in self.transport.receive():
+            if len(packet) < header:
+                continue
+            acknowledged, first, count = PACKET_HEADER.unpack_from(packet)
+            self.acknowledged = max(self.acknowledged, acknowledged)
+            controls = packet[header:][:count]
+            # Only ticks that follow on from the ones already received, and are not
+            # ahead of this peer, are taken. Any others will be sent again.
+            for tick in range(max(first, self.confirmed), first + len(controls)):
+                if tick != self.confirmed or tick > self.tick:
+                    break
+                received = controls[tick - first]
+                slot = tick % self.capacity
+                self.remote_controls[slot] = received
+                self.confirmed += 1
+                if tick < self.tick and received != self.simulated_controls[slot]:
+                    mispredicted = min(mispredicted, tick)
+        return mispredicted
+
+    def send(self) -> None:
+        """Send the local controls of every tick the other peer has not confirmed."""
+        ticks = range(self.acknowledged, self.tick)
+        controls = bytes(self.local_controls[tick % self.capacity] for tick in ticks)
+        self.transport.send(
+            PACKET_HEADER.pack(self.confirmed, self.acknowledged, len(controls))
+            + controls
+        )
+
+    def predict(self, tick: int) -> int:
+        """The remote controls of a tick: the real ones if they have been received,
+        otherwise the last ones that were."""
+        if tick < self.confirmed:
+            return self.remote_controls[tick % self.capacity]
+        if self.confirmed:
+            return self.remote_controls[(self.confirmed - 1) % self.capacity]
+        return 0
+
+    def simulate(self, tick: int) -> None:
+        """Run a single tick of the match, and save the state it leaves the match in.
+
+        :param tick: Tick to run.
+        """
+        remote = self.predict(tick)
+        self.simulated_controls[tick % self.capacity] = remote
+        decode(self.local_controls[tick % self.capacity], self.local)
+        decode(remote, self.remote)
+        self.match.step()
+        self.history.save(tick + 1)
+
+    def rollback(self, tick: int) -> None:
+        """Return the match to the state before a tick, and run it again from there up
+        to the present.
+
+        :param tick: First tick to run again.
+        """
+        self.rollbacks += 1
+        self.history.restore(tick, controls=False)
+        for resimulated in range(tick, self.tick):
+            self.simulate(resimulated)
+        self.resimulated += self.tick - tick
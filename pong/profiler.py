@@ -0,0 +1,220 @@
+"""Frame timing instrumentation.
+
+The FrameProfiler records, for each frame, how long the simulation steps took, how many
+of them were run, how long drawing took, and how late the frame was compared to the
+interval it was scheduled at. Everything is kept in fixed-size ring buffers, so that
+profiling can be left running indefinitely, and can be summarized as percentiles or
+exported as a Chrome trace (chrome://tracing, or https://ui.perfetto.dev).
+
+The StartupTimer records how long each phase of startup took, from the launch of the
+process to the first frame drawn, which is as long as the window stays black.
+"""
+import json
+import os
+from array import array
+from collections import deque
+from time import perf_counter
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+
+class RingBuffer:
+    """A fixed number of floats. Once full, each new value replaces the oldest."""
+
+    def __init__(self, capacity: int) -> None:
+        self.values = array("d", [0.0]) * capacity
+        self.capacity = capacity
+        self.count = 0
+        self.index = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, value: float) -> None:
+        """Add a value, replacing the oldest if the buffer is full.
+
+        :param value: Value to add.
+        """
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def __iter__(self) -> Iterator[float]:
+        """Iterate over the values, from oldest to newest."""
+        start = self.index - self.count
+        for i in range(start, self.index):
+            yield self.values[i % self.capacity]
+
+    def percentile(self, percent: float) -> float:
+        """The value below which some percentage of the values fall.
+
+        :param percent: Percentage, from 0 to 100.
+        :return: The percentile, or 0 if the buffer is empty.
+        """
+        if not self.count:
+            return 0.0
+        ordered = sorted(self)
+        rank = min(self.count - 1, int(percent / 100 * self.count))
+        return ordered[rank]
+
+
+class FrameProfiler:
+    """Records the timing of recent frames. Does nothing until it is enabled."""
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, requested_interval: float, capacity: int = 600) -> None:
+        """
+        :param requested_interval: Interval frames are scheduled at, in seconds.
+        :param capacity: Number of frames to remember.
+        """
+        self.requested_interval = requested_interval
+        self.enabled = False
+
+        self.simulation_start = RingBuffer(capacity)
+        self.simulation_time = RingBuffer(capacity)
+        self.ticks = RingBuffer(capacity)
+        self.jitter = RingBuffer(capacity)
+        self.draw_start = RingBuffer(capacity)
+        self.draw_time = RingBuffer(capacity)
+        self.transitions: Deque[Tuple[float, str]] = deque(maxlen=capacity)
+
+        self._simulation_started = 0.0
+        self._draw_started = 0.0
+
+    def toggle(self) -> None:
+        """Turn recording on or off."""
+        self.enabled = not self.enabled
+
+    def begin_simulation(self, delta_time: float) -> None:
+        """Called at the start of a frame, before any simulation steps run.
+
+        :param delta_time: Real time passed since the last frame.
+        """
+        self._simulation_started = perf_counter()
+        self.jitter.append(delta_time - self.requested_interval)
+
+    def end_simulation(self, ticks: int) -> None:
+        """Called once the simulation steps for a frame have run.
+
+        :param ticks: Number of simulation steps run.
+        """
+        self.simulation_start.append(self._simulation_started)
+        self.simulation_time.append(perf_counter() - self._simulation_started)
+        self.ticks.append(ticks)
+
+    def begin_draw(self) -> None:
+        """Called before a frame is drawn."""
+        self._draw_started = perf_counter()
+
+    def end_draw(self) -> None:
+        """Called after a frame is drawn."""
+        self.draw_start.append(self._draw_started)
+        self.draw_time.append(perf_counter() - self._draw_started)
+
+    def transition(self, name: str) -> None:
+        """Record that the active screen changed.
+
+        :param name: Name of the new screen.
+        """
+        self.transitions.append((perf_counter(), name))
+
+    def summary(self) -> str:
+        """Percentiles of the recorded timings, for display."""
+        lines = []
+        for name, buffer, scale, unit in (
+            ("sim", self.simulation_time, 1000, "ms"),
+            ("draw", self.draw_time, 1000, "ms"),
+            ("ticks", self.ticks, 1, ""),
+            ("jitter", self.jitter, 1000, "ms"),
+        ):
+            percentiles = "  ".join(
+                f"p{percent} {buffer.percentile(percent) * scale:6.2f}{unit}"
+                for percent in (50, 95, 99)
+            )
+            lines.append(f"{name:>6}  {percentiles}")
+        return "\n".join(lines)
+
+    def trace(self) -> Dict[str, List[Dict[str, Any]]]:
+        """The recorded frames as a Chrome trace."""
+        events: List[Dict[str, Any]] = []
+
+        def complete(name: str, start: float, duration: float, **args: Any) -> None:
+            events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": start * 1e6,
+                    "dur": duration * 1e6,
+                    "pid": 0,
+                    "tid": 0,
+                    "args": args,
+                }
+            )
+
+        for start, duration, ticks, jitter in zip(
+            self.simulation_start, self.simulation_time, self.ticks, self.jitter
+        ):
+            complete("simulate", start, duration, ticks=ticks, jitter=jitter)
+        for start, duration in zip(self.draw_start, self.draw_time):
+            complete("draw", start, duration)
+        for start, name in self.transitions:
+            events.append(
+                {"name": name, "ph": "i", "s": "g", "ts": start * 1e6, "pid": 0}
+            )
+        return {"traceEvents": events}
+
+    def export(self, path: str) -> None:
+        """Write the recorded frames to a Chrome trace file.
+
+        :param path: File to write.
+        """
+        with open(path, "w") as trace:
+            json.dump(self.trace(), trace)
+
+
+def launch_time(fallback: float) -> float:
+    """The time the process was launched at, on the perf_counter clock. Only Linux
+    says, to the nearest hundredth of a second; elsewhere a fallback is used.
+
+    :param fallback: Time to use if the launch time is not known.
+    """
+    try:
+        with open("/proc/self/stat") as stat:
+            # Fields after the command, which may itself contain spaces
+            fields = stat.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as uptime:
+            now = float(uptime.read().split()[0])
+    except OSError:
+        return fallback
+    age = now - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    return min(fallback, perf_counter() - max(age, 0.0))
+
+
+class StartupTimer:
+    """Records when each phase of startup ended."""
+
+    def __init__(self, launched: float) -> None:
+        """
+        :param launched: Time the process was launched at, on the perf_counter clock.
+        """
+        self.phases: List[Tuple[str, float]] = [("launch", launched)]
+
+    def mark(self, phase: str, ended: Optional[float] = None) -> None:
+        """Record that a phase of startup has ended.
+
+        :param phase: Name of the phase.
+        :param ended: Time it ended at, if not now.
+        """
+        self.phases.append((phase, perf_counter() if ended is None else ended))
+
+    def report(self) -> str:
+        """How long each phase took, and the time since launch at its end."""
+        lines = [f"{'startup':<14} {'phase':>8} {'total':>8}"]
+        launched = previous = self.phases[0][1]
+        for phase, ended in self.phases[1:]:
+            lines.append(
+                f"{phase:<14} {(ended - previous) * 1000:6.1f}ms "
+                f"{(ended - launched) * 1000:6.1f}ms"
+            )
+            previous = ended
+        return "\n".join(lines)
@@ -0,0 +1,268 @@
+"""Software rendering of matches into NumPy arrays.
+
+A Rasterizer draws a Match the way GameScreen shows it, every object as a solid white
+rectangle and the scores near the top, but into a uint8 array instead of a window, so
+it needs neither OpenGL nor a display. Frames can be rendered at a fraction of the size
+of the play area, and in grayscale, for use as pixel observations.
+
+The frame is allocated once, and drawn over each time a match is rendered. Only the
+rectangles drawn into the last frame are cleared, so the cost of a frame depends on the
+size of the objects, not on the size of the frame.
+
+A VideoWriter streams frames as raw video, one after the other with no header, which
+ffmpeg can encode. Recordings can be rendered this way without a window:
+
+``python -m pong.raster match.pong - | ffmpeg -f rawvideo -pix_fmt rgb24 -s 1024x768
+-r 100 -i - match.mp4``
+"""
+import argparse
+import math
+import sys
+from typing import BinaryIO, List, Optional, Tuple
+
+import numpy as np
+
+from pong.controller import Controller
+from pong.replay import Replay
+from pong.simulation import Match
+
+# The digits 0-9, as 3x5 cells
+DIGITS = [
+    ("111", "101", "101", "101", "111"),
+    ("010", "110", "010", "010", "111"),
+    ("111", "001", "111", "100", "111"),
+    ("111", "001", "111", "001", "111"),
+    ("101", "101", "111", "001", "001"),
+    ("111", "100", "111", "001", "111"),
+    ("111", "100", "111", "101", "111"),
+    ("111", "001", "001", "001", "001"),
+    ("111", "101", "111", "101", "111"),
+    ("111", "101", "111", "001", "111"),
+]
+# Size of a digit cell at full scale, so that digits are as tall as the score font
+DIGIT_CELL = 5
+# Offset of the center of each score from the top middle of the play area, as drawn by
+# GameScreen
+SCORE_OFFSET_X = 40
+SCORE_OFFSET_Y = 50
+WHITE = 255
+
+# Top row, bottom row, left column and right column of a rectangle of pixels
+Rect = Tuple[int, int, int, int]
+
+
+class Rasterizer:
+    """Draws matches into a single reused frame."""
+
+    # pylint: disable=invalid-name,too-many-instance-attributes
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        width: int,
+        height: int,
+        scale: float = 1.0,
+        grayscale: bool = False,
+        scores: bool = True,
+    ) -> None:
+        """
+        :param width: Width of the play area of the matches to draw.
+        :param height: Height of the play area of the matches to draw.
+        :param scale: Size of the frame, relative to the play area.
+        :param grayscale: Whether the frame has a single channel, rather than three.
+        :param scores: Whether to draw the scores.
+        """
+        self.scale = scale
+        self.play_width = width
+        self.play_height = height
+        self.width = max(1, round(width * scale))
+        self.height = max(1, round(height * scale))
+        self.grayscale = grayscale
+        self.scores = scores
+        shape = (self.height, self.width) if grayscale else (self.height, self.width, 3)
+        self.frame = np.zeros(shape, dtype=np.uint8)
+        # Rectangles drawn into the frame, to be cleared before the next one
+        self.dirty: List[Rect] = []
+
+        cell = max(1, round(DIGIT_CELL * scale))
+        block = np.ones((cell, cell), dtype=bool)
+        self.digits = [
+            np.kron(np.array([[c == "1" for c in row] for row in rows]), block)
+            for rows in DIGITS
+        ]
+        self.digit_advance = 4 * cell
+
+    def rect(self, x: float, y: float, width: float, height: float) -> Rect:
+        """The pixels a rectangle of the play area touches, clipped to the frame. Even
+        the smallest object touches at least one pixel, so that nothing disappears from
+        a downscaled frame.
+
+        :param x: Left edge of the rectangle.
+        :param y: Bottom edge of the rectangle. The play area is y-up, and the frame is
+            not, so this is flipped.
+        :param width: Width of the rectangle.
+        :param height: Height of the rectangle.
+        """
+        scale = self.scale
+        left = math.floor(x * scale)
+        right = math.ceil((x + width) * scale)
+        top = math.floor((self.play_height - y - height) * scale)
+        bottom = math.ceil((self.play_height - y) * scale)
+        return (
+            min(max(top, 0), self.height),
+            min(max(bottom, 0), self.height),
+            min(max(left, 0), self.width),
+            min(max(right, 0), self.width),
+        )
+
+    def render(self, match: Match) -> np.ndarray:
+        """Draw the current state of a match.
+
+        :param match: Match to draw. Its play area must be the size given to the
+            rasterizer.
+        :return: The frame, with one row per line of pixels from the top. The same
+            array is returned every time, and is overwritten by the next call.
+        """
+        frame = self.frame
+        for top, bottom, left, right in self.dirty:
+            frame[top:bottom, left:right] = 0
+        dirty = []
+        for obj in match.game_objects:
+            top, bottom, left, right = rect = self.rect(
+                obj.x, obj.y, obj.width, obj.height
+            )
+            frame[top:bottom, left:right] = WHITE
+            dirty.append(rect)
+        self.dirty = dirty
+
+        if self.scores:
+            middle = self.play_width / 2
+            height = self.play_height - SCORE_OFFSET_Y
+            self.number(match.left_score, middle - SCORE_OFFSET_X, height)
+            self.number(match.right_score, middle + SCORE_OFFSET_X, height)
+        return frame
+
+    def number(self, value: int, x: float, y: float) -> None:
+        """Draw a non-negative number centered on a point. Digits that would not fit
+        entirely in the frame are left out.
+
+        :param value: Number to draw.
+        :param x: Horizontal center of the number, in the play area.
+        :param y: Vertical center of the number, in the play area.
+        """
+        text = str(value)
+        glyph_height, glyph_width = self.digits[0].shape
+        advance = self.digit_advance
+        left = round(x * self.scale) - (len(text) * advance - advance // 4) // 2
+        top = round((self.play_height - y) * self.scale) - glyph_height // 2
+        bottom = top + glyph_height
+        if top < 0 or bottom > self.height:
+            return
+        for i, digit in enumerate(text):
+            start = left + i * advance
+            end = start + glyph_width
+            if start < 0 or end > self.width:
+                continue
+            self.frame[top:bottom, start:end][self.digits[int(digit)]] = WHITE
+            self.dirty.append((top, bottom, start, end))
+
+
+class VideoWriter:
+    """Writes frames, one after the other, as raw video."""
+
+    def __init__(self, stream: BinaryIO) -> None:
+        """
+        :param stream: File or pipe to write to.
+        """
+        self.stream = stream
+        self.frames = 0
+
+    def write(self, frame: np.ndarray) -> None:
+        """Write a frame, without copying it.
+
+        :param frame: Frame returned by a Rasterizer.
+        """
+        self.stream.write(np.ascontiguousarray(frame).data)
+        self.frames += 1
+
+    @staticmethod
+    def ffmpeg_input(rasterizer: Rasterizer, rate: float) -> List[str]:
+        """ffmpeg options to read the frames of a rasterizer from a raw video stream.
+
+        :param rasterizer: Rasterizer the frames come from.
+        :param rate: Frames per second.
+        """
+        return [
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "gray" if rasterizer.grayscale else "rgb24",
+            "-s",
+            f"{rasterizer.width}x{rasterizer.height}",
+            "-r",
+            f"{rate:g}",
+        ]
+
+
+def render_replay(
+    replay: Replay, rasterizer: Rasterizer, writer: VideoWriter, every: int = 1
+) -> None:
+    """Play a recording headlessly, and write its frames.
+
+    :param replay: Recording to play.
+    :param rasterizer: Rasterizer, for the size of the play area of the recording.
+    :param writer: Writer for the frames.
+    :param every: Ticks per frame written. The first frame is the match before its
+        first tick.
+    """
+    controllers = [Controller(0, 0) for _ in range(replay.controllers)]
+    match = replay.match(controllers)
+    writer.write(rasterizer.render(match))
+    for tick in range(replay.ticks):
+        replay.apply(tick, controllers)
+        match.update()
+        if (tick + 1) % every == 0:
+            writer.write(rasterizer.render(match))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Render a recording to raw video.
+
+    :param argv: Command line arguments, or None to use those of the process.
+    """
+    parser = argparse.ArgumentParser(prog="python -m pong.raster")
+    parser.add_argument("recording", help="file written with pong --record")
+    parser.add_argument("output", help="file to write raw video to, or - for stdout")
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="size of the video (default: 1)"
+    )
+    parser.add_argument("--grayscale", action="store_true", help="one channel only")
+    parser.add_argument(
+        "--every",
+        metavar="TICKS",
+        type=int,
+        default=1,
+        help="ticks per frame, at 100 ticks a second (default: 1)",
+    )
+    args = parser.parse_args(argv)
+
+    replay = Replay(args.recording)
+    rasterizer = Rasterizer(replay.width, replay.height, args.scale, args.grayscale)
+    if args.output == "-":
+        writer = VideoWriter(sys.stdout.buffer)
+        render_replay(replay, rasterizer, writer, args.every)
+        sys.stdout.flush()
+    else:
+        with open(args.output, "wb") as output:
+            writer = VideoWriter(output)
+            render_replay(replay, rasterizer, writer, args.every)
+    replay.close()
+    options = " ".join(VideoWriter.ffmpeg_input(rasterizer, 100 / args.every))
+    print(
+        f"{writer.frames} frames. Encode with: ffmpeg {options} -i {args.output} "
+        "match.mp4",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()  # pragma: no cover
@@ -0,0 +1,222 @@
+"""Recording and replay of player input.
+
+A match is fully determined by the size of its play area, the size of its ball, and the
+state of every controller on every tick, so that is all a recording holds. The file
+starts with a fixed header, followed by the controls of each tick, two bits per
+controller (up, then down), packed into as few bytes as possible and appended as the
+match is played. Two controllers take four bits a tick, so an hour of play at 100 ticks
+a second fits in under 200KB.
+
+Replays read the file through a memory map, so only the pages being replayed are ever
+loaded. A replay can be fed into a GameScreen to watch it at real time, or run through
+a headless Match as fast as the CPU allows:
+
+``python -m pong.replay FILE``
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import BinaryIO, List, Optional, Sequence, Tuple
+
+from pong.controller import Controller
+from pong.simulation import Match
+
+MAGIC = b"PONG"
+VERSION = 1
+# Magic, version, controllers, flags, width, height, ball size, ticks
+HEADER = struct.Struct("<4sBBBHHHQ")
+CONTINUOUS = 1
+BITS_PER_CONTROLLER = 2
+
+
+def ticks_per_byte(controllers: int) -> int:
+    """Number of ticks packed into each byte of a recording.
+
+    :param controllers: Number of controllers recorded.
+    :return: Ticks per byte.
+    """
+    if not 0 < controllers * BITS_PER_CONTROLLER <= 8:
+        raise ValueError(f"Cannot record {controllers} controllers")
+    return 8 // (controllers * BITS_PER_CONTROLLER)
+
+
+class InputRecorder:
+    """Records the controls of a match, one tick at a time, to a file."""
+
+    def __init__(
+        self, path: str, match: Match, controllers: Sequence[Controller]
+    ) -> None:
+        """
+        :param path: File to write. Replaced if it already exists.
+        :param match: Match being recorded, before its first tick.
+        :param controllers: Controllers of the match, in the order it was given them.
+        """
+        self.controllers = controllers
+        self.ticks_per_byte = ticks_per_byte(len(controllers))
+        self.header = (
+            MAGIC,
+            VERSION,
+            len(controllers),
+            CONTINUOUS if match.continuous else 0,
+            match.width,
+            match.height,
+            match.ball.width,
+        )
+        self.ticks = 0
+        self.pending = 0
+        self.file: Optional[BinaryIO] = open(path, "wb")
+        # The tick count is filled in on close. Until then it is 0, and readers count
+        # the complete bytes instead, so a recording cut short is still usable.
+        self.file.write(HEADER.pack(*self.header, 0))
+
+    def record(self) -> None:
+        """Record the current state of the controllers, as the controls of the next
+        tick. Should be called once per tick, before the match is updated."""
+        controls = 0
+        for i, controller in enumerate(self.controllers):
+            bits = controller.player_up | controller.player_down << 1
+            controls |= bits << i * BITS_PER_CONTROLLER
+
+        slot = self.ticks % self.ticks_per_byte
+        self.pending |= controls << slot * BITS_PER_CONTROLLER * len(self.controllers)
+        self.ticks += 1
+        if slot == self.ticks_per_byte - 1 and self.file:
+            self.file.write(bytes((self.pending,)))
+            self.pending = 0
+
+    def close(self) -> None:
+        """Write any partly filled byte and the tick count, and close the file. Does
+        nothing if the recorder is already closed."""
+        if not self.file:
+            return
+        if self.ticks % self.ticks_per_byte:
+            self.file.write(bytes((self.pending,)))
+        self.file.seek(0)
+        self.file.write(HEADER.pack(*self.header, self.ticks))
+        self.file.close()
+        self.file = None
+
+
+class Replay:
+    """A recording, opened for replay."""
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: File written by an InputRecorder.
+        """
+        with open(path, "rb") as recording:
+            if os.fstat(recording.fileno()).st_size < HEADER.size:
+                raise ValueError(f"{path} is not a recording")
+            self.data = mmap.mmap(recording.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            magic,
+            version,
+            controllers,
+            flags,
+            self.width,
+            self.height,
+            self.ball_size,
+            ticks,
+        ) = HEADER.unpack_from(self.data)
+        self.controllers: int = controllers
+        if magic != MAGIC or version != VERSION:
+            self.data.close()
+            raise ValueError(f"{path} is not a version {VERSION} recording")
+        self.continuous = bool(flags & CONTINUOUS)
+
+        self.ticks_per_byte = ticks_per_byte(self.controllers)
+        self.ticks = ticks or (len(self.data) - HEADER.size) * self.ticks_per_byte
+
+        # The up and down state of every controller, for each possible tick value
+        bits = BITS_PER_CONTROLLER * self.controllers
+        self.decoded: List[Tuple[Tuple[bool, bool], ...]] = [
+            tuple(
+                (
+                    bool(value >> i * BITS_PER_CONTROLLER & 1),
+                    bool(value >> i * BITS_PER_CONTROLLER & 2),
+                )
+                for i in range(self.controllers)
+            )
+            for value in range(1 << bits)
+        ]
+        self.mask: int = (1 << bits) - 1
+
+    def controls(self, tick: int) -> Tuple[Tuple[bool, bool], ...]:
+        """The recorded controls of a tick.
+
+        :param tick: Index of the tick, from 0.
+        :return: Whether up and down were held, for each controller.
+        """
+        byte = self.data[HEADER.size + tick // self.ticks_per_byte]
+        shift = tick % self.ticks_per_byte * BITS_PER_CONTROLLER * self.controllers
+        return self.decoded[byte >> shift & self.mask]
+
+    def apply(self, tick: int, controllers: Sequence[Controller]) -> None:
+        """Set controllers to the recorded controls of a tick.
+
+        :param tick: Index of the tick, from 0.
+        :param controllers: Controllers to set, in the order they were recorded.
+        """
+        for controller, (player_up, player_down) in zip(
+            controllers, self.controls(tick)
+        ):
+            controller.player_up = player_up
+            controller.player_down = player_down
+
+    def match(self, controllers: Sequence[Controller]) -> Match:
+        """A new match, set up the same way as the recorded one.
+
+        :param controllers: Controllers for the match.
+        :return: The match, before its first tick.
+        """
+        return Match(
+            self.width,
+            self.height,
+            controllers,
+            ball_size=self.ball_size,
+            continuous=self.continuous,
+        )
+
+    def run(self) -> Match:
+        """Replay every tick without drawing anything, as fast as possible.
+
+        :return: The match, after its last tick.
+        """
+        controllers = [Controller(0, 0) for _ in range(self.controllers)]
+        match = self.match(controllers)
+        for tick in range(self.ticks):
+            self.apply(tick, controllers)
+            match.update()
+        return match
+
+    def close(self) -> None:
+        """Unmap the recording."""
+        self.data.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Replay a recording headlessly, and print the final score.
+
+    :param argv: Command line arguments, or None to use those of the process.
+    """
+    parser = argparse.ArgumentParser(prog="python -m pong.replay")
+    parser.add_argument("recording", help="file written with pong --record")
+    args = parser.parse_args(argv)
+
+    replay = Replay(args.recording)
+    start = time.perf_counter()
+    match = replay.run()
+    elapsed = time.perf_counter() - start
+    replay.close()
+    print(f"{match.left_score} - {match.right_score}")
+    print(f"{replay.ticks} ticks in {elapsed:.3f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()  # pragma: no cover
@@ -0,0 +1,58 @@
+"""A history of recent match states, for rewinding and re-simulating.
+
+Snapshots of a Match are written into a single preallocated buffer, one slot per tick,
+wrapping around once it is full. Saving the state of a tick never allocates, and only
+the most recent ticks are kept, however long the match runs.
+"""
+from pong.simulation import Match
+
+
+class RewindBuffer:
+    """The snapshots of a match for a fixed number of consecutive ticks."""
+
+    def __init__(self, match: Match, capacity: int) -> None:
+        """
+        :param match: Match to save and restore.
+        :param capacity: Number of ticks to keep.
+        """
+        self.match = match
+        self.capacity = capacity
+        self.size = match.snapshot_size
+        self.buffer = bytearray(capacity * self.size)
+        # Ticks that have a snapshot. Empty while newest is less than oldest.
+        self.oldest = 0
+        self.newest = -1
+
+    def __len__(self) -> int:
+        return self.newest - self.oldest + 1
+
+    def __contains__(self, tick: int) -> bool:
+        return self.oldest <= tick <= self.newest
+
+    def clear(self) -> None:
+        """Forget every snapshot."""
+        self.oldest = 0
+        self.newest = -1
+
+    def save(self, tick: int) -> None:
+        """Save the current state of the match as the state of a tick. Saving a tick
+        that is already held forgets every tick after it, as they are now in the
+        future of a different past.
+
+        :param tick: Tick the match is at.
+        """
+        if tick not in self and tick != self.newest + 1:
+            self.oldest = tick
+        self.newest = tick
+        self.oldest = max(self.oldest, tick - self.capacity + 1)
+        self.match.snapshot_into(self.buffer, tick % self.capacity * self.size)
+
+    def restore(self, tick: int, controls: bool = True) -> None:
+        """Return the match to the state it was in at a tick.
+
+        :param tick: Tick to return to. Must be held in the buffer.
+        :param controls: Whether to restore the state of the controllers too.
+        """
+        if tick not in self:
+            raise IndexError(f"Tick {tick} is not in the rewind buffer")
+        self.match.restore(self.buffer, tick % self.capacity * self.size, controls)
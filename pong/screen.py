@@ -0,0 +1,143 @@
+"""Base class for application screens.
+
+A Screen is a logical collection of objects and business logic that work together to
+form one "scene" of the game. A screen must construct its objects, and contain rules
+for drawing and updating them each time the application ticks.
+
+Screens can be switched on the fly by the main application object, to which each Screen
+has a reference. Screens are constructed once and then reused: each time a screen is
+shown its enter method is called, and each time it is replaced its exit method is.
+
+Screens are laid out in the logical coordinates of the game's Viewport, and scaled to
+the window when they are drawn. Whenever the scale may have changed, the layout method
+of the active screen is called.
+
+The screens themselves live in other modules, which import this one: the title screen
+in screens, and the screen matches are played on in game_screen.
+"""
+from abc import abstractmethod
+from typing import TYPE_CHECKING, List, Tuple
+
+from pyglet.graphics import Batch
+from pyglet.text import DocumentLabel
+from pyglet.text.document import UnformattedDocument  # pylint: disable=E0611
+
+if TYPE_CHECKING:
+    # Only for annotations: the game imports screens itself
+    # pylint: disable=cyclic-import
+    from pong.game import Pong  # pragma: no cover
+
+FONT_NAME = "Times New Roman"
+
+
+class Screen:
+    """Abstract base class for other Screens."""
+
+    # pylint: disable=invalid-name
+
+    def __init__(self, game: "Pong") -> None:
+        self.game = game
+        self.batch = Batch()
+        # Labels made with label, with the logical position and font size of each
+        self.labels: List[Tuple[DocumentLabel, float, float, float]] = []
+
+    def enter(self) -> None:
+        """Called each time this screen becomes the active screen."""
+
+    def exit(self) -> None:
+        """Called each time this screen stops being the active screen."""
+
+    def layout(self) -> None:
+        """Called each time this screen is shown, and when the window is resized while
+        it is active, to fit everything on it to the viewport. Subclasses that lay out
+        more than their labels should call this too."""
+        for label, x, y, font_size in self.labels:
+            self.place(label, x, y, font_size)
+
+    def label(self, text: str, x: float, y: float, font_size: float) -> DocumentLabel:
+        """Make a label centered on a logical position, and keep it there each time the
+        screen is laid out.
+
+        A pyglet Label lays its text out in the default font first, rendering glyphs
+        that are never drawn, and only then in the font it was given. Here the font is
+        set on the document before the label is made, so the text is laid out once.
+
+        :param text: Text of the label.
+        :param x: Logical horizontal position.
+        :param y: Logical vertical position.
+        :param font_size: Logical size of the font, in points.
+        :return: The label.
+        """
+        viewport = self.game.viewport
+        document = UnformattedDocument(text)
+        document.set_style(
+            0,
+            len(text),
+            {
+                "font_name": FONT_NAME,
+                "font_size": font_size * viewport.scale,
+                "color": (255, 255, 255, 255),
+            },
+        )
+        window_x, window_y = viewport.point(x, y)
+        label = DocumentLabel(
+            document,
+            window_x,
+            window_y,
+            anchor_x="center",
+            anchor_y="center",
+            batch=self.batch,
+        )
+        self.labels.append((label, x, y, font_size))
+        return label
+
+    def place(self, label: DocumentLabel, x: float, y: float, font_size: float) -> None:
+        """Move a label to a logical position, and scale its font to match. Does
+        nothing if it is already there, as changing the font lays out the text again.
+
+        :param label: Label to move.
+        :param x: Logical horizontal position.
+        :param y: Logical vertical position.
+        :param font_size: Logical size of the font, in points.
+        """
+        viewport = self.game.viewport
+        font_size *= viewport.scale
+        x, y = viewport.point(x, y)
+        if (label.font_size, label.x, label.y) == (font_size, x, y):
+            return
+        label.begin_update()
+        label.font_size = font_size
+        label.x, label.y = x, y
+        label.end_update()
+
+    @property
+    def static(self) -> bool:
+        """Whether nothing on this screen will change until a key is pressed, so that
+        the game can stop ticking."""
+        return False
+
+    def on_key_press(self, symbol: int) -> None:
+        """Called when a key is pressed while this is the active screen.
+
+        :param symbol: Key that was pressed.
+        """
+
+    def on_key_release(self, symbol: int) -> None:
+        """Called when a key is released while this is the active screen.
+
+        :param symbol: Key that was released.
+        """
+
+    def on_draw(self) -> None:
+        """Called every frame, so that the application can draw itself."""
+        self.game.window.clear()
+        self.batch.draw()
+
+    @abstractmethod
+    def update(self, delta_time: float) -> None:
+        """Called every simulation step, used to update all objects on the screen.
+
+        :param delta_time: Length of a simulation step. This is fixed, and does not
+            depend on how much real time has passed.
+        :return:
+        """
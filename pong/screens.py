@@ -1,185 +1,59 @@
-"""Application screen objects.
+"""The title screen.
 
-A Screen is a logical collection of objects and business logic that work together to
-form one "scene" of the game. A screen must construct its objects, and contain rules
-for drawing and updating them each time the application ticks.
-
-Screens can be switched on the fly by the main application object, to which each Screen
-has a reference.
+The screen matches are played on is in its own module, game_screen, so that nothing
+it needs is imported before the title screen is drawn.
 """
-from abc import abstractmethod
-from itertools import combinations
 from typing import TYPE_CHECKING
 
-from pyglet.graphics import Batch
-from pyglet.sprite import Sprite
-from pyglet.text import Label
-
-from pong.assets import AssetTag
-from pong.game_objects import Ball, Paddle, Wall
+from pong.screen import Screen
 
 if TYPE_CHECKING:
     from pong.game import Pong  # pragma: no cover
 
 
-class Screen:
-    """Abstract base class for other Screens."""
-
-    def __init__(self, game: "Pong") -> None:
-        self.game = game
-        self.batch = Batch()
-
-    def on_draw(self) -> None:
-        """Called every frame, so that the application can draw itself."""
-        self.game.window.clear()
-        self.batch.draw()
-
-    @abstractmethod
-    def update(self, delta_time: float) -> None:
-        """Called every frame, used to update all objects on the screen.
-
-        :param delta_time: Real time passed between this frame and the last frame.
-        :return:
-        """
-
-
 class TitleScreen(Screen):
     """Title screen of the game."""
 
     def __init__(self, game: "Pong") -> None:
         super().__init__(game)
-        Label(
-            "Pyglet Pong",
-            font_name="Times New Roman",
-            font_size=36,
-            x=game.window.width // 2,
-            y=game.window.height // 2,
-            anchor_x="center",
-            anchor_y="center",
-            batch=self.batch,
-        )
-
-        Label(
-            "Press any key to start",
-            font_name="Times New Roman",
-            font_size=16,
-            x=game.window.width // 2,
-            y=game.window.height // 2 - 60,
-            anchor_x="center",
-            anchor_y="center",
-            batch=self.batch,
-        )
-
-    def update(self, _: float) -> None:
-        """Update this screen. Called each tick."""
-        if True in self.game.keys.values():
-            self.game.set_screen(GameScreen(self.game))
-
-
-class GameScreen(Screen):
-    """Main game screen. Holds the objects and business logic of core gameplay loop."""
-
-    def __init__(self, game: "Pong") -> None:
-        super().__init__(game)
-
-        # Game object construction
-        self.game_objects = [
-            Ball(
-                Sprite(
-                    game.asset_manager.get_asset(AssetTag.BALL),
-                    self.game.window.width // 2,
-                    self.game.window.height // 2,
-                    batch=self.batch,
-                )
-            ),
-            Paddle(
-                Sprite(
-                    game.asset_manager.get_asset(AssetTag.BAR),
-                    20,
-                    self.game.window.height // 2,
-                    batch=self.batch,
-                ),
-                self.game.controllers[0],
-            ),
-            Paddle(
-                Sprite(
-                    game.asset_manager.get_asset(AssetTag.BAR),
-                    self.game.window.width
-                    - 20
-                    - game.asset_manager.get_asset(AssetTag.BAR).width,
-                    self.game.window.height // 2,
-                    batch=self.batch,
-                ),
-                self.game.controllers[1],
-            ),
-            Wall(
-                Sprite(
-                    game.asset_manager.get_asset(AssetTag.WALL),
-                    0,
-                    game.window.height
-                    - game.asset_manager.get_asset(AssetTag.WALL).height,
-                    batch=self.batch,
-                )
-            ),
-            Wall(
-                Sprite(
-                    game.asset_manager.get_asset(AssetTag.WALL), 0, 0, batch=self.batch
-                )
-            ),
-        ]
-
-        self.left_score = 0
-        self.right_score = 0
-
-        self.left_score_label = Label(
-            str(self.left_score),
-            font_name="Times New Roman",
-            font_size=25,
-            x=game.window.width // 2 - 40,
-            y=game.window.height - 50,
-            anchor_x="center",
-            anchor_y="center",
-            batch=self.batch,
-        )
-
-        self.right_score_label = Label(
-            str(self.right_score),
-            font_name="Times New Roman",
-            font_size=25,
-            x=game.window.width // 2 + 40,
-            y=game.window.height - 50,
-            anchor_x="center",
-            anchor_y="center",
-            batch=self.batch,
-        )
-
-        self.reset()
-
-    def reset(self) -> None:
-        """Reset this screen. Useful for when a player has scored."""
-        # Game object initialization
-        for obj in self.game_objects:
-            obj.reset()
-
-        self.left_score_label.text = str(self.left_score)
-        self.right_score_label.text = str(self.right_score)
+        middle = game.viewport.width // 2
+        height = game.viewport.height
+        self.title_label = self.label("Pyglet Pong", middle, height // 2, 36)
+        self.prompt_label = self.label("", middle, height // 2 - 60, 16)
+        self.update_prompt()
+
+    def update_prompt(self) -> None:
+        """Show loading progress until the game is ready to start."""
+        asset_manager = self.game.asset_manager
+        if asset_manager.ready:
+            prompt = "Press any key to start"
+        else:
+            prompt = f"Loading... {asset_manager.progress:.0%}"
+        if self.prompt_label.text != prompt:
+            self.prompt_label.text = prompt
+
+    @property
+    def static(self) -> bool:
+        """The title screen is static once the game screen is ready to be shown, which
+        is the only other screen it can lead to."""
+        return any(screen is not self for screen in self.game.screens.values())
+
+    def on_key_press(self, _: int) -> None:
+        """Start the game when any key is pressed, once it is ready."""
+        # pylint: disable=import-outside-toplevel
+        if self.game.asset_manager.ready:
+            from pong.game_screen import GameScreen
+
+            self.game.show(GameScreen)
 
     def update(self, _: float) -> None:
-        """Update this screen. Called each tick."""
-        for obj1, obj2 in combinations(self.game_objects, 2):
-            if obj1.collision(obj2):
-                obj1.collisions.append(obj2)
-                obj2.collisions.append(obj1)
-
-        for obj in self.game_objects:
-            obj.update()
-            obj.collisions.clear()
-
-            if isinstance(obj, Ball):
-                # Ball goes off screen
-                if obj.sprite.x < 0:
-                    self.right_score += 1
-                    self.reset()
-                elif obj.sprite.x > self.game.window.width:
-                    self.left_score += 1
-                    self.reset()
+        """Update this screen. Called each tick. The game screen, and everything it
+        needs, is only imported from here, once assets are loaded, so that none of it
+        delays the first frame."""
+        # pylint: disable=import-outside-toplevel
+        self.update_prompt()
+        if self.game.asset_manager.ready:
+            from pong.game_screen import GameScreen
+
+            # Build the game screen while the player is looking at this one
+            self.game.prewarm(GameScreen)
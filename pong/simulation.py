@@ -0,0 +1,234 @@
+"""Headless simulation of a single match.
+
+A Match owns the game objects and scores, and applies the rules of the game each time
+it is stepped. It has no dependency on pyglet, so matches can be simulated without a
+window, GL context or Sprite; screens that want to draw a match read from it instead.
+
+Everything about a match that changes as it is played fits in a fixed-size snapshot, a
+few dozen bytes packed with a single struct call, so matches can be saved and restored
+every tick without copying or allocating any objects.
+"""
+from struct import Struct
+from typing import List, Sequence, Tuple, Union
+
+from pong.broadphase import SpatialHash
+from pong.controller import Controller
+from pong.game_objects import Ball, GameObject, Paddle, Wall
+
+BALL_SIZE = 30
+PADDLE_MARGIN = 20
+
+# Anything struct.pack_into can write to
+Buffer = Union[bytearray, memoryview]
+
+
+def paddle_size(width: int, height: int) -> Tuple[int, int]:
+    """Size of a paddle on a play area of the given dimensions.
+
+    :param width: Width of the play area.
+    :param height: Height of the play area.
+    :return: Width and height of a paddle.
+    """
+    return int(0.025 * width), int(0.15 * height)
+
+
+def wall_size(width: int, height: int) -> Tuple[int, int]:
+    """Size of a wall on a play area of the given dimensions.
+
+    :param width: Width of the play area.
+    :param height: Height of the play area.
+    :return: Width and height of a wall.
+    """
+    return width, int(0.025 * height)
+
+
+def paddle_x(width: int, index: int, controllers: int) -> int:
+    """Horizontal position of the paddle of a controller. Controllers take turns
+    between the left side and the right side, starting on the left. The first paddle on
+    each side guards the goal, and any others are spaced out evenly in front of it,
+    short of the middle.
+
+    :param width: Width of the play area.
+    :param index: Index of the controller.
+    :param controllers: Number of controllers in the match.
+    :return: Horizontal position of the left edge of the paddle.
+    """
+    per_side = (controllers + 1) // 2
+    offset = PADDLE_MARGIN + index // 2 * (width // (2 * per_side + 2))
+    if index % 2:
+        return width - offset - paddle_size(width, 0)[0]
+    return offset
+
+
+class Match:
+    """A single match between two sides, on a play area of a fixed size. Each
+    controller moves a paddle; with more than two, each side has several paddles (see
+    paddle_x).
+
+    By default the ball bounces off whatever it overlaps at the start of each tick (see
+    Ball.update), which is what the vectorized MatchBatch implements. With continuous
+    set, the ball uses continuous collision detection instead (see Ball.advance), so it
+    cannot pass through paddles or walls however fast it moves. That costs more per
+    tick, so it only pays off with a coarser timestep than matches are played at now.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        width: int,
+        height: int,
+        controllers: Sequence[Controller],
+        ball_size: int = BALL_SIZE,
+        continuous: bool = False,
+    ) -> None:
+        self.width = width
+        self.height = height
+        self.continuous = continuous
+
+        bar_width, bar_height = paddle_size(width, height)
+        wall_width, wall_height = wall_size(width, height)
+
+        self.controllers = controllers
+        self.ball = Ball(width // 2, height // 2, ball_size, ball_size)
+        self.game_objects: List[GameObject] = [self.ball]
+        for i, controller in enumerate(controllers):
+            self.game_objects.append(
+                Paddle(
+                    paddle_x(width, i, len(controllers)),
+                    height // 2,
+                    bar_width,
+                    bar_height,
+                    controller,
+                )
+            )
+        self.game_objects += [
+            Wall(0, height - wall_height, wall_width, wall_height),
+            Wall(0, 0, wall_width, wall_height),
+        ]
+
+        self.paddles = [obj for obj in self.game_objects if isinstance(obj, Paddle)]
+
+        self.broadphase = SpatialHash()
+
+        self.left_score = 0
+        self.right_score = 0
+
+        # Ball position, speed, direction and acceleration, the height of each paddle,
+        # the scores, and one bit for each direction of each controller
+        self.snapshot_format = Struct(f"<2didi{len(self.paddles)}d2IH")
+
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset the match. Useful for when a player has scored."""
+        for obj in self.game_objects:
+            obj.reset()
+
+    def restart(self) -> None:
+        """Start a new match: clear the scores, and put every object back where it
+        started."""
+        self.left_score = 0
+        self.right_score = 0
+        for obj in self.game_objects:
+            obj.x = obj.start_x
+            obj.y = obj.start_y
+        self.reset()
+
+    def update(self) -> None:
+        """Advance the match by a single tick, letting computer players decide what to
+        press first."""
+        self.poll()
+        self.step()
+
+    def poll(self) -> None:
+        """Let every controller decide what to press for the next tick. Anything that
+        captures the controls of a tick, such as a recording, must do so after this."""
+        for controller in self.controllers:
+            controller.poll(self)
+
+    def step(self) -> None:
+        """Advance the match by a single tick, with the controls as they are."""
+        continuous = self.continuous
+        objects = self.game_objects
+        if continuous:
+            # Balls find what they hit along their own path, so they are not paired up
+            objects = [obj for obj in objects if not isinstance(obj, Ball)]
+        for obj1, obj2 in self.broadphase.pairs(objects):
+            if obj1.collision(obj2):
+                obj1.touch(obj2)
+                obj2.touch(obj1)
+
+        for obj in self.game_objects:
+            if continuous and isinstance(obj, Ball):
+                obj.advance(self.broadphase.near(obj, obj.speed))
+            else:
+                obj.update()
+            obj.contacts = 0
+
+            if isinstance(obj, Ball):
+                # Ball goes off screen
+                if obj.x < 0:
+                    self.right_score += 1
+                    self.reset()
+                elif obj.x > self.width:
+                    self.left_score += 1
+                    self.reset()
+
+    @property
+    def snapshot_size(self) -> int:
+        """Size of a snapshot of this match, in bytes."""
+        return self.snapshot_format.size
+
+    def snapshot(self) -> bytes:
+        """Capture the state of this match.
+
+        :return: Snapshot that restore can return the match to.
+        """
+        snapshot = bytearray(self.snapshot_size)
+        self.snapshot_into(snapshot)
+        return bytes(snapshot)
+
+    def snapshot_into(self, buffer: Buffer, offset: int = 0) -> None:
+        """Capture the state of this match into an existing buffer.
+
+        :param buffer: Buffer to write to.
+        :param offset: Position in the buffer to write the snapshot at.
+        """
+        controls = 0
+        for i, controller in enumerate(self.controllers):
+            controls |= (controller.player_up | controller.player_down << 1) << 2 * i
+        ball = self.ball
+        self.snapshot_format.pack_into(
+            buffer,
+            offset,
+            ball.x,
+            ball.y,
+            ball.speed,
+            ball.direction,
+            ball.acceleration,
+            *[paddle.y for paddle in self.paddles],
+            self.left_score,
+            self.right_score,
+            controls,
+        )
+
+    def restore(
+        self, snapshot: Union[bytes, Buffer], offset: int = 0, controls: bool = True
+    ) -> None:
+        """Return this match to the state it was in when a snapshot was captured.
+
+        :param snapshot: Buffer holding the snapshot.
+        :param offset: Position of the snapshot in the buffer.
+        :param controls: Whether to restore the state of the controllers too.
+        """
+        values = self.snapshot_format.unpack_from(snapshot, offset)
+        ball = self.ball
+        ball.x, ball.y, ball.speed, ball.direction, ball.acceleration = values[:5]
+        for paddle, height in zip(self.paddles, values[5:-3]):
+            paddle.y = height
+        self.left_score, self.right_score, bits = values[-3:]
+        if controls:
+            for i, controller in enumerate(self.controllers):
+                controller.player_up = bool(bits >> 2 * i & 1)
+                controller.player_down = bool(bits >> 2 * i & 2)
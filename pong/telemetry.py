@@ -0,0 +1,190 @@
+"""Match telemetry, written in the background.
+
+Screens emit events, such as paddle hits and points scored, as plain dicts. Emitting
+only puts an event on a bounded queue, and never waits: if the queue is full, the event
+is dropped and counted instead. A writer thread takes events off the queue in batches,
+and appends each batch to a file as a gzip member of JSON lines. A file of several
+members is itself a valid gzip file, and a batch cut short by a crash only loses that
+batch.
+
+Once the file grows past a size, it is rotated, the way logging.RotatingFileHandler
+rotates logs: ``events.jsonl.gz`` becomes ``events.jsonl.gz.1``, which becomes
+``events.jsonl.gz.2``, and so on, up to a number of backups. Events that were dropped
+are reported in the file, as a ``dropped`` event with the count since the last one.
+"""
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+from typing import Any, Dict, List
+
+Event = Dict[str, Any]
+
+QUEUE_SIZE = 4096
+BATCH_SIZE = 256
+FLUSH_INTERVAL = 1.0
+MAX_BYTES = 8 * 1024 * 1024
+BACKUPS = 5
+CLOSE_TIMEOUT = 5.0
+
+# Put on the queue by close, to stop the writer once every event before it is written
+_CLOSE: Event = {}
+
+
+class Telemetry:
+    """A bounded queue of events, and the thread that writes them to a file."""
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        path: str,
+        queue_size: int = QUEUE_SIZE,
+        batch_size: int = BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+        max_bytes: int = MAX_BYTES,
+        backups: int = BACKUPS,
+    ) -> None:
+        """
+        :param path: File to append events to.
+        :param queue_size: Most events waiting to be written, before more are dropped.
+        :param batch_size: Most events written at once.
+        :param flush_interval: Longest an event waits for its batch to fill up, in
+            seconds.
+        :param max_bytes: Size past which the file is rotated.
+        :param backups: Number of rotated files kept, at least 1.
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.queue: "queue.Queue[Event]" = queue.Queue(queue_size)
+        # Only counted by the thread that emits, and only read by the writer
+        self.dropped = 0
+        self.reported = 0
+        # Events lost because they could not be written
+        self.failed = 0
+        self.file = open(path, "ab")
+        self.thread = threading.Thread(
+            target=self._run, name="telemetry-writer", daemon=True
+        )
+        self.thread.start()
+
+    def emit(self, event: str, **fields: Any) -> None:
+        """Queue an event to be written, or drop it if the queue is full. Never blocks.
+
+        :param event: Kind of event.
+        :param fields: Anything else to record about it. Must be JSON serializable.
+        """
+        fields["event"] = event
+        fields["time"] = time.time()
+        try:
+            self.queue.put_nowait(fields)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout: float = CLOSE_TIMEOUT) -> None:
+        """Write every event still queued, and stop the writer. Blocks until done, or
+        until the timeout runs out, so that a writer stuck on a slow disk cannot stop
+        the game from exiting. If it does run out, close can be called again.
+
+        :param timeout: Longest to wait for the writer, in seconds.
+        """
+        deadline = time.monotonic() + timeout
+        if self.thread.is_alive():
+            try:
+                self.queue.put(_CLOSE, timeout=timeout)
+            except queue.Full:
+                return
+            self.thread.join(max(0.0, deadline - time.monotonic()))
+        if not self.thread.is_alive():
+            self.file.close()
+
+    def _run(self) -> None:
+        """Write batches of events until closed. A batch is written once it is full,
+        or once its first event has waited for flush_interval."""
+        batch: List[Event] = []
+        deadline = 0.0
+        while True:
+            try:
+                timeout = max(0.0, deadline - time.monotonic()) if batch else None
+                event = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                self._write(batch)
+                batch = []
+                continue
+            if event is _CLOSE:
+                self._write(batch)
+                return
+            if not batch:
+                deadline = time.monotonic() + self.flush_interval
+            batch.append(event)
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+
+    def _write(self, batch: List[Event]) -> None:
+        """Append a batch to the file as one gzip member, and rotate it if it has grown
+        too large. A batch that cannot be written is counted as failed, whatever the
+        reason, so that the writer carries on with the next one."""
+        dropped = self.dropped
+        if dropped > self.reported:
+            count = dropped - self.reported
+            batch.append({"event": "dropped", "time": time.time(), "count": count})
+            self.reported = dropped
+        if not batch:
+            return
+        try:
+            lines = "".join(json.dumps(event) + "\n" for event in batch)
+            if self.file.closed:
+                # Left closed by a rotation that could not open the new file
+                self.file = open(self.path, "ab")
+            self.file.write(gzip.compress(lines.encode(), compresslevel=6))
+            self.file.flush()
+        except Exception:  # pylint: disable=broad-except
+            self.failed += len(batch)
+            return
+        try:
+            if self.file.tell() >= self.max_bytes:
+                self._rotate()
+        except OSError:
+            # The batch is written, and the next one tries again
+            pass
+
+    def _rotate(self) -> None:
+        """Shift the backups along, dropping the oldest, and start a new file."""
+        self.file.close()
+        try:
+            for i in range(self.backups - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{i}"):
+                    os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        finally:
+            self.file = open(self.path, "ab")
+
+
+def load(path: str) -> List[Event]:
+    """Read the events in a telemetry file. A batch left unfinished by a crash is
+    skipped.
+
+    :param path: File written by Telemetry, or one of its backups.
+    :return: The events, in the order they were written.
+    """
+    events: List[Event] = []
+    with open(path, "rb") as file:
+        data = file.read()
+    while data:
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            lines = decompressor.decompress(data)
+        except zlib.error:
+            break
+        if not decompressor.eof:
+            break
+        events.extend(json.loads(line) for line in lines.splitlines())
+        data = decompressor.unused_data
+    return events
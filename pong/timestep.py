@@ -0,0 +1,44 @@
+"""Fixed timestep bookkeeping for the game loop.
+
+The simulation always advances in steps of the same length, regardless of how often
+the application actually gets to run. Real time is collected in an accumulator, and
+converted into however many whole steps it covers; whatever is left over is used to
+interpolate between the last two simulation states when drawing.
+"""
+
+
+class FixedTimestep:
+    """Converts elapsed real time into a number of fixed-length simulation steps."""
+
+    def __init__(self, step: float = 0.01, max_steps: int = 10) -> None:
+        """
+        :param step: Length of a single simulation step, in seconds.
+        :param max_steps: Most steps that will be run to catch up in a single frame.
+            If the simulation falls further behind than this, the excess time is
+            dropped, so that a slow machine cannot fall into a spiral of ever larger
+            catch-up work.
+        """
+        self.step = step
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    @property
+    def alpha(self) -> float:
+        """How far real time is between the previous and the current simulation
+        state, from 0 to 1. Used to interpolate positions when drawing."""
+        return self.accumulator / self.step
+
+    def advance(self, delta_time: float) -> int:
+        """Account for some real time having passed.
+
+        :param delta_time: Real time passed since the last call.
+        :return: Number of simulation steps that should now be run.
+        """
+        self.accumulator += delta_time
+        steps = int(self.accumulator // self.step)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator %= self.step
+        else:
+            self.accumulator -= steps * self.step
+        return steps
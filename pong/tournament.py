@@ -0,0 +1,457 @@
+"""Tournaments between computer players.
+
+Every game of a tournament is a headless Match between two players, played to a number
+of points. Games are spread over a pool of worker processes, one per CPU, and each
+result is appended to a JSON lines file as soon as it comes back. A tournament that is
+interrupted can be resumed by running it again: games already in the file are not
+played again. The first line of the file holds the settings of the tournament, and a
+file written with other settings is not resumed from, as its results would not be
+comparable. Only the number of rounds may differ, to add rounds to a tournament.
+
+Players are either named in PLAYERS, or given as ``module:callable``, where the callable
+takes a seed and returns a Controller. Two formats are supported:
+
+- In a round robin, every player meets every other player once per round, swapping
+  sides each round. Every game is known up front, so they are all played at once.
+- In a Swiss tournament, each round pairs players with similar scores that have not met
+  yet. Rounds depend on the results of the last, so they are played one at a time.
+
+Every game is seeded from its id, and pairings only depend on the results of earlier
+rounds, so a tournament plays out the same way however it is split between processes,
+or between runs.
+
+``pong tournament easy normal hard perfect --format swiss --rounds 3``
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from functools import partial
+from itertools import combinations
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Set, Tuple
+
+from pong.ai import ComputerController
+from pong.controller import Controller
+from pong.game_objects import Ball
+from pong.simulation import Match
+
+PlayerFactory = Callable[[int], Controller]
+Result = Dict[str, Any]
+Settings = Dict[str, Any]
+
+PLAYERS: Dict[str, PlayerFactory] = {
+    "perfect": lambda seed: ComputerController(seed=seed),
+    "hard": lambda seed: ComputerController(reaction_ticks=5, error=10, seed=seed),
+    "normal": lambda seed: ComputerController(reaction_ticks=10, error=20, seed=seed),
+    "easy": lambda seed: ComputerController(reaction_ticks=20, error=40, seed=seed),
+    "idle": lambda seed: Controller(0, 0),
+}
+
+ROUND_ROBIN = "round-robin"
+SWISS = "swiss"
+
+ELO_START = 1500.0
+ELO_K = 32.0
+
+
+def player(spec: str) -> PlayerFactory:
+    """Find the factory for a player.
+
+    :param spec: Name of a player in PLAYERS, or ``module:callable``.
+    :return: Callable taking a seed, and returning a new controller.
+    """
+    if spec in PLAYERS:
+        return PLAYERS[spec]
+    module, _, name = spec.partition(":")
+    if not name:
+        raise ValueError(f"Unknown player {spec}")
+    factory: PlayerFactory = getattr(importlib.import_module(module), name)
+    return factory
+
+
+@dataclass(frozen=True)
+class Game:
+    """A game between two players, as scheduled."""
+
+    round: int
+    left: str
+    right: str
+
+    @property
+    def id(self) -> str:  # pylint: disable=invalid-name
+        """Identifies this game within its tournament."""
+        return f"{self.round}:{self.left}:{self.right}"
+
+    @property
+    def seed(self) -> int:
+        """Seed for the players of this game."""
+        return zlib.crc32(self.id.encode())
+
+
+def play(
+    game: Game, points: int, max_ticks: int, width: int = 1024, height: int = 768
+) -> Result:
+    """Play a game without drawing anything.
+
+    :param game: Game to play.
+    :param points: Points either player must score to win.
+    :param max_ticks: Ticks after which the game ends regardless.
+    :param width: Width of the play area.
+    :param height: Height of the play area.
+    :return: The result: the game, the scores, the number of ticks played, and the
+        number of times the ball was hit by a paddle before each point was scored.
+    """
+    controllers = [player(game.left)(game.seed), player(game.right)(game.seed + 1)]
+    match = Match(width, height, controllers)
+    ball = match.ball
+    rallies: List[int] = []
+    ticks = 0
+    while max(match.left_score, match.right_score) < points and ticks < max_ticks:
+        # The ball speeds up on every hit, and is reset when a point is scored
+        hits = (ball.speed - Ball.initial_speed) // ball.acceleration
+        scores = match.left_score + match.right_score
+        match.update()
+        ticks += 1
+        if match.left_score + match.right_score != scores:
+            rallies.append(hits)
+    return {
+        "id": game.id,
+        "round": game.round,
+        "left": game.left,
+        "right": game.right,
+        "left_score": match.left_score,
+        "right_score": match.right_score,
+        "ticks": ticks,
+        "rallies": rallies,
+    }
+
+
+def score(result: Result, name: str) -> float:
+    """Points a player earned from a game: 1 for a win, 0.5 for a draw and 0 for a
+    loss.
+
+    :param result: Result of the game.
+    :param name: Name of one of the players.
+    """
+    difference = result["left_score"] - result["right_score"]
+    if name == result["right"]:
+        difference = -difference
+    return 1.0 if difference > 0 else 0.5 if difference == 0 else 0.0
+
+
+def round_robin(players: Sequence[str], rounds: int) -> List[Game]:
+    """Every game of a round robin.
+
+    :param players: Names of the players.
+    :param rounds: Number of times each player meets each other player.
+    :return: The games, in order.
+    """
+    games = []
+    for number in range(1, rounds + 1):
+        for first, second in combinations(players, 2):
+            left, right = (first, second) if number % 2 else (second, first)
+            games.append(Game(number, left, right))
+    return games
+
+
+def swiss_round(
+    players: Sequence[str], number: int, results: Dict[str, Result]
+) -> List[Game]:
+    """The games of a round of a Swiss tournament. Players are ranked by their score so
+    far, ties broken by the order they were given in, and each is paired with the next
+    highest ranked player it has not met yet, if there is one. With an odd number of
+    players, the lowest ranked one that has sat out the fewest rounds sits this one
+    out.
+
+    :param players: Names of the players.
+    :param number: Number of the round, from 1.
+    :param results: Results of every earlier round, by game id.
+    :return: The games of the round.
+    """
+    scores = {name: 0.0 for name in players}
+    played = {name: 0 for name in players}
+    met: Set[Tuple[str, str]] = set()
+    for result in results.values():
+        if result["round"] >= number:
+            continue
+        for name in (result["left"], result["right"]):
+            scores[name] += score(result, name)
+            played[name] += 1
+        met.add((result["left"], result["right"]))
+        met.add((result["right"], result["left"]))
+
+    ranked = sorted(players, key=lambda name: -scores[name])
+    if len(ranked) % 2:
+        # Rounds sat out so far. The lowest ranked of those who sat out least sits out.
+        byes = {name: number - 1 - played[name] for name in players}
+        ranked.remove(min(reversed(ranked), key=lambda name: byes[name]))
+
+    games = []
+    while ranked:
+        first = ranked.pop(0)
+        second = next((name for name in ranked if (first, name) not in met), ranked[0])
+        ranked.remove(second)
+        left, right = (first, second) if number % 2 else (second, first)
+        games.append(Game(number, left, right))
+    return games
+
+
+def schedule(
+    players: Sequence[str], system: str, rounds: int, results: Dict[str, Result]
+) -> Iterator[List[Game]]:
+    """The games of a tournament, in batches that can each be played at once. Batches
+    after the first may depend on the results of the ones before, so results should be
+    added before the next batch is taken.
+
+    :param players: Names of the players.
+    :param system: ROUND_ROBIN or SWISS.
+    :param rounds: Number of rounds.
+    :param results: Results of the games played so far, by game id.
+    """
+    if system == ROUND_ROBIN:
+        yield round_robin(players, rounds)
+    else:
+        for number in range(1, rounds + 1):
+            yield swiss_round(players, number, results)
+
+
+def load(path: str, settings: Settings) -> Dict[str, Result]:
+    """Read the results written by an earlier run of a tournament. A line left
+    unfinished when that run was interrupted is removed from the file.
+
+    :param path: Results file. Need not exist.
+    :param settings: Settings of the tournament being run.
+    :return: The results, by game id. Results of games between players not in the
+        tournament are left out.
+    :raises ValueError: If the file was written by a tournament with other settings,
+        other than the number of rounds, or does not start with its settings.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, "rb+") as file:
+        data = file.read()
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            file.truncate(complete)
+    lines = data[:complete].splitlines()
+    if not lines:
+        return {}
+    written = json.loads(lines[0]).get("settings")
+    if written is None:
+        raise ValueError(f"{path} does not start with the settings of a tournament")
+    different = [
+        name
+        for name, value in settings.items()
+        if name != "rounds" and written.get(name) != value
+    ]
+    if different:
+        raise ValueError(
+            f"{path} holds a tournament with other {', '.join(different)}; "
+            "give another results file to start a new one"
+        )
+    players = set(settings["players"])
+    results = {}
+    for line in lines[1:]:
+        result = json.loads(line)
+        if result["left"] in players and result["right"] in players:
+            results[result["id"]] = result
+    return results
+
+
+def run_tournament(  # pylint: disable=too-many-arguments,too-many-locals
+    players: Sequence[str],
+    path: str,
+    system: str = ROUND_ROBIN,
+    rounds: int = 1,
+    points: int = 5,
+    max_ticks: int = 100000,
+    workers: int = 0,
+) -> List[Result]:
+    """Play every game of a tournament that is not already in the results file.
+
+    :param players: Names of the players.
+    :param path: Results file. Each result is appended to it as soon as it is known.
+    :param system: ROUND_ROBIN or SWISS.
+    :param rounds: Number of rounds.
+    :param points: Points either player must score to win a game.
+    :param max_ticks: Ticks after which a game is ended as it stands.
+    :param workers: Number of worker processes. Defaults to one per CPU.
+    :return: The result of every game, in the order they were scheduled.
+    :raises ValueError: If the results file holds a tournament with other settings.
+    """
+    # pylint: disable=import-outside-toplevel
+    # Imported here, as it is slow to import, and the game imports this module for its
+    # command line alone
+    from multiprocessing import Pool
+
+    settings: Settings = {
+        "players": list(players),
+        "format": system,
+        "rounds": rounds,
+        "points": points,
+        "max_ticks": max_ticks,
+    }
+    results = load(path, settings)
+    order: List[str] = []
+    game_player = partial(play, points=points, max_ticks=max_ticks)
+    with Pool(workers or None) as pool, open(path, "a") as output:
+        if not output.tell():
+            output.write(json.dumps({"settings": settings}) + "\n")
+            output.flush()
+        for games in schedule(players, system, rounds, results):
+            order.extend(game.id for game in games)
+            remaining = [game for game in games if game.id not in results]
+            for result in pool.imap_unordered(game_player, remaining):
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+                results[result["id"]] = result
+    return [results[game_id] for game_id in order]
+
+
+def elo(players: Sequence[str], results: Sequence[Result]) -> Dict[str, float]:
+    """Elo ratings of the players, updated after each game in turn.
+
+    :param players: Names of the players.
+    :param results: Results of the games, in the order they were scheduled.
+    :return: The rating of each player.
+    """
+    ratings = {name: ELO_START for name in players}
+    for result in results:
+        left = result["left"]
+        right = result["right"]
+        expected = 1 / (1 + 10 ** ((ratings[right] - ratings[left]) / 400))
+        change = ELO_K * (score(result, left) - expected)
+        ratings[left] += change
+        ratings[right] -= change
+    return ratings
+
+
+def rally_histogram(results: Sequence[Result]) -> List[str]:
+    """Lines of a histogram of rally lengths, in paddle hits, in buckets that double
+    in size.
+
+    :param results: Results of the games.
+    :return: The lines, or none if no point was scored.
+    """
+    rallies = Counter(
+        min(hits.bit_length(), 8) for result in results for hits in result["rallies"]
+    )
+    if not rallies:
+        return []
+    lines = ["hits per point"]
+    most = max(rallies.values())
+    for bucket in range(max(rallies) + 1):
+        low = 1 << bucket >> 1
+        high = (1 << bucket) - 1
+        if bucket == 8:
+            label = f"{low}+"
+        elif low < high:
+            label = f"{low}-{high}"
+        else:
+            label = str(high)
+        count = rallies[bucket]
+        bars = "#" * round(40 * count / most)
+        lines.append(f"{label:>8} {count:>7} {bars}".rstrip())
+    return lines
+
+
+def summary(players: Sequence[str], results: Sequence[Result]) -> str:
+    """Standings and rally lengths of a tournament, for display.
+
+    :param players: Names of the players.
+    :param results: Results of the games, in the order they were scheduled.
+    """
+    ratings = elo(players, results)
+    lines = [f"{'player':<20} {'games':>5} {'won':>4} {'drawn':>5} {'win %':>6} elo"]
+    for name in sorted(players, key=lambda name: -ratings[name]):
+        scores = [
+            score(result, name)
+            for result in results
+            if name in (result["left"], result["right"])
+        ]
+        won = scores.count(1.0)
+        drawn = scores.count(0.5)
+        rate = won / len(scores) if scores else 0.0
+        lines.append(
+            f"{name:<20} {len(scores):>5} {won:>4} {drawn:>5} {rate:>6.1%}"
+            f" {ratings[name]:.0f}"
+        )
+
+    histogram = rally_histogram(results)
+    if histogram:
+        lines.append("")
+        lines += histogram
+    return "\n".join(lines)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options of the tournament command to a parser.
+
+    :param parser: Parser for the command.
+    """
+    parser.add_argument(
+        "players",
+        nargs="+",
+        metavar="PLAYER",
+        help=f"{', '.join(PLAYERS)}, or module:callable taking a seed",
+    )
+    parser.add_argument(
+        "--format",
+        choices=(ROUND_ROBIN, SWISS),
+        default=ROUND_ROBIN,
+        help=f"(default: {ROUND_ROBIN})",
+    )
+    parser.add_argument(
+        "--rounds", type=int, default=2, help="number of rounds (default: 2)"
+    )
+    parser.add_argument(
+        "--points", type=int, default=5, help="points to win a game (default: 5)"
+    )
+    parser.add_argument(
+        "--max-ticks",
+        type=int,
+        default=100000,
+        help="ticks after which a game is drawn or won as it stands (default: 100000)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=0, help="processes (default: one per CPU)"
+    )
+    parser.add_argument(
+        "--results",
+        metavar="FILE",
+        default="tournament.jsonl",
+        help="file results are appended to, and resumed from "
+        "(default: tournament.jsonl)",
+    )
+
+
+def run(args: argparse.Namespace) -> None:
+    """Run the tournament command, and print its summary.
+
+    :param args: Parsed options, from a parser given add_arguments.
+    """
+    players: List[str] = args.players
+    if len(players) < 2 or len(set(players)) < len(players):
+        sys.exit("A tournament needs at least two different players")
+    try:
+        for spec in players:
+            player(spec)
+    except (ValueError, ImportError, AttributeError) as error:
+        sys.exit(str(error))
+    try:
+        results = run_tournament(
+            players,
+            args.results,
+            system=args.format,
+            rounds=args.rounds,
+            points=args.points,
+            max_ticks=args.max_ticks,
+            workers=args.workers,
+        )
+    except ValueError as error:
+        sys.exit(str(error))
+    print(summary(players, results))
@@ -0,0 +1,137 @@
+"""Vectorized simulation of many independent matches at once.
+
+A MatchBatch holds the state of N matches as NumPy arrays, one element (or row) per
+match, and applies the rules of Match.update (with discrete collisions) to all of them
+with array operations. All matches in a batch share the same play area, so the static
+geometry (paddle columns, walls, object sizes) is stored once; only the moving state is
+per-match.
+
+The rules are the same as the scalar ones, tick for tick: collisions are detected
+before anything moves, the ball bounces and moves first, a ball leaving the play area
+scores a point and resets the match, and then the paddles move, unless a wall they
+were touching at the start of the tick is in the way.
+"""
+import math
+from typing import Optional, Union
+
+import numpy as np
+
+from pong.game_objects import Ball, Paddle
+from pong.simulation import BALL_SIZE, PADDLE_MARGIN, paddle_size, wall_size
+
+
+class MatchBatch:
+    """State and rules for a batch of independent matches."""
+
+    # pylint: disable=invalid-name,too-many-instance-attributes
+
+    def __init__(
+        self, count: int, width: int, height: int, ball_size: int = BALL_SIZE
+    ) -> None:
+        self.count = count
+        self.width = width
+        self.height = height
+
+        # Static geometry, shared by every match in the batch
+        self.ball_size = ball_size
+        self.paddle_width, self.paddle_height = paddle_size(width, height)
+        self.wall_width, self.wall_height = wall_size(width, height)
+        self.paddle_x = np.array(
+            [PADDLE_MARGIN, width - PADDLE_MARGIN - self.paddle_width], dtype=np.int64
+        )
+        self.wall_y = np.array([height - self.wall_height, 0], dtype=np.int64)
+        self.start_x = width // 2
+        self.start_y = height // 2
+
+        # Per-match state
+        self.ball_x = np.zeros(count)
+        self.ball_y = np.zeros(count)
+        self.ball_speed = np.zeros(count, dtype=np.int64)
+        self.ball_direction = np.zeros(count)
+        self.ball_acceleration = np.zeros(count, dtype=np.int64)
+        self.paddle_y = np.full((count, 2), height // 2, dtype=np.int64)
+        self.player_up = np.zeros((count, 2), dtype=bool)
+        self.player_down = np.zeros((count, 2), dtype=bool)
+        self.left_score = np.zeros(count, dtype=np.int64)
+        self.right_score = np.zeros(count, dtype=np.int64)
+
+        # Paddles never move horizontally, so whether they overlap a wall along the x
+        # axis can be worked out once.
+        self._paddle_wall_x = ~(
+            (self.paddle_x + self.paddle_width < 0) | (self.paddle_x > self.wall_width)
+        )
+
+        self.reset()
+
+    def reset(self, mask: Optional[np.ndarray] = None) -> None:
+        """Reset the ball of some or all of the matches, like Match.reset.
+
+        :param mask: Boolean array selecting the matches to reset. Defaults to all.
+        """
+        if mask is None:
+            mask = np.ones(self.count, dtype=bool)
+        self.ball_x[mask] = self.start_x
+        self.ball_y[mask] = self.start_y
+        self.ball_speed[mask] = Ball.initial_speed
+        self.ball_direction[mask] = Ball.initial_direction
+        self.ball_acceleration[mask] = Ball.initial_acceleration
+
+    def _ball_overlaps(
+        self,
+        x: Union[int, np.ndarray],
+        y: Union[int, np.ndarray],
+        width: int,
+        height: int,
+    ) -> np.ndarray:
+        """Same test as GameObject.collision, between each ball and a box per match."""
+        separate = (
+            (self.ball_x + self.ball_size < x)
+            | (self.ball_x > x + width)
+            | (self.ball_y + self.ball_size < y)
+            | (self.ball_y > y + height)
+        )
+        return ~separate
+
+    def update(self) -> None:
+        """Advance every match in the batch by a single tick."""
+        # Collision detection, before anything moves
+        hit_paddle = np.zeros(self.count, dtype=bool)
+        for side in range(2):
+            hit_paddle |= self._ball_overlaps(
+                self.paddle_x[side],
+                self.paddle_y[:, side],
+                self.paddle_width,
+                self.paddle_height,
+            )
+        hit_wall = np.zeros(self.count, dtype=bool)
+        for wall_y in self.wall_y:
+            hit_wall |= self._ball_overlaps(
+                0, wall_y, self.wall_width, self.wall_height
+            )
+
+        # [match, paddle, wall] overlap between every paddle and every wall
+        paddle_y = self.paddle_y[:, :, np.newaxis]
+        paddle_wall = (
+            self._paddle_wall_x[np.newaxis, :, np.newaxis]
+            & ~(paddle_y + self.paddle_height < self.wall_y)
+            & ~(paddle_y > self.wall_y + self.wall_height)
+        )
+
+        # Ball
+        self.ball_direction[hit_paddle] = math.pi - self.ball_direction[hit_paddle]
+        self.ball_speed[hit_paddle] += self.ball_acceleration[hit_paddle]
+        self.ball_direction[hit_wall] = -self.ball_direction[hit_wall]
+        self.ball_x += self.ball_speed * np.cos(self.ball_direction)
+        self.ball_y += self.ball_speed * np.sin(self.ball_direction)
+
+        right_scores = self.ball_x < 0
+        left_scores = ~right_scores & (self.ball_x > self.width)
+        self.right_score += right_scores
+        self.left_score += left_scores
+        self.reset(right_scores | left_scores)
+
+        # Paddles
+        blocked_up = (paddle_wall & (self.wall_y > paddle_y)).any(axis=2)
+        blocked_down = (paddle_wall & (self.wall_y < paddle_y)).any(axis=2)
+        self.paddle_y += Paddle.initial_speed * (self.player_up & ~blocked_up)
+        self.paddle_y -= Paddle.initial_speed * (self.player_down & ~blocked_down)
@@ -0,0 +1,50 @@
+"""Mapping from the logical play area to the window.
+
+The game is simulated and laid out in logical coordinates, on a play area whose size
+never changes, so that resizing the window or going fullscreen has no effect on how a
+match plays out. Only when drawing are logical coordinates scaled to fit the window.
+"""
+from typing import Tuple
+
+
+class Viewport:
+    """Fits a logical play area into a window of any size. The play area keeps its
+    aspect ratio: it is scaled as large as the window allows, and centered, leaving
+    empty bars along the sides that are left over."""
+
+    # pylint: disable=invalid-name
+
+    def __init__(self, width: int, height: int) -> None:
+        """
+        :param width: Width of the logical play area.
+        :param height: Height of the logical play area.
+        """
+        self.width = width
+        self.height = height
+        self.scale = 1.0
+        self.x = 0
+        self.y = 0
+
+    def fit(self, window_width: int, window_height: int) -> bool:
+        """Fit the play area into a window.
+
+        :param window_width: Width of the window, in pixels.
+        :param window_height: Height of the window, in pixels.
+        :return: Whether the scale changed.
+        """
+        scale = min(window_width / self.width, window_height / self.height)
+        # Bars are a whole number of pixels, so that nothing is drawn between pixels
+        self.x = int(window_width - self.width * scale) // 2
+        self.y = int(window_height - self.height * scale) // 2
+        changed = scale != self.scale
+        self.scale = scale
+        return changed
+
+    def point(self, x: float, y: float) -> Tuple[float, float]:
+        """Window position of a logical position.
+
+        :param x: Logical horizontal position.
+        :param y: Logical vertical position.
+        :return: Horizontal and vertical position in the window, in pixels.
+        """
+        return self.x + x * self.scale, self.y + y * self.scale
@@ -0,0 +1,127 @@
+import math
+from unittest import mock
+from unittest.mock import MagicMock
+
+from pyglet.window import Window
+
+import pytest
+from pong import main as pong_main
+from pong.ai import ComputerController, fold, intercept
+from pong.controller import Controller
+from pong.game_objects import Paddle
+from pong.simulation import Match
+
+
+@pytest.fixture(scope="function")
+def computer():
+    return ComputerController()
+
+
+@pytest.fixture(scope="function")
+def match(computer):
+    # Bouncing at the point of contact, as the ball does in the closed form
+    return Match(1024, 768, [Controller(0, 1), computer], continuous=True)
+
+
+def test_fold():
+    assert fold(50, 0, 100) == 50
+    assert fold(150, 0, 100) == 50
+    assert fold(-30, 0, 100) == 30
+    assert fold(230, 0, 100) == 30
+    assert fold(50, 10, 10) == 10
+
+
+@pytest.mark.parametrize("direction", [0.3, 1.0, 1.4, -0.9, -1.2])
+def test_intercept_matches_simulation(computer, match, direction):
+    computer.learn(match)
+    # Nothing but the walls in the way
+    match.game_objects[:] = [
+        obj for obj in match.game_objects if not isinstance(obj, Paddle)
+    ]
+    ball = match.ball
+    ball.x, ball.y, ball.direction, ball.speed = 100, 300, direction, 13
+    predicted = intercept(ball, computer.plane, computer.low, computer.high)
+
+    while ball.x < computer.plane:
+        previous_x, previous_y = ball.x, ball.y
+        match.update()
+    # Where the ball crossed the plane, during the last tick
+    fraction = (computer.plane - previous_x) / (ball.x - previous_x)
+    assert predicted == pytest.approx(previous_y + (ball.y - previous_y) * fraction)
+
+
+def test_intercept_ignores_ball_moving_away(computer, match):
+    computer.learn(match)
+    match.ball.direction = math.pi
+    assert intercept(match.ball, computer.plane, computer.low, computer.high) is None
+    match.ball.direction = math.pi / 2
+    assert intercept(match.ball, computer.plane, computer.low, computer.high) is None
+
+
+def test_computers_rally():
+    left = ComputerController()
+    right = ComputerController()
+    match = Match(1024, 768, [left, right])
+    for _ in range(2000):
+        match.update()
+    # Both paddles keep returning the ball, which speeds up with every return
+    assert match.ball.speed > 20
+    assert (match.left_score, match.right_score) == (0, 0)
+    # Predictions are only made when the ball bounces
+    assert left.predictions < 100
+
+
+def test_computer_heads_to_middle_while_ball_moves_away(computer, match):
+    match.ball.direction = math.pi
+    paddle = match.paddles[1]
+    paddle.y = 0
+    match.update()
+    assert computer.player_up
+    assert computer.target == pytest.approx(
+        (match.height - paddle.height) / 2, abs=match.ball.height
+    )
+
+
+def test_reaction_delay(match):
+    computer = ComputerController(reaction_ticks=5)
+    match = Match(1024, 768, [Controller(0, 1), computer])
+    match.paddles[1].y = 0
+    for _ in range(5):
+        match.update()
+        assert not computer.player_up
+    match.update()
+    assert computer.player_up
+
+
+def test_error_is_bounded_and_repeatable(match):
+    perfect = ComputerController()
+    perfect.poll(Match(1024, 768, [Controller(0, 1), perfect]))
+    targets = []
+    for _ in range(2):
+        computer = ComputerController(error=50, seed=3)
+        computer.poll(Match(1024, 768, [Controller(0, 1), computer]))
+        assert computer.target != perfect.target
+        assert abs(computer.target - perfect.target) <= 50
+        targets.append(computer.target)
+    assert targets[0] == targets[1]
+
+
+def test_computer_follows_new_match(computer, match):
+    computer.poll(match)
+    other = Match(800, 600, [Controller(0, 1), computer])
+    computer.poll(other)
+    assert computer.paddle is other.paddles[1]
+
+
+@mock.patch("pyglet.window.Window")
+@mock.patch("pyglet.app.run", new=MagicMock())
+def test_computer_startup(window_mock):
+    window_mock.return_value = Window(visible=False)
+    with mock.patch("pong.game.Pong") as pong_mock:
+        pong_mock.return_value.controllers = [Controller(0, 1), Controller(2, 3)]
+        pong_mock.return_value.replay = None
+        pong_mock.return_value.transport = None
+        pong_main.main(["--computer", "right", "--reaction", "5", "--error", "0"])
+        left, right = pong_mock.return_value.controllers
+    assert not isinstance(left, ComputerController)
+    assert right == ComputerController(reaction_ticks=5, error=0, seed=1)
@@ -1,11 +1,68 @@
-from pyglet.image import Texture
-from pyglet.window import Window
+from unittest import mock
 
+from pyglet.image import Texture, load
+
+from pong import assets
 from pong.assets import AssetManager, AssetTag
 
 
 def test_asset_loading():
     am = AssetManager()
-    am.load(Window(visible=False))
+    am.load(640, 480)
     for tag in AssetTag:
         assert isinstance(am.get_asset(tag), Texture)
+
+
+def test_assets_share_one_atlas_texture():
+    am = AssetManager()
+    with mock.patch.object(assets, "load", wraps=load) as load_mock:
+        am.load(1000, 800)
+    assert load_mock.call_count == len(set(assets.ASSET_SOURCES.values()))
+    assert len({am.get_asset(tag).id for tag in AssetTag}) == 1
+    assert (am.get_asset(AssetTag.BAR).width, am.get_asset(AssetTag.BAR).height) == (
+        25,
+        120,
+    )
+    assert am.get_asset(AssetTag.WALL).width == 1000
+    assert am.get_asset(AssetTag.BALL).width == 30
+
+
+def test_background_loading():
+    am = AssetManager()
+    am.load_async(640, 480)
+    assert am.progress == 0
+    assert not am.ready
+    while not am.ready:
+        am.pump(max_uploads=1)
+    assert am.progress == 1
+    assert am.executor is None
+    for tag in AssetTag:
+        assert isinstance(am.get_asset(tag), Texture)
+    am.finish()
+
+
+def test_scaled_variants():
+    am = AssetManager()
+    am.load(1000, 800)
+    bar = am.get_asset(AssetTag.BAR, 2.0)
+    assert (bar.width, bar.height) == (50, 240)
+    assert bar.id == am.get_asset(AssetTag.BAR).id
+    assert am.get_asset(AssetTag.BALL, 0.5).width == 15
+    # Even the smallest variant is drawn
+    assert am.get_asset(AssetTag.BALL, 0.001).width == 1
+    assert am.get_asset(AssetTag.BAR, 2.0) is bar
+
+
+def test_scaled_variants_are_bounded():
+    am = AssetManager()
+    am.load(1000, 800)
+    first = am.get_asset(AssetTag.WALL, 0.5)
+    for i in range(assets.VARIANT_CACHE_SIZE - 1):
+        am.get_asset(AssetTag.WALL, 1.5 + i)
+    # Using the oldest scale again keeps it, and the next oldest is dropped instead
+    assert am.get_asset(AssetTag.WALL, 0.5) is first
+    am.get_asset(AssetTag.WALL, 3.0)
+    assert len(am.variants) == assets.VARIANT_CACHE_SIZE
+    assert 0.5 in am.variants
+    assert 1.5 not in am.variants
+    assert am.get_asset(AssetTag.WALL, 1.0) is am.get_asset(AssetTag.WALL)
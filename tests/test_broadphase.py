@@ -0,0 +1,84 @@
+import random
+from itertools import combinations
+
+import pytest
+from pong.broadphase import SpatialHash
+from pong.game_objects import Ball, Wall
+
+
+def random_objects(count, seed):
+    rng = random.Random(seed)
+    objects = [Wall(0, 0, 1024, 19), Wall(0, 749, 1024, 19)]
+    objects += [
+        Ball(rng.uniform(-50, 1050), rng.uniform(-50, 800), 30, rng.randint(10, 150))
+        for _ in range(count)
+    ]
+    return objects
+
+
+def colliding(pairs):
+    return {
+        frozenset((id(obj1), id(obj2))) for obj1, obj2 in pairs if obj1.collision(obj2)
+    }
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_finds_every_colliding_pair(seed):
+    objects = random_objects(200, seed)
+    expected = colliding(
+        pair
+        for pair in combinations(objects, 2)
+        if not (pair[0].static and pair[1].static)
+    )
+    assert colliding(SpatialHash().pairs(objects)) == expected
+
+
+def test_pairs_are_unique():
+    objects = random_objects(200, 0)
+    pairs = [
+        frozenset((id(obj1), id(obj2))) for obj1, obj2 in SpatialHash().pairs(objects)
+    ]
+    assert len(pairs) == len(set(pairs))
+
+
+def test_touching_objects_are_paired():
+    obj1 = Ball(0, 0, 64, 64)
+    obj2 = Ball(64, 64, 10, 10)
+    assert list(SpatialHash(64, brute_force_limit=0).pairs([obj1, obj2])) == [
+        (obj1, obj2)
+    ]
+
+
+@pytest.mark.parametrize("brute_force_limit", [0, 24])
+def test_static_objects_are_not_paired(brute_force_limit):
+    walls = [Wall(0, 0, 100, 100), Wall(50, 50, 100, 100)]
+    assert list(SpatialHash(brute_force_limit=brute_force_limit).pairs(walls)) == []
+
+
+def test_few_objects_are_paired_exhaustively():
+    objects = random_objects(5, 0)
+    assert len(list(SpatialHash().pairs(objects))) == 5 * 4 // 2 + 5 * 2
+
+
+def test_static_index_is_rebuilt_when_static_objects_change():
+    broadphase = SpatialHash(brute_force_limit=0)
+    ball = Ball(500, 500, 10, 10)
+    assert list(broadphase.pairs([ball, Wall(0, 0, 100, 100)])) == []
+    wall = Wall(480, 480, 100, 100)
+    assert list(broadphase.pairs([ball, wall])) == [(wall, ball)]
+
+
+@pytest.mark.parametrize("brute_force_limit", [0, 24])
+def test_near_finds_everything_within_reach(brute_force_limit):
+    objects = random_objects(50, 0)
+    broadphase = SpatialHash(brute_force_limit=brute_force_limit)
+    list(broadphase.pairs(objects))
+    mover = Ball(500, 400, 30, 30)
+    reach = 100
+    near = broadphase.near(mover, reach)
+    # Everything the mover could touch, anywhere within its reach
+    grown = Ball(500 - reach, 400 - reach, 30 + 2 * reach, 30 + 2 * reach)
+    assert {id(obj) for obj in objects if grown.collision(obj)} <= set(map(id, near))
+    assert len(near) == len(set(map(id, near)))
+    assert mover not in near
+    assert objects[2] not in broadphase.near(objects[2], reach)
@@ -0,0 +1,49 @@
+import pytest
+from pong.collision import sweep
+from pong.game_objects import Wall
+
+
+def box(x, y, width=10, height=10):
+    return Wall(x, y, width, height)
+
+
+def test_head_on_impact():
+    impact = sweep(box(0, 0), 100, 0, box(50, 0))
+    assert impact.time == pytest.approx(0.4)
+    assert (impact.normal_x, impact.normal_y) == (-1, 0)
+
+
+def test_impact_from_above():
+    impact = sweep(box(0, 50), 0, -100, box(0, 0))
+    assert impact.time == pytest.approx(0.4)
+    assert (impact.normal_x, impact.normal_y) == (0, 1)
+
+
+def test_corner_impact_reflects_both_axes():
+    impact = sweep(box(0, 0), 20, 20, box(20, 20))
+    assert impact.time == pytest.approx(0.5)
+    assert (impact.normal_x, impact.normal_y) == (-1, -1)
+
+
+def test_overlap_impacts_straight_away():
+    # Penetrated 2px horizontally and 5px vertically
+    impact = sweep(box(0, 0), 10, 10, box(8, 5))
+    assert impact.time == 0
+    assert (impact.normal_x, impact.normal_y) == (-1, 0)
+    impact = sweep(box(10, 10), -10, -10, box(5, 5))
+    assert (impact.normal_x, impact.normal_y) == (1, 1)
+
+
+@pytest.mark.parametrize(
+    "mover,delta,obstacle",
+    [
+        (box(0, 0), (10, 0), box(50, 0)),  # Falls short
+        (box(0, 0), (100, 0), box(50, 30)),  # Passes beside
+        (box(0, 0), (0, 100), box(30, 50)),  # Passes beside, moving vertically
+        (box(0, 0), (-100, 0), box(50, 0)),  # Moves away
+        (box(0, 0), (-10, 10), box(8, 5)),  # Overlapping, but moving apart
+        (box(0, 0), (0, 0), box(50, 0)),  # Not moving
+    ],
+)
+def test_no_impact(mover, delta, obstacle):
+    assert sweep(mover, *delta, obstacle) is None
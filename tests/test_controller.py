@@ -0,0 +1,74 @@
+from pong.controller import DOWN, UP, Controller, InputQueue, Keymap
+
+
+def test_keymap_binds_keys_to_actions():
+    first = Controller(1, 2)
+    second = Controller(3, 4)
+    keymap = Keymap([first, second, Controller(0, 0)])
+    assert keymap.bindings == {
+        1: (first, UP),
+        2: (first, DOWN),
+        3: (second, UP),
+        4: (second, DOWN),
+    }
+    # Later controllers take shared keys
+    keymap.bind([first, Controller(1, 5)])
+    assert keymap.bindings[1][0] is not first
+
+
+def test_controller_hold():
+    controller = Controller(1, 2)
+    controller.hold(UP, True)
+    controller.hold(DOWN, True)
+    assert controller.player_up and controller.player_down
+    controller.hold(UP, False)
+    assert not controller.player_up
+
+
+def test_input_queue_applies_events_in_time():
+    controller = Controller(1, 2)
+    queue = InputQueue(Keymap([controller]))
+    queue.push(0.5, 1, True)
+    queue.push(0.7, 9, True)
+    queue.push(1.5, 1, False)
+    assert len(queue) == 2
+    queue.apply(1.0)
+    assert controller.player_up
+    assert len(queue) == 1
+    queue.apply(2.0)
+    assert not controller.player_up
+    assert len(queue) == 0
+
+
+def test_input_queue_holds_taps_for_a_step():
+    controller = Controller(1, 2)
+    queue = InputQueue(Keymap([controller]))
+    queue.push(0.1, 1, True)
+    queue.push(0.2, 1, False)
+    queue.apply(1.0)
+    assert controller.player_up
+    queue.apply(2.0)
+    assert not controller.player_up
+
+    # Pressed again before the same step, so the key stays down
+    queue.push(2.1, 1, True)
+    queue.push(2.2, 1, False)
+    queue.push(2.3, 1, True)
+    queue.apply(3.0)
+    queue.apply(4.0)
+    assert controller.player_up
+
+
+def test_input_queue_skips_unbound_keys():
+    controller = Controller(1, 2)
+    keymap = Keymap([controller])
+    queue = InputQueue(keymap)
+    queue.push(0.1, 1, True)
+    queue.push(0.2, 2, True)
+    keymap.bind([Controller(0, 2)])
+    queue.apply(1.0)
+    assert not controller.player_up
+    assert not controller.player_down
+    queue.push(1.1, 2, True)
+    queue.clear()
+    assert len(queue) == 0
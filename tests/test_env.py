@@ -0,0 +1,126 @@
+import multiprocessing
+import subprocess
+import sys
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+import pytest
+from pong.env import DOWN, OBSERVATION_SIZE, STAY, UP, PongEnv, VectorEnv, run_worker
+
+
+def play(env, actions):
+    results = []
+    for action in actions:
+        observation, reward, done, _ = env.step(action)
+        results.append((observation.copy(), reward, done))
+        if done:
+            env.reset()
+    return results
+
+
+def test_env_does_not_import_pyglet():
+    code = "import sys, pong.env; assert 'pyglet' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_reset_observation():
+    env = PongEnv(width=1000, height=800)
+    observation = env.reset()
+    assert observation.shape == (OBSERVATION_SIZE,)
+    assert observation.dtype == np.float32
+    assert observation[:2] == pytest.approx([0.5, 0.5])
+    # Served up and to the right
+    assert observation[2] > 0 and observation[3] > 0
+    assert observation[5] == observation[7] == 0
+
+
+def test_actions_move_agent_paddle():
+    env = PongEnv()
+    start = env.reset()[4]
+    observation, _, _, _ = env.step(UP)
+    assert observation[4] > start
+    assert observation[5] > 0
+    observation, _, _, _ = env.step(DOWN)
+    assert observation[4] == pytest.approx(start)
+    assert observation[5] < 0
+
+
+@pytest.mark.parametrize("side", [0, 1])
+def test_conceding_ends_episode(side):
+    env = PongEnv(side=side, frame_skip=4)
+    env.reset()
+    # The agent never moves, so sooner or later it misses
+    for _ in range(10000):
+        _, reward, done, info = env.step(STAY)
+        if done:
+            break
+    assert reward == -1
+    scores = info["left_score"], info["right_score"]
+    assert scores == ((0, 1) if side == 0 else (1, 0))
+    assert env.ticks % 4 == 0
+
+
+def test_episode_times_out():
+    env = PongEnv(max_ticks=50)
+    env.reset()
+    done = [env.step(STAY)[2] for _ in range(50)]
+    assert done == [False] * 49 + [True]
+
+
+def test_vector_env_matches_single_envs():
+    count = 5
+    actions = np.random.default_rng(0).integers(0, 3, size=(300, count))
+    with VectorEnv(count, workers=2, max_ticks=100, seed=10) as vector:
+        observations = vector.reset()
+        assert observations.shape == (count, OBSERVATION_SIZE)
+        steps = [tuple(array.copy() for array in vector.step(step)) for step in actions]
+
+    for i in range(count):
+        env = PongEnv(max_ticks=100, seed=10 + i)
+        env.reset()
+        expected = play(env, actions[:, i])
+        for (observations, rewards, dones), (observation, reward, done) in zip(
+            steps, expected
+        ):
+            # Environments that are done have already been reset
+            if not done:
+                assert observations[i] == pytest.approx(observation)
+            assert rewards[i] == reward
+            assert dones[i] == done
+    assert any(done for _, _, done in expected)
+
+
+def test_buffers_are_aligned():
+    # Odd counts leave the int8 actions a size that is no multiple of 4
+    for count in (1, 3, 7):
+        memory = SharedMemory(create=True, size=VectorEnv.memory_size(count))
+        arrays = VectorEnv.buffers(memory, count)
+        for array in arrays:
+            assert array.ctypes.data % 64 == 0
+        assert sum(array.nbytes for array in arrays) <= memory.size
+        del arrays, array
+        memory.close()
+        memory.unlink()
+
+
+def test_worker():
+    count = 2
+    memory = SharedMemory(create=True, size=VectorEnv.memory_size(count))
+    observations, actions, rewards, dones = VectorEnv.buffers(memory, count)
+    parent, child = multiprocessing.Pipe()
+    for command in ("reset", "step", "close"):
+        parent.send(command)
+    actions[:] = [UP, DOWN]
+    run_worker(child, memory.name, count, 1, 2, {"max_ticks": 1})
+
+    assert parent.recv() is None
+    assert parent.recv() is None
+    # Only the second environment belongs to this worker
+    assert not observations[0].any()
+    assert dones[1]
+    # Reset once done
+    assert observations[1][:2] == pytest.approx([0.5, 0.5])
+    del observations, actions, rewards, dones
+    memory.close()
+    memory.unlink()
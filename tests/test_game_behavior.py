@@ -1,125 +1,188 @@
 import math
 
-from pyglet.image import load
-from pyglet.sprite import Sprite
-from pyglet.window import key
-
 import pytest
-from pong.game import Controller
-from pong.game_objects import Ball, Paddle, Wall
-
-BALL_SPRITE = Sprite(load("assets/ball.png").get_texture())
-WALL_SPRITE = Sprite(load("assets/ball.png").get_texture())
-PADDLE_SPRITE = Sprite(load("assets/ball.png").get_texture())
+from pong.controller import Controller
+from pong.game_objects import ABOVE, BALL, BELOW, PADDLE, WALL, Ball, Paddle, Wall
 
 
 @pytest.fixture(scope="function")
 def ball():
-    return Ball(BALL_SPRITE)
+    return Ball(0, 0, 30, 30)
 
 
 @pytest.fixture(scope="function")
 def paddle():
-    return Paddle(PADDLE_SPRITE, Controller(key.UP, key.DOWN))
+    return Paddle(0, 0, 30, 30, Controller(0, 1))
 
 
 @pytest.fixture(scope="function")
 def wall():
-    return Wall(WALL_SPRITE)
+    return Wall(0, 0, 30, 30)
 
 
 def test_ball_motion(ball):
-    pos1 = ball.sprite.x, ball.sprite.y
+    pos1 = ball.x, ball.y
     ball.update()
-    pos2 = ball.sprite.x, ball.sprite.y
+    pos2 = ball.x, ball.y
     assert pos1 != pos2
 
 
 def test_ball_bounces_off_paddle_straight(ball, paddle):
     ball.direction = 0
-    ball.collisions.append(paddle)
+    ball.touch(paddle)
     ball.update()
     assert ball.direction == math.pi
 
 
 def test_ball_bounces_off_paddle_at_angle(ball, paddle):
     ball.direction = math.pi / 4
-    ball.collisions.append(paddle)
+    ball.touch(paddle)
     ball.update()
     assert ball.direction == 3 * math.pi / 4
 
 
 def test_ball_bounces_off_wall(ball, wall):
     ball.direction = math.pi / 4
-    ball.collisions.append(wall)
+    ball.touch(wall)
     ball.update()
     assert ball.direction == -math.pi / 4
+    assert ball.bounces == 1
+    ball.contacts = 0
+    ball.update()
+    assert ball.bounces == 0
 
 
 def test_ball_speed_changes_after_paddle_hit(ball, paddle):
     start_speed = ball.speed
-    ball.collisions.append(paddle)
+    ball.touch(paddle)
     ball.update()
     assert ball.speed > start_speed
 
 
 def test_ball_speed_same_after_wall_hit(ball, wall):
     start_speed = ball.speed
-    ball.collisions.append(wall)
+    ball.touch(wall)
     ball.update()
     assert ball.speed == start_speed
 
 
 def test_ball_reset(ball, paddle):
-    position = ball.sprite.x, ball.sprite.y
+    position = ball.x, ball.y
     speed = ball.speed
     direction = ball.direction
     ball.update()
-    ball.collisions.append(paddle)
+    ball.touch(paddle)
     ball.update()
-    assert ball.sprite.x, ball.sprite.y != position
+    assert (ball.x, ball.y) != position
     assert ball.speed != speed
     assert ball.direction != direction
     ball.reset()
-    assert ball.sprite.x, ball.sprite.y == position
+    assert (ball.x, ball.y) == position
     assert ball.speed == speed
     assert ball.direction == direction
 
 
 def test_paddle_controls(paddle):
-    start_y = paddle.sprite.y
+    start_y = paddle.y
     paddle.controller.player_up = True
     paddle.update()
-    assert paddle.sprite.y > start_y
+    assert paddle.y > start_y
     paddle.controller.player_up = False
     paddle.controller.player_down = True
     paddle.update()
-    assert paddle.sprite.y == start_y
+    assert paddle.y == start_y
 
 
 def test_wall_blocks_paddle_up(paddle, wall):
-    start_y = paddle.sprite.y
-    wall.sprite.update(wall.sprite.x, start_y + 1)
-    paddle.collisions.append(wall)
+    start_y = paddle.y
+    wall.y = start_y + 1
+    paddle.touch(wall)
 
     paddle.controller.player_up = True
     paddle.update()
-    assert paddle.sprite.y == start_y
+    assert paddle.y == start_y
     paddle.controller.player_up = False
     paddle.controller.player_down = True
     paddle.update()
-    assert paddle.sprite.y < start_y
+    assert paddle.y < start_y
 
 
 def test_wall_blocks_paddle_down(paddle, wall):
-    start_y = paddle.sprite.y
-    wall.sprite.update(wall.sprite.x, start_y - 1)
-    paddle.collisions.append(wall)
+    start_y = paddle.y
+    wall.y = start_y - 1
+    paddle.touch(wall)
 
     paddle.controller.player_down = True
     paddle.update()
-    assert paddle.sprite.y == start_y
+    assert paddle.y == start_y
     paddle.controller.player_down = False
     paddle.controller.player_up = True
     paddle.update()
-    assert paddle.sprite.y > start_y
+    assert paddle.y > start_y
+
+
+def test_fast_ball_does_not_tunnel_through_paddle(ball):
+    paddle = Paddle(200, -50, 5, 130, Controller(0, 1))
+    ball.direction = 0
+    ball.speed = 500
+    ball.advance([paddle])
+    # Touches the paddle after 170px, and travels back for the rest of the tick
+    assert ball.x == pytest.approx(170 - 501 * (1 - 170 / 500))
+    assert ball.direction == math.pi
+    assert ball.speed == 501
+
+
+def test_ball_bounces_several_times_in_one_tick(ball):
+    ball.y = 10
+    floor = Wall(-1000, -10, 3000, 10)
+    ceiling = Wall(-1000, 50, 3000, 10)
+    ball.direction = math.pi / 2 + 0.1
+    ball.speed = 200
+    ball.advance([floor, ceiling])
+    assert floor.y + floor.height <= ball.y <= ceiling.y - ball.height
+    assert ball.speed == 200
+    assert ball.bounces == ball.max_bounces
+
+
+def test_ball_bounces_off_paddle_edge(ball):
+    paddle = Paddle(-100, 40, 300, 20, Controller(0, 1))
+    ball.direction = math.pi / 2
+    ball.advance([paddle])
+    ball.advance([paddle])
+    assert ball.direction == -math.pi / 2
+    assert ball.speed == Ball.initial_speed
+
+
+def test_paddle_moving_into_ball_hits_it(ball):
+    # The paddle has moved down over the ball, just as it reached the paddle
+    paddle = Paddle(25, 10, 10, 130, Controller(0, 1))
+    ball.direction = 0
+    ball.advance([paddle])
+    assert ball.direction == math.pi
+    assert ball.speed == Ball.initial_speed + ball.acceleration
+    assert ball.x < 0
+
+
+def test_ball_ignores_other_balls(ball):
+    ball.direction = 0
+    ball.advance([Ball(31, 0, 30, 30)])
+    assert ball.x == pytest.approx(ball.initial_speed)
+
+
+def test_touch_records_kind_and_side(paddle, ball):
+    above = Wall(0, 100, 30, 30)
+    below = Wall(0, -100, 30, 30)
+    paddle.touch(above)
+    assert paddle.contacts & WALL
+    assert paddle.contacts & WALL << ABOVE
+    assert not paddle.contacts & WALL << BELOW
+    paddle.touch(below)
+    paddle.touch(ball)
+    assert paddle.contacts & WALL << BELOW
+    assert paddle.contacts & BALL
+    assert not paddle.contacts & PADDLE
+
+
+def test_game_objects_are_slotted(ball, paddle, wall):
+    for obj in (ball, paddle, wall):
+        assert not hasattr(obj, "__dict__")
@@ -0,0 +1,46 @@
+from pyglet.graphics import Batch
+from pyglet.window import Window
+
+import pytest
+from pong.hud import Counter, digit_font
+
+
+@pytest.fixture(scope="module")
+def window():
+    window = Window(visible=False)
+    yield window
+    window.close()
+
+
+def test_digit_font_is_cached(window):
+    assert digit_font("Times New Roman", 25) is digit_font("Times New Roman", 25)
+    assert len(digit_font("Times New Roman", 25).glyphs) == 10
+
+
+def test_counter_swaps_glyphs(window):
+    font = digit_font("Times New Roman", 25)
+    counter = Counter(font, 100, 100, Batch())
+    assert counter.sprites[0].image is font.glyphs[0]
+
+    counter.set(123)
+    assert [sprite.image for sprite in counter.sprites] == [
+        font.glyphs[1],
+        font.glyphs[2],
+        font.glyphs[3],
+    ]
+    # Centered on the counter position
+    assert counter.sprites[0].x < 100 < counter.sprites[2].x
+
+    sprites = list(counter.sprites)
+    counter.set(7)
+    assert counter.sprites == sprites
+    assert counter.sprites[0].image is font.glyphs[7]
+    assert [sprite.visible for sprite in counter.sprites] == [True, False, False]
+
+
+def test_counter_ignores_unchanged_value(window):
+    counter = Counter(digit_font("Times New Roman", 25), 100, 100, Batch())
+    counter.set(5)
+    counter.sprites[0].image = counter.font.glyphs[0]
+    counter.set(5)
+    assert counter.sprites[0].image is counter.font.glyphs[0]
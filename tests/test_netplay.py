@@ -0,0 +1,243 @@
+import random
+from unittest import mock
+from unittest.mock import MagicMock
+
+from pyglet.window import Window
+
+import pytest
+from pong import main as pong_main
+from pong.ai import ComputerController
+from pong.controller import Controller
+from pong.game import Pong
+from pong.game_screen import GameScreen
+from pong.netplay import RollbackSession, SimulatedNetwork, UdpTransport, decode, encode
+from pong.simulation import Match
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Link:
+    """In-memory Transport to another Link, which can drop everything it sends."""
+
+    def __init__(self):
+        self.peer = None
+        self.packets = []
+        self.dropping = False
+
+    def send(self, packet):
+        if not self.dropping:
+            self.peer.packets.append(packet)
+
+    def receive(self):
+        packets, self.packets = self.packets, []
+        return packets
+
+
+@pytest.fixture(scope="function")
+def transports():
+    left = UdpTransport(("127.0.0.1", 0), ("127.0.0.1", 0))
+    right = UdpTransport(("127.0.0.1", 0), ("127.0.0.1", 0))
+    left.peer = right.address
+    right.peer = left.address
+    yield left, right
+    left.close()
+    right.close()
+
+
+def new_match():
+    return Match(1024, 768, [Controller(0, 1), Controller(2, 3)])
+
+
+def press_randomly(rng, *sessions):
+    for session in sessions:
+        session.local.player_up = rng.random() < 0.5
+        session.local.player_down = rng.random() < 0.5
+
+
+def test_encode_and_decode():
+    controller = Controller(0, 1)
+    for controls in range(4):
+        decode(controls, controller)
+        assert encode(controller) == controls
+
+
+@pytest.mark.parametrize("latency,loss", [(0.0, 0.0), (0.05, 0.0), (0.05, 0.2)])
+def test_peers_stay_in_step(transports, latency, loss):
+    clock = Clock()
+    left = RollbackSession(
+        new_match(), 0, SimulatedNetwork(transports[0], latency, loss, clock, seed=1)
+    )
+    right = RollbackSession(
+        new_match(), 1, SimulatedNetwork(transports[1], latency, loss, clock, seed=2)
+    )
+    rng = random.Random(0)
+    for tick in range(1500):
+        if tick % 20 == 0:
+            press_randomly(rng, left, right)
+        left.advance()
+        right.advance()
+        clock.now += 0.01
+
+    # Let every control arrive, then compare the two matches
+    press_randomly(random.Random(1), left, right)
+    left.local.player_up = left.local.player_down = False
+    right.local.player_up = right.local.player_down = False
+    for _ in range(100):
+        left.advance()
+        right.advance()
+        clock.now += 0.01
+    assert left.tick == right.tick == 1600
+    assert left.match.snapshot() == right.match.snapshot()
+    if latency:
+        assert left.rollbacks and right.rollbacks
+        # Rollbacks only go as far back as the controls are late
+        assert left.resimulated / left.rollbacks < 2 * latency / 0.01
+    else:
+        # The peer that advances first hears of each change one tick late
+        assert left.resimulated == left.rollbacks
+        assert not right.rollbacks
+
+
+def test_peers_recover_from_one_way_loss():
+    links = Link(), Link()
+    links[0].peer, links[1].peer = links[1], links[0]
+    left = RollbackSession(new_match(), 0, links[0])
+    right = RollbackSession(new_match(), 1, links[1])
+    rng = random.Random(0)
+    for tick in range(400):
+        # Only packets from left to right are lost
+        links[0].dropping = 100 <= tick < 200
+        if tick % 20 == 0:
+            press_randomly(rng, left, right)
+        left.advance()
+        right.advance()
+    # Neither peer ran further ahead than the other could catch up from
+    assert left.tick > 300 and right.tick > 300
+
+    for session in (left, right):
+        session.local.player_up = session.local.player_down = False
+    for _ in range(100):
+        left.advance()
+        right.advance()
+    # The peer that advances first hears of the last tick one tick late
+    assert left.tick == right.tick == right.confirmed == left.confirmed + 1
+    assert left.match.snapshot() == right.match.snapshot()
+
+
+def test_computer_player_over_network(transports):
+    clock = Clock()
+    computer = ComputerController(reaction_ticks=5, error=20)
+    left = RollbackSession(
+        Match(1024, 768, [computer, Controller(2, 3)]),
+        0,
+        SimulatedNetwork(transports[0], 0.05, 0.0, clock, seed=1),
+    )
+    right = RollbackSession(
+        new_match(), 1, SimulatedNetwork(transports[1], 0.05, 0.0, clock, seed=2)
+    )
+    for _ in range(600):
+        left.advance()
+        right.advance()
+        clock.now += 0.01
+    # Compare the peers at the last tick both have every control for
+    tick = min(left.confirmed, right.confirmed)
+    assert tick > 500
+    left.history.restore(tick)
+    right.history.restore(tick)
+    assert left.match.snapshot() == right.match.snapshot()
+    assert left.match.paddles[0].y != left.match.paddles[0].start_y
+
+
+def test_session_waits_for_silent_peer(transports):
+    session = RollbackSession(new_match(), 0, SimulatedNetwork(transports[0], loss=1))
+    for _ in range(10):
+        assert session.advance()
+    session.local.player_up = True
+    for _ in range(25):
+        session.advance()
+    assert session.stalled
+    assert not session.advance()
+    assert session.tick == 30
+    # The local controller keeps whatever the keys say while waiting
+    assert session.local.player_up
+
+
+def test_session_ignores_stray_packets(transports):
+    session = RollbackSession(new_match(), 0, transports[0])
+    transports[1].send(b"x")
+    assert session.advance()
+    assert session.confirmed == 0
+
+
+def test_session_only_takes_controls_it_has_reached(transports):
+    ahead = RollbackSession(new_match(), 1, transports[1])
+    for _ in range(10):
+        ahead.advance()
+    behind = RollbackSession(new_match(), 0, transports[0])
+    behind.advance()
+    assert behind.confirmed == 1
+
+
+def test_udp_transport_survives_bad_peer(transports):
+    transports[0].peer = ("127.0.0.1", 0)
+    transports[0].send(b"lost")
+    assert transports[1].receive() == []
+
+
+def test_game_screen_plays_over_network(transports):
+    game = Pong(Window(visible=False))
+    game.load()
+    game.transport = transports[0]
+    game.show(GameScreen)
+    screen = game.screen
+    match = screen.match
+    peer_match = Match(match.width, match.height, [Controller(0, 1), Controller(2, 3)])
+    peer = RollbackSession(peer_match, 1, transports[1])
+
+    game.controllers[0].player_up = True
+    peer.local.player_down = True
+    for _ in range(200):
+        screen.update(0.01)
+        peer.advance()
+    game.controllers[0].player_up = False
+    peer.local.player_down = False
+    for _ in range(50):
+        screen.update(0.01)
+        peer.advance()
+
+    assert screen.tick == peer.tick == 250
+    assert screen.match.snapshot() == peer.match.snapshot()
+    assert screen.match.paddles[0].y > screen.match.paddles[0].start_y
+
+
+def test_game_screen_waits_for_network():
+    game = Pong(Window(visible=False))
+    game.load()
+    game.transport = SimulatedNetwork(MagicMock(), loss=1)
+    game.show(GameScreen)
+    for _ in range(100):
+        game.screen.update(0.01)
+    assert game.screen.tick == game.screen.session.max_rollback
+
+
+@mock.patch("pyglet.window.Window")
+@mock.patch("pyglet.app.run", new=MagicMock())
+def test_network_startup(window_mock):
+    window_mock.return_value = Window(visible=False)
+    with mock.patch("pong.netplay.UdpTransport") as transport_mock:
+        pong_main.main(["--listen", "0", "--peer", "127.0.0.1:5000", "--side", "right"])
+    transport_mock.assert_called_with(("", 0), ("127.0.0.1", 5000))
+
+
+@pytest.mark.parametrize(
+    "argv", [["--listen", "5000"], ["--listen", "0", "--peer", "a:1", "--record", "f"]]
+)
+def test_network_startup_errors(argv):
+    with pytest.raises(SystemExit):
+        pong_main.main(argv)
@@ -0,0 +1,148 @@
+import json
+import subprocess
+import sys
+from time import perf_counter
+from unittest import mock
+
+from pyglet.window import Window, key
+
+import pytest
+from pong import STARTED
+from pong.game import Pong
+from pong.game_screen import GameScreen
+from pong.profiler import FrameProfiler, RingBuffer, StartupTimer, launch_time
+from pong.screens import TitleScreen
+
+
+@pytest.fixture(scope="function")
+def game():
+    game = Pong(Window(visible=False))
+    game.load()
+    game.window._allow_dispatch_event = True
+    return game
+
+
+def test_ring_buffer_wraps_around():
+    buffer = RingBuffer(3)
+    assert len(buffer) == 0
+    assert buffer.percentile(50) == 0
+    for value in range(5):
+        buffer.append(value)
+    assert len(buffer) == 3
+    assert list(buffer) == [2, 3, 4]
+
+
+def test_ring_buffer_percentiles():
+    buffer = RingBuffer(100)
+    for value in range(100):
+        buffer.append(99 - value)
+    assert buffer.percentile(0) == 0
+    assert buffer.percentile(50) == 50
+    assert buffer.percentile(99) == 99
+    assert buffer.percentile(100) == 99
+
+
+def test_profiler_records_frames():
+    profiler = FrameProfiler(0.01, capacity=10)
+    for _ in range(20):
+        profiler.begin_simulation(0.015)
+        profiler.end_simulation(2)
+        profiler.begin_draw()
+        profiler.end_draw()
+    profiler.transition("GameScreen")
+
+    assert len(profiler.simulation_time) == len(profiler.draw_time) == 10
+    assert profiler.ticks.percentile(50) == 2
+    assert profiler.jitter.percentile(50) == pytest.approx(0.005)
+    assert "ticks" in profiler.summary()
+
+
+def test_profiler_trace_export(tmp_path):
+    profiler = FrameProfiler(0.01)
+    profiler.begin_simulation(0.01)
+    profiler.end_simulation(1)
+    profiler.begin_draw()
+    profiler.end_draw()
+    profiler.transition("TitleScreen")
+
+    path = tmp_path / "trace.json"
+    profiler.export(str(path))
+    events = json.loads(path.read_text())["traceEvents"]
+    assert [event["name"] for event in events] == ["simulate", "draw", "TitleScreen"]
+    assert events[0]["args"]["ticks"] == 1
+    assert events[2]["ph"] == "i"
+
+
+def test_profiler_disabled_by_default(game):
+    game.show(TitleScreen)
+    game.tick(0.02)
+    game.window.dispatch_event("on_draw")
+    assert not game.profiler.enabled
+    assert len(game.profiler.simulation_time) == 0
+    assert len(game.profiler.draw_time) == 0
+
+
+def test_profiler_toggled_by_key(game, tmp_path, monkeypatch):
+    game.show(TitleScreen)
+    game.window.dispatch_event("on_key_press", key.F3, 0)
+    assert game.profiler.enabled
+
+    game.tick(0.02)
+    game.window.dispatch_event("on_draw")
+    game.asset_manager.finish()
+    game.show(GameScreen)
+    assert len(game.profiler.simulation_time) == 1
+    assert game.profiler.ticks.percentile(50) == 2
+    assert len(game.profiler.draw_time) == 1
+    assert game.profiler_overlay.label.text == game.profiler.summary()
+    assert [name for _, name in game.profiler.transitions] == ["GameScreen"]
+
+    monkeypatch.chdir(tmp_path)
+    game.window.dispatch_event("on_key_press", key.F4, 0)
+    assert (tmp_path / "pong-trace.json").exists()
+
+    game.window.dispatch_event("on_key_press", key.F3, 0)
+    assert not game.profiler.enabled
+
+
+def test_draw_without_screen(game):
+    game.on_draw()
+
+
+def test_startup_report():
+    timer = StartupTimer(1.0)
+    timer.mark("imports", 1.25)
+    timer.mark("first frame", 1.5)
+    timer.mark("now")
+    assert timer.report().splitlines()[:3] == [
+        "startup           phase    total",
+        "imports         250.0ms  250.0ms",
+        "first frame     250.0ms  500.0ms",
+    ]
+
+
+def test_launch_time():
+    launched = launch_time(STARTED)
+    # The interpreter takes some time to start
+    assert launched < STARTED
+    assert launched > perf_counter() - 3600
+    with mock.patch("pong.profiler.open", side_effect=OSError, create=True):
+        assert launch_time(STARTED) == STARTED
+
+
+def test_startup_report_on_first_frame(game, capsys):
+    game.startup = StartupTimer(STARTED)
+    game.show(TitleScreen)
+    game.on_draw()
+    assert "first frame" in capsys.readouterr().err
+    assert game.startup is None
+    game.on_draw()
+    assert capsys.readouterr().err == ""
+
+
+def test_title_screen_does_not_import_game_screen():
+    code = (
+        "import sys, pong.main, pong.game, pong.screens; "
+        "assert not {'pong.game_screen', 'pong.netplay', 'pong.hud'} & set(sys.modules)"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
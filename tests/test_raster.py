@@ -0,0 +1,154 @@
+import io
+import subprocess
+import sys
+
+import numpy as np
+
+import pytest
+from pong.controller import Controller
+from pong.env import PongEnv
+from pong.raster import DIGIT_CELL, Rasterizer, VideoWriter, main, render_replay
+from pong.replay import InputRecorder, Replay
+from pong.simulation import Match
+
+
+@pytest.fixture(scope="function")
+def match():
+    return Match(1024, 768, [Controller(0, 1), Controller(2, 3)])
+
+
+def test_raster_does_not_import_pyglet():
+    code = "import sys, pong.raster; assert 'pyglet' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_render_draws_objects(match):
+    rasterizer = Rasterizer(1024, 768)
+    frame = rasterizer.render(match)
+    assert frame.shape == (768, 1024, 3)
+    assert frame.dtype == np.uint8
+    for obj in match.game_objects:
+        # The play area is y-up, and the frame is y-down
+        row = 768 - int(obj.y) - 1
+        assert (frame[row, int(obj.x)] == 255).all()
+    # Between the ball and the right paddle
+    assert (frame[384, 700] == 0).all()
+
+
+def test_render_reuses_and_clears_frame(match):
+    rasterizer = Rasterizer(1024, 768, grayscale=True, scores=False)
+    frame = rasterizer.render(match)
+    before = frame.copy()
+    ball = match.ball
+    for _ in range(10):
+        match.update()
+    assert rasterizer.render(match) is frame
+    assert frame[768 - int(ball.y) - 1, int(ball.x) + ball.width - 1] == 255
+    # Only the ball moved, and nothing is left behind it
+    fresh = Rasterizer(1024, 768, grayscale=True, scores=False).render(match)
+    assert (frame == fresh).all()
+    assert (frame != before).any()
+
+
+def test_render_downscaled_grayscale(match):
+    rasterizer = Rasterizer(1024, 768, scale=84 / 768, grayscale=True)
+    frame = rasterizer.render(match)
+    assert frame.shape == (84, 112)
+    # Every object is still visible
+    assert frame[:, :4].any()
+    assert frame[:, -4:].any()
+    assert frame[0].all() and frame[-1].all()
+    assert rasterizer.rect(0, 0, 1, 1) == (83, 84, 0, 1)
+    assert rasterizer.rect(-100, 0, 10, 10) == (82, 84, 0, 0)
+
+
+def test_render_scores(match):
+    rasterizer = Rasterizer(1024, 768, grayscale=True)
+    frame = rasterizer.render(match).copy()
+    # A zero on each side of the middle
+    assert frame[:100, 472:512].any()
+    assert frame[:100, 512:552].any()
+    match.left_score = 18
+    changed = rasterizer.render(match)
+    assert (changed[:100, :512] != frame[:100, :512]).any()
+    assert (changed[:100, 512:] == frame[:100, 512:]).all()
+    match.left_score = 0
+    assert (rasterizer.render(match) == frame).all()
+
+    # Digits that do not fit are left out
+    tiny = Rasterizer(1024, 768, scale=0.01, grayscale=True)
+    assert tiny.frame.shape == (8, 10)
+    tiny.render(match)
+    tiny.number(1, 0, 384)
+    tiny.number(1, 0, 0)
+    assert tiny.digits[0].shape == (5, 3)
+    assert DIGIT_CELL * 3 == Rasterizer(10, 10).digits[8].shape[1]
+
+
+def test_video_writer(match):
+    rasterizer = Rasterizer(1024, 768, scale=0.25)
+    stream = io.BytesIO()
+    writer = VideoWriter(stream)
+    writer.write(rasterizer.render(match))
+    writer.write(rasterizer.render(match))
+    assert writer.frames == 2
+    assert len(stream.getvalue()) == 2 * 192 * 256 * 3
+    assert VideoWriter.ffmpeg_input(rasterizer, 50) == [
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "rgb24",
+        "-s",
+        "256x192",
+        "-r",
+        "50",
+    ]
+
+
+@pytest.fixture(scope="function")
+def recording(tmp_path):
+    path = str(tmp_path / "match.pong")
+    controllers = [Controller(0, 1, player_up=True), Controller(2, 3)]
+    match = Match(400, 300, controllers)
+    recorder = InputRecorder(path, match, controllers)
+    for _ in range(30):
+        recorder.record()
+        match.update()
+    recorder.close()
+    return path
+
+
+def test_render_replay(recording):
+    replay = Replay(recording)
+    rasterizer = Rasterizer(400, 300, grayscale=True)
+    stream = io.BytesIO()
+    render_replay(replay, rasterizer, VideoWriter(stream), every=10)
+    frames = np.frombuffer(stream.getvalue(), np.uint8).reshape(-1, 300, 400)
+    assert len(frames) == 4
+    # The left paddle moves up
+    assert (frames[0][:, :30] != frames[3][:, :30]).any()
+    replay.close()
+
+
+def test_raster_main(recording, tmp_path, capsys):
+    output = str(tmp_path / "match.raw")
+    main([recording, output, "--scale", "0.5", "--grayscale", "--every", "2"])
+    with open(output, "rb") as video:
+        assert len(video.read()) == 16 * 150 * 200
+    assert "-pix_fmt gray -s 200x150 -r 50" in capsys.readouterr().err
+
+
+def test_raster_main_to_stdout(recording, capsysbinary):
+    main([recording, "-", "--scale", "0.1"])
+    assert len(capsysbinary.readouterr().out) == 31 * 30 * 40 * 3
+
+
+def test_env_render():
+    env = PongEnv(width=1000, height=800)
+    env.reset()
+    frame = env.render()
+    assert frame.shape == (800, 1000, 3)
+    assert env.render() is frame
+    small = env.render(scale=0.1, grayscale=True)
+    assert small.shape == (80, 100)
+    assert env.render(scale=0.1, grayscale=True) is small
@@ -0,0 +1,198 @@
+from unittest import mock
+from unittest.mock import MagicMock
+
+from pyglet.window import Window
+
+import pytest
+from pong import main as pong_main
+from pong.ai import ComputerController
+from pong.controller import Controller
+from pong.game import Pong
+from pong.game_screen import GameScreen
+from pong.replay import HEADER, InputRecorder, Replay, main, ticks_per_byte
+from pong.screens import TitleScreen
+from pong.simulation import Match
+
+
+@pytest.fixture(scope="function")
+def game():
+    game = Pong(Window(visible=False))
+    game.load()
+    game.asset_manager.finish()
+    return game
+
+
+def controls(tick):
+    """An arbitrary but varied pattern of controls."""
+    return (tick % 3 == 0, tick % 5 == 0), (tick % 7 < 3, tick % 2 == 0)
+
+
+def play(match, controllers, ticks, recorder=None):
+    for tick in range(ticks):
+        for controller, (up, down) in zip(controllers, controls(tick)):
+            controller.player_up = up
+            controller.player_down = down
+        if recorder:
+            recorder.record()
+        match.update()
+
+
+def state(match):
+    return (
+        [(obj.x, obj.y) for obj in match.game_objects],
+        (match.left_score, match.right_score),
+    )
+
+
+def test_ticks_per_byte():
+    assert ticks_per_byte(1) == 4
+    assert ticks_per_byte(2) == 2
+    assert ticks_per_byte(4) == 1
+    with pytest.raises(ValueError):
+        ticks_per_byte(5)
+
+
+def test_record_and_replay(tmp_path):
+    path = str(tmp_path / "match.pong")
+    controllers = [Controller(0, 1), Controller(2, 3)]
+    match = Match(800, 600, controllers, continuous=True)
+    recorder = InputRecorder(path, match, controllers)
+    play(match, controllers, 3001, recorder)
+    recorder.close()
+    recorder.close()
+
+    # Two ticks per byte, the last one half filled
+    assert (tmp_path / "match.pong").stat().st_size == HEADER.size + 1501
+
+    replay = Replay(path)
+    assert (replay.width, replay.height, replay.ball_size) == (800, 600, 30)
+    assert replay.continuous
+    assert replay.ticks == 3001
+    assert [replay.controls(tick) for tick in range(3001)] == [
+        controls(tick) for tick in range(3001)
+    ]
+    assert state(replay.run()) == state(match)
+    replay.close()
+
+
+def test_replay_unfinished_recording(tmp_path):
+    path = str(tmp_path / "match.pong")
+    controllers = [Controller(0, 1), Controller(2, 3)]
+    match = Match(800, 600, controllers, continuous=False)
+    recorder = InputRecorder(path, match, controllers)
+    play(match, controllers, 101, recorder)
+    recorder.file.flush()
+
+    replay = Replay(path)
+    assert not replay.continuous
+    # Only complete bytes can be replayed
+    assert replay.ticks == 100
+    replay.close()
+    recorder.close()
+
+
+def test_replay_rejects_other_files(tmp_path):
+    path = tmp_path / "not-a-match"
+    path.write_bytes(b"")
+    with pytest.raises(ValueError):
+        Replay(str(path))
+    path.write_bytes(b"\0" * 100)
+    with pytest.raises(ValueError):
+        Replay(str(path))
+
+
+def test_game_screen_records_and_replays(game, tmp_path):
+    path = str(tmp_path / "match.pong")
+    game.record_path = path
+    game.show(GameScreen)
+    screen = game.screen
+    for tick in range(500):
+        for controller, (up, down) in zip(game.controllers, controls(tick)):
+            controller.player_up = up
+            controller.player_down = down
+        screen.update(0.01)
+    recorded = state(screen.match)
+    game.show(TitleScreen)
+
+    game.record_path = None
+    game.replay = Replay(path)
+    game.show(GameScreen)
+    for _ in range(600):
+        screen.update(0.01)
+    # The replay stops when the recording runs out
+    assert screen.tick == 500
+    assert state(screen.match) == recorded
+    game.replay.close()
+
+
+def test_game_screen_replays_match_settings(game, tmp_path):
+    path = str(tmp_path / "match.pong")
+    controllers = [Controller(0, 1), Controller(2, 3)]
+    width, height = game.viewport.width, game.viewport.height
+    match = Match(width, height, controllers, ball_size=7, continuous=False)
+    recorder = InputRecorder(path, match, controllers)
+    play(match, controllers, 1000, recorder)
+    recorder.close()
+
+    # Set up like the recording, not from the ball asset and the default mode
+    game.replay = Replay(path)
+    game.show(GameScreen)
+    screen = game.screen
+    assert screen.match.ball.width == 7
+    assert not screen.match.continuous
+    for _ in range(1000):
+        screen.update(0.01)
+    assert state(screen.match) == state(match)
+    game.replay.close()
+
+
+def test_game_screen_records_computer_players(game, tmp_path):
+    path = str(tmp_path / "match.pong")
+    game.record_path = path
+    game.controllers[:] = [
+        ComputerController(reaction_ticks=5, error=20, seed=i) for i in range(2)
+    ]
+    game.show(GameScreen)
+    screen = game.screen
+    states = []
+    for _ in range(1000):
+        screen.update(0.01)
+        states.append(state(screen.match))
+    game.show(TitleScreen)
+
+    # Every tick is replayed with the controls the computer players chose for it
+    replay = Replay(path)
+    controllers = [Controller(0, 0) for _ in range(replay.controllers)]
+    match = replay.match(controllers)
+    for tick in range(replay.ticks):
+        replay.apply(tick, controllers)
+        match.update()
+        assert state(match) == states[tick]
+    assert replay.ticks == 1000
+    replay.close()
+
+
+def test_headless_replay(tmp_path, capsys):
+    path = str(tmp_path / "match.pong")
+    controllers = [Controller(0, 1), Controller(2, 3)]
+    match = Match(800, 600, controllers)
+    recorder = InputRecorder(path, match, controllers)
+    play(match, controllers, 2000, recorder)
+    recorder.close()
+
+    main([path])
+    assert capsys.readouterr().out == f"{match.left_score} - {match.right_score}\n"
+
+
+@mock.patch("pyglet.window.Window")
+@mock.patch("pyglet.app.run", new=MagicMock())
+def test_replay_startup(window_mock, tmp_path):
+    path = str(tmp_path / "match.pong")
+    controllers = [Controller(0, 1), Controller(2, 3)]
+    InputRecorder(path, Match(640, 480, controllers), controllers).close()
+
+    window_mock.return_value = Window(visible=False)
+    pong_main.main(["--replay", path])
+    window_mock.assert_called_with(
+        width=640, height=480, resizable=True, fullscreen=False
+    )
@@ -0,0 +1,83 @@
+from pyglet.window import Window, key
+
+import pytest
+from pong.controller import Controller
+from pong.game import Pong
+from pong.game_screen import GameScreen
+from pong.rewind import RewindBuffer
+from pong.simulation import Match
+
+
+@pytest.fixture(scope="function")
+def match():
+    return Match(1024, 768, [Controller(0, 1), Controller(2, 3)])
+
+
+def play(match, history, ticks, start=0):
+    states = {}
+    for tick in range(start, start + ticks):
+        match.controllers[0].player_up = tick % 40 < 20
+        match.update()
+        history.save(tick)
+        states[tick] = (match.ball.x, match.ball.y, match.paddles[0].y)
+    return states
+
+
+def test_rewind_buffer_keeps_latest_ticks(match):
+    history = RewindBuffer(match, 100)
+    assert len(history) == 0
+    states = play(match, history, 250)
+    assert len(history) == 100
+    assert (history.oldest, history.newest) == (150, 249)
+    assert 149 not in history
+    with pytest.raises(IndexError):
+        history.restore(149)
+
+    for tick in (150, 200, 249):
+        history.restore(tick)
+        assert (match.ball.x, match.ball.y, match.paddles[0].y) == states[tick]
+
+
+def test_resimulating_replaces_the_future(match):
+    history = RewindBuffer(match, 100)
+    states = play(match, history, 50)
+    history.restore(20)
+    assert play(match, history, 29, start=21) == {
+        tick: states[tick] for tick in range(21, 50)
+    }
+
+    history.restore(20)
+    history.save(21)
+    assert history.newest == 21
+    assert 22 not in history
+
+    # A tick that does not follow on starts a new history
+    history.save(500)
+    assert (history.oldest, history.newest) == (500, 500)
+    history.clear()
+    assert len(history) == 0
+
+
+def test_game_screen_rewinds_while_backspace_held():
+    game = Pong(Window(visible=False))
+    game.load()
+    game.show(GameScreen)
+    screen = game.screen
+    for _ in range(300):
+        screen.update(0.01)
+    ball = screen.match.ball
+    position = ball.x, ball.y
+
+    screen.on_key_press(key.BACKSPACE)
+    for _ in range(100):
+        screen.update(0.01)
+    assert screen.tick == 200
+    screen.on_key_release(key.BACKSPACE)
+    for _ in range(100):
+        screen.update(0.01)
+    assert (ball.x, ball.y) == position
+
+    # Cannot rewind past the start of the match
+    screen.rewind(1000)
+    assert screen.tick == 0
+    assert (ball.x, ball.y) == (ball.start_x, ball.start_y)
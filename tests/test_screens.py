@@ -1,16 +1,21 @@
 import math
+from unittest import mock
 
+from pyglet import clock
+from pyglet.sprite import Sprite
 from pyglet.window import Window, key
 
 import pytest
 from pong.game import Pong
 from pong.game_objects import Ball
-from pong.screens import GameScreen, TitleScreen
+from pong.game_screen import GameScreen
+from pong.screen import Screen
+from pong.screens import TitleScreen
 
 
 @pytest.fixture(scope="function")
 def game():
-    game = Pong(Window(visible=False))
+    game = Pong(Window(visible=False), width=640, height=480)
     game.load()
     return game
 
@@ -28,47 +33,245 @@ def test_game_screen_construction(game):
 
 
 def test_title_to_game_screen_switch(game):
+    game.asset_manager.finish()
     game.set_screen(TitleScreen(game))
-    game.keys[key.ESCAPE] = True
-    game.screen.update(0.01)
+    game.window._allow_dispatch_event = True
+    game.window.dispatch_event("on_key_press", key.SPACE, 0)
+    assert isinstance(game.screen, GameScreen)
+
+
+def test_title_screen_waits_for_assets(game):
+    game.set_screen(TitleScreen(game))
+    with mock.patch.object(type(game.asset_manager), "ready", False):
+        game.screen.update(0.01)
+        game.screen.on_key_press(key.SPACE)
+        assert game.screen.prompt_label.text.startswith("Loading")
+    assert isinstance(game.screen, TitleScreen)
+    # Assets only start loading once the first frame is drawn
+    game.tick(0.01)
+    assert not game.asset_manager.started
+    game.on_draw()
+    while not game.asset_manager.ready:
+        game.tick(0.01)
+    game.screen.on_key_press(key.SPACE)
     assert isinstance(game.screen, GameScreen)
 
 
 def test_left_side_scores(game):
     s = GameScreen(game)
-    assert s.left_score == 0
-    assert s.right_score == 0
-    ball = [obj for obj in s.game_objects if isinstance(obj, Ball)][0]
+    assert s.match.left_score == 0
+    assert s.match.right_score == 0
+    ball = [obj for obj in s.match.game_objects if isinstance(obj, Ball)][0]
     # Remove paddles
-    s.game_objects.clear()
-    s.game_objects.append(ball)
+    s.match.game_objects.clear()
+    s.match.game_objects.append(ball)
     ball.direction = 0
     for i in range(100):
         s.update(0.01)
-    assert s.left_score == 1
-    assert s.right_score == 0
+    assert s.match.left_score == 1
+    assert s.match.right_score == 0
+    s.on_draw()
+    assert s.left_score_counter.value == 1
 
 
 def test_right_side_scores(game):
     s = GameScreen(game)
-    assert s.left_score == 0
-    assert s.right_score == 0
-    ball = [obj for obj in s.game_objects if isinstance(obj, Ball)][0]
+    assert s.match.left_score == 0
+    assert s.match.right_score == 0
+    ball = [obj for obj in s.match.game_objects if isinstance(obj, Ball)][0]
     # Remove paddles
-    s.game_objects.clear()
-    s.game_objects.append(ball)
+    s.match.game_objects.clear()
+    s.match.game_objects.append(ball)
     ball.direction = math.pi
     for i in range(100):
         s.update(0.01)
-    assert s.left_score == 0
-    assert s.right_score == 1
+    assert s.match.left_score == 0
+    assert s.match.right_score == 1
+    s.on_draw()
+    assert s.right_score_counter.value == 1
 
 
 def test_collision_handling(game):
     s = GameScreen(game)
-    ball = [obj for obj in s.game_objects if isinstance(obj, Ball)][0]
+    ball = [obj for obj in s.match.game_objects if isinstance(obj, Ball)][0]
     # Should hit right-side paddle
     ball.direction = 0
     for i in range(100):
         s.update(0.01)
     assert ball.direction == math.pi
+
+
+def test_game_screen_interpolates_sprites(game):
+    s = GameScreen(game)
+    game.set_screen(s)
+    ball = s.match.ball
+    sprite = s.sprites[0][1]
+    start_x = ball.x
+    s.update(0.01)
+    game.timestep.accumulator = game.timestep.step / 2
+    s.on_draw()
+    assert sprite.x == pytest.approx((start_x + ball.x) / 2)
+
+
+def test_game_tick_runs_fixed_steps(game):
+    s = GameScreen(game)
+    game.set_screen(s)
+    start_x = s.match.ball.x
+    game.tick(0.025)
+    assert game.timestep.accumulator == pytest.approx(0.005)
+    assert s.match.ball.x == pytest.approx(start_x + 2 * 5 * math.cos(math.pi / 4))
+
+
+def test_sprites_only_move_when_drawn(game):
+    s = GameScreen(game)
+    with mock.patch.object(Sprite, "position", new_callable=mock.PropertyMock) as pos:
+        for _ in range(10):
+            s.update(0.01)
+        assert pos.call_count == 0
+        # Only the ball moved; walls and idle paddles are skipped
+        s.on_draw()
+        assert pos.call_count == 1
+    assert [obj for obj, _ in s.moving] == s.match.game_objects[:3]
+
+
+def test_screens_are_pooled(game):
+    game.asset_manager.finish()
+    game.show(TitleScreen)
+    title = game.screen
+    game.show(GameScreen)
+    match_screen = game.screen
+    match_screen.match.left_score = 3
+    game.show(TitleScreen)
+    assert game.screen is title
+    game.show(GameScreen)
+    assert game.screen is match_screen
+    # A new match was started
+    assert match_screen.match.left_score == 0
+
+
+def test_title_screen_prewarms_game_screen(game):
+    game.asset_manager.finish()
+    game.show(TitleScreen)
+    game.screen.update(0.01)
+    game.screen.update(0.01)
+    assert GameScreen not in game.screens
+    assert game.prewarming == {GameScreen}
+    clock.tick()
+    assert isinstance(game.screens[GameScreen], GameScreen)
+    assert not game.prewarming
+    game.prewarm(GameScreen)
+    assert not game.prewarming
+
+
+def test_game_stops_ticking_while_title_screen_is_static(game):
+    game.asset_manager.finish()
+    game.show(TitleScreen)
+    assert game.ticking
+    assert not game.screen.static
+    game.tick(0.01)
+    clock.tick()
+    assert game.screen.static
+    game.tick(0.01)
+    assert not game.ticking
+    game.window._allow_dispatch_event = True
+    game.window.dispatch_event("on_key_press", key.SPACE, 0)
+    assert isinstance(game.screen, GameScreen)
+    assert game.ticking
+
+
+def test_game_screen_pauses(game):
+    game.show(GameScreen)
+    s = game.screen
+    game.window._allow_dispatch_event = True
+    game.window.dispatch_event("on_key_press", key.P, 0)
+    assert s.paused
+    assert s.paused_label.visible
+    assert s.static
+    game.tick(0.01)
+    assert not game.ticking
+    ball = s.match.ball
+    position = ball.x, ball.y
+    s.update(0.01)
+    assert (ball.x, ball.y) == position
+    game.window.dispatch_event("on_key_release", key.P, 0)
+    assert s.paused
+    game.window.dispatch_event("on_key_press", key.P, 0)
+    assert not s.paused
+    assert game.ticking
+    s.update(0.01)
+    assert (ball.x, ball.y) != position
+    # A new match is never paused
+    s.pause(True)
+    game.show(GameScreen)
+    assert not s.paused
+
+
+def test_screens_are_not_static_by_default(game):
+    class Blank(Screen):
+        def update(self, _):
+            pass
+
+    s = Blank(game)
+    s.on_key_press(key.P)
+    s.on_key_release(key.P)
+    s.update(0.01)
+    assert not s.static
+
+
+def test_key_events_apply_in_their_step(game):
+    game.show(GameScreen)
+    paddle = game.screen.match.paddles[0]
+    start = paddle.y
+    now = [1.015]
+    game.clock = lambda: now[0]
+    game.window._allow_dispatch_event = True
+    game.window.dispatch_event("on_key_press", key.W, 0)
+    now[0] = 1.025
+    game.window.dispatch_event("on_key_release", key.W, 0)
+    # Steps cover up to 1.01 and 1.02, and the last one up to now
+    now[0] = 1.035
+    game.tick(0.035)
+    assert paddle.y == start + paddle.speed
+
+
+def test_four_player_game_screen():
+    game = Pong(Window(visible=False), players=4)
+    game.load()
+    game.show(GameScreen)
+    assert len(game.screen.match.paddles) == 4
+    game.window._allow_dispatch_event = True
+    game.window.dispatch_event("on_key_press", key.I, 0)
+    game.tick(0.01)
+    assert game.controllers[3].player_up
+
+
+def test_game_screen_follows_window_size(game):
+    game.asset_manager.finish()
+    game.show(GameScreen)
+    s = game.screen
+    ball, sprite = s.sprites[0]
+    game.window._allow_dispatch_event = True
+    # Twice as large, with bars along the sides
+    game.window.dispatch_event("on_resize", 1480, 960)
+    assert (game.viewport.scale, game.viewport.x, game.viewport.y) == (2.0, 100, 0)
+    assert sprite.image.width == 2 * ball.width
+    assert sprite.position == (100 + 2 * ball.x, 2 * ball.y)
+    s.update(0.01)
+    s.sync(1.0)
+    assert sprite.x == 100 + 2 * ball.x
+    # The play area is not affected
+    assert (s.match.width, s.match.height) == (640, 480)
+    assert s.paused_label.font_size == 72
+    assert s.left_score_counter.x == 2 * (320 - 40) + 100
+
+
+def test_title_screen_follows_window_size(game):
+    game.show(TitleScreen)
+    game.window._allow_dispatch_event = True
+    game.window.dispatch_event("on_resize", 320, 480)
+    assert game.viewport.scale == 0.5
+    assert game.screen.title_label.font_size == 18
+    assert game.screen.title_label.y == 120 + 120
+    game.toggle_profiler()
+    game.window.dispatch_event("on_resize", 640, 480)
+    assert game.profiler_overlay.label.y == 470
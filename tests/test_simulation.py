@@ -0,0 +1,134 @@
+import math
+import subprocess
+import sys
+
+import pytest
+from pong.controller import Controller
+from pong.game_objects import Ball, Paddle, Wall
+from pong.simulation import Match, paddle_x
+
+
+@pytest.fixture(scope="function")
+def match():
+    return Match(1024, 768, [Controller(0, 1), Controller(2, 3)])
+
+
+def test_simulation_does_not_import_pyglet():
+    code = "import sys, pong.simulation; assert 'pyglet' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_match_construction(match):
+    assert isinstance(match.game_objects[0], Ball)
+    assert [type(obj) for obj in match.game_objects[1:]] == [
+        Paddle,
+        Paddle,
+        Wall,
+        Wall,
+    ]
+    assert (match.ball.x, match.ball.y) == (512, 384)
+
+
+def test_match_scores_and_resets(match):
+    match.ball.direction = math.pi
+    match.game_objects[:] = [match.ball]
+    for _ in range(200):
+        match.update()
+    assert match.right_score >= 1
+    assert match.left_score == 0
+
+
+def test_match_paddle_bounce(match):
+    match.ball.direction = 0
+    for _ in range(100):
+        match.update()
+    assert match.ball.direction == math.pi
+    assert match.left_score == match.right_score == 0
+
+
+def test_continuous_match_with_many_objects():
+    match = Match(1024, 768, [Controller(0, 1), Controller(2, 3)], continuous=True)
+    # Enough obstacles for the broadphase to hash them, and a ball fast enough to
+    # cross most of the play area in a tick
+    match.game_objects += [Wall(x, 300, 10, 10) for x in range(0, 300, 10)]
+    ball = match.ball
+    ball.direction = 0
+    ball.speed = 500
+    match.update()
+    assert ball.direction == math.pi
+    assert ball.x < match.paddles[1].x
+
+
+def test_paddle_stops_at_wall(match):
+    paddle = match.game_objects[1]
+    paddle.controller.player_up = True
+    for _ in range(100):
+        match.update()
+    top_wall = match.game_objects[3]
+    assert paddle.y + paddle.height <= top_wall.y + paddle.speed
+
+
+def test_match_restart(match):
+    paddle = match.game_objects[1]
+    paddle.controller.player_up = True
+    match.ball.direction = math.pi
+    for _ in range(200):
+        match.update()
+    assert match.right_score > 0
+    assert paddle.y != paddle.start_y
+    match.restart()
+    assert match.left_score == match.right_score == 0
+    assert paddle.y == paddle.start_y
+    assert (match.ball.x, match.ball.y) == (match.ball.start_x, match.ball.start_y)
+
+
+def test_snapshot_and_restore(match):
+    match.controllers[0].player_up = True
+    match.controllers[1].player_down = True
+    for _ in range(50):
+        match.update()
+    snapshot = match.snapshot()
+    assert len(snapshot) == match.snapshot_size
+    saved = [(obj.x, obj.y) for obj in match.game_objects], match.ball.speed
+
+    match.controllers[0].player_up = False
+    match.controllers[1].player_down = False
+    match.left_score = 3
+    for _ in range(50):
+        match.update()
+
+    match.restore(snapshot)
+    assert ([(obj.x, obj.y) for obj in match.game_objects], match.ball.speed) == saved
+    assert match.left_score == 0
+    assert match.controllers[0].player_up
+    assert not match.controllers[0].player_down
+    assert match.controllers[1].player_down
+    assert isinstance(match.ball.speed, int)
+
+
+def test_restore_without_controls(match):
+    snapshot = match.snapshot()
+    match.controllers[0].player_up = True
+    match.restore(snapshot, controls=False)
+    assert match.controllers[0].player_up
+
+
+def test_four_player_match():
+    controllers = [Controller(0, 0) for _ in range(4)]
+    match = Match(1024, 768, controllers)
+    assert [paddle.controller for paddle in match.paddles] == controllers
+    assert [paddle.x for paddle in match.paddles] == [20, 979, 190, 809]
+    assert paddle_x(1024, 1, 2) == 979
+    # The forward paddle on the right sends the ball back before the goal paddle
+    match.ball.direction = 0
+    for _ in range(60):
+        match.update()
+    assert match.ball.x < 809
+    assert math.cos(match.ball.direction) < 0
+
+    controllers[3].player_up = True
+    match.update()
+    restored = Match(1024, 768, [Controller(0, 0) for _ in range(4)])
+    restored.restore(match.snapshot())
+    assert [p.y for p in restored.paddles] == [p.y for p in match.paddles]
+    assert restored.controllers[3].player_up
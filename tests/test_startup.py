@@ -16,11 +16,11 @@ def game():
     return game
 
 
-@mock.patch("pong.main.Window")
-@mock.patch("pong.main.run", new=MagicMock())
+@mock.patch("pyglet.window.Window")
+@mock.patch("pyglet.app.run", new=MagicMock())
 def test_game_startup(window_mock):
     window_mock.return_value = Window(visible=False)
-    main()
+    main([])
 
 
 def test_game_exit(game: Pong):
@@ -34,9 +34,66 @@ def test_controllers(game: Pong):
     game.window._allow_dispatch_event = True
     game.window.dispatch_event("on_key_press", key.UP, 0)
     game.window.dispatch_event("on_key_press", key.DOWN, 0)
+    # Key events are only applied by the next simulation step
+    assert not game.controllers[1].player_up
+    game.tick(0.01)
     assert game.controllers[1].player_up
     assert game.controllers[1].player_down
     game.window.dispatch_event("on_key_release", key.UP, 0)
     game.window.dispatch_event("on_key_release", key.DOWN, 0)
+    game.tick(0.01)
     assert not game.controllers[1].player_up
     assert not game.controllers[1].player_down
+
+
+@mock.patch("pyglet.window.Window")
+@mock.patch("pyglet.app.run", new=MagicMock())
+def test_four_player_startup(window_mock):
+    window_mock.return_value = Window(visible=False)
+    with mock.patch("pong.game.Pong") as pong_mock:
+        pong_mock.return_value.replay = None
+        pong_mock.return_value.transport = None
+        main(["--players", "4"])
+    pong_mock.assert_called_with(
+        window_mock.return_value, players=4, width=1024, height=768
+    )
+
+
+def test_network_play_needs_two_players():
+    with pytest.raises(SystemExit):
+        main(["--listen", "0", "--peer", "a:1", "--players", "4"])
+
+
+@mock.patch("pyglet.window.Window")
+@mock.patch("pyglet.app.run", new=MagicMock())
+def test_window_options(window_mock):
+    window_mock.return_value = Window(visible=False)
+    main(["--window", "1280x720", "--fullscreen"])
+    window_mock.assert_called_with(
+        width=1280, height=720, resizable=True, fullscreen=True
+    )
+
+
+@pytest.mark.parametrize("size", ["1280", "axb", "0x720"])
+def test_window_size_errors(size):
+    with pytest.raises(SystemExit):
+        main(["--window", size])
+
+
+def test_fullscreen_toggle(game: Pong):
+    game.window._allow_dispatch_event = True
+    with mock.patch.object(game.window, "set_fullscreen") as set_fullscreen:
+        game.window.dispatch_event("on_key_press", key.F11, 0)
+    set_fullscreen.assert_called_with(True)
+
+
+@mock.patch("pyglet.window.Window")
+@mock.patch("pyglet.app.run", new=MagicMock())
+def test_startup_report_option(window_mock):
+    window_mock.return_value = Window(visible=False)
+    with mock.patch("pong.game.Pong") as pong_mock:
+        pong_mock.return_value.replay = None
+        pong_mock.return_value.transport = None
+        main(["--startup-report"])
+    phases = [phase for phase, _ in pong_mock.return_value.startup.phases]
+    assert phases[1:] == ["interpreter", "imports", "window", "load", "first screen"]
@@ -0,0 +1,238 @@
+import gzip
+import math
+import threading
+import time
+from unittest import mock
+from unittest.mock import MagicMock
+
+from pyglet.window import Window
+
+import pytest
+from pong.game import Pong
+from pong.game_screen import GameScreen
+from pong.main import main
+from pong.telemetry import Telemetry, load
+
+
+class BlockedTelemetry(Telemetry):
+    """Telemetry whose writer waits to be released before writing anything."""
+
+    def __init__(self, *args, **kwargs):
+        self.release = threading.Event()
+        super().__init__(*args, **kwargs)
+
+    def _write(self, batch):
+        self.release.wait()
+        super()._write(batch)
+
+
+def test_events_round_trip(tmp_path):
+    path = str(tmp_path / "events.jsonl.gz")
+    telemetry = Telemetry(path, batch_size=3, flush_interval=0.01)
+    for i in range(10):
+        telemetry.emit("hit", tick=i, speed=5 + i)
+    telemetry.close()
+    events = load(path)
+    assert [event["tick"] for event in events] == list(range(10))
+    assert all(event["event"] == "hit" for event in events)
+    assert events[3]["speed"] == 8
+    assert events[0]["time"] <= events[-1]["time"]
+    # Every batch is a gzip member, and the whole file is still a gzip file
+    with gzip.open(path, "rt") as file:
+        assert len(file.readlines()) == 10
+    # Appends to the file, rather than replacing it
+    telemetry = Telemetry(path)
+    telemetry.emit("reset", tick=0)
+    telemetry.close()
+    assert len(load(path)) == 11
+
+
+def test_partial_batch_written_after_interval(tmp_path):
+    path = str(tmp_path / "events.jsonl.gz")
+    telemetry = Telemetry(path, flush_interval=0.01)
+    telemetry.emit("hit", tick=0)
+    # Written without waiting for the batch to fill up, or for close
+    while not load(path):
+        time.sleep(0.01)
+    telemetry.close()
+    assert len(load(path)) == 1
+
+
+def test_full_queue_drops_events(tmp_path):
+    path = str(tmp_path / "events.jsonl.gz")
+    telemetry = BlockedTelemetry(path, queue_size=2, batch_size=1)
+    telemetry.emit("hit", tick=0)
+    # The writer takes the first event off the queue, then waits to write it
+    while not telemetry.queue.empty():
+        pass
+    for i in range(1, 11):
+        telemetry.emit("hit", tick=i)
+    assert telemetry.dropped == 8
+    telemetry.release.set()
+    while not telemetry.queue.empty():
+        pass
+    telemetry.emit("hit", tick=11)
+    telemetry.close()
+    events = load(path)
+    assert [event["tick"] for event in events if event["event"] == "hit"] == [
+        0,
+        1,
+        2,
+        11,
+    ]
+    assert [event["count"] for event in events if event["event"] == "dropped"] == [8]
+
+
+def test_rotation(tmp_path):
+    path = str(tmp_path / "events.jsonl.gz")
+    telemetry = Telemetry(path, batch_size=1, max_bytes=1, backups=2)
+    for i in range(4):
+        telemetry.emit("hit", tick=i)
+    telemetry.close()
+    # Each batch fills a file, and only two backups are kept
+    assert load(path) == []
+    assert load(f"{path}.1")[0]["tick"] == 3
+    assert load(f"{path}.2")[0]["tick"] == 2
+    assert not (tmp_path / "events.jsonl.gz.3").exists()
+
+
+def test_load_stops_at_damaged_batch(tmp_path):
+    path = tmp_path / "events.jsonl.gz"
+    telemetry = Telemetry(str(path), batch_size=2)
+    for i in range(4):
+        telemetry.emit("hit", tick=i)
+    telemetry.close()
+    data = path.read_bytes()
+    path.write_bytes(data[:-5])
+    assert [event["tick"] for event in load(str(path))] == [0, 1]
+    path.write_bytes(data + b"not gzip")
+    assert len(load(str(path))) == 4
+
+
+def test_write_errors_are_counted(tmp_path):
+    telemetry = Telemetry(str(tmp_path / "events.jsonl.gz"), batch_size=2)
+    with mock.patch.object(telemetry.file, "write", side_effect=OSError):
+        telemetry.emit("hit", tick=0)
+        telemetry.emit("hit", tick=1)
+        telemetry.close()
+    assert telemetry.failed == 2
+
+
+def test_writer_survives_bad_events(tmp_path):
+    path = str(tmp_path / "events.jsonl.gz")
+    telemetry = Telemetry(path, batch_size=1)
+    telemetry.emit("hit", tick=object())
+    telemetry.emit("hit", tick=1)
+    telemetry.close()
+    assert telemetry.failed == 1
+    assert [event["tick"] for event in load(path)] == [1]
+
+
+def test_writer_survives_failed_rotation(tmp_path):
+    path = str(tmp_path / "events.jsonl.gz")
+    telemetry = Telemetry(path, batch_size=1, max_bytes=1)
+    with mock.patch("pong.telemetry.open", side_effect=OSError, create=True):
+        telemetry.emit("hit", tick=0)
+        while not telemetry.file.closed:
+            time.sleep(0.01)
+    # The next batch opens the file again, and rotates as usual
+    telemetry.emit("hit", tick=1)
+    telemetry.close()
+    assert not telemetry.failed
+    assert load(f"{path}.2")[0]["tick"] == 0
+    assert load(f"{path}.1")[0]["tick"] == 1
+
+
+def test_close_does_not_hang(tmp_path):
+    path = str(tmp_path / "events.jsonl.gz")
+    # A writer stuck writing, with the queue full behind it
+    telemetry = BlockedTelemetry(path, queue_size=1, batch_size=1)
+    telemetry.emit("hit", tick=0)
+    while not telemetry.queue.empty():
+        pass
+    telemetry.emit("hit", tick=1)
+    telemetry.close(timeout=0.05)
+    assert telemetry.thread.is_alive()
+    assert not telemetry.file.closed
+    # Once unstuck, it can still be closed
+    telemetry.release.set()
+    telemetry.close()
+    assert telemetry.file.closed
+    assert len(load(path)) == 2
+
+    # A writer that is no longer running
+    with mock.patch.object(Telemetry, "_run"):
+        telemetry = Telemetry(path, queue_size=1)
+    telemetry.thread.join()
+    telemetry.emit("hit", tick=2)
+    telemetry.close()
+    assert telemetry.file.closed
+
+
+@pytest.fixture(scope="function")
+def game(tmp_path):
+    game = Pong(Window(visible=False), width=640, height=480)
+    game.load()
+    game.telemetry = Telemetry(str(tmp_path / "events.jsonl.gz"))
+    return game
+
+
+def test_game_screen_emits_events(game):
+    game.show(GameScreen)
+    s = game.screen
+    ball = s.match.ball
+    # Straight at the right paddle, then bouncing off the top wall back to the left
+    ball.direction = 0
+    while ball.direction == 0:
+        s.update(0.01)
+    ball.direction = 3 * math.pi / 4
+    while math.sin(ball.direction) > 0:
+        s.update(0.01)
+    # Past the left paddle
+    s.match.game_objects[:] = [ball]
+    while s.match.right_score == 0:
+        s.update(0.01)
+    game.telemetry.close()
+
+    events = load(game.telemetry.path)
+    kinds = [event["event"] for event in events]
+    assert kinds == ["reset", "hit", "bounce", "point", "rally", "reset"]
+    hit, bounce, point, rally = events[1:5]
+    assert hit["side"] == "right"
+    assert hit["speed"] == 6
+    assert hit["direction"] == pytest.approx(math.pi)
+    assert bounce["speed"] == 6
+    assert bounce["direction"] == pytest.approx(-3 * math.pi / 4)
+    assert point["side"] == "right"
+    assert (point["left_score"], point["right_score"]) == (0, 1)
+    assert rally["hits"] == 1
+    assert hit["tick"] < bounce["tick"] < point["tick"] == rally["tick"]
+
+
+def test_game_screen_counts_bounces_within_a_tick(game):
+    game.show(GameScreen)
+    s = game.screen
+    s.match.continuous = True
+    ball = s.match.ball
+    s.match.game_objects[:] = [ball, *s.match.game_objects[-2:]]
+    # Down off the bottom wall, all the way up off the top one, and back down again
+    ball.y = 100
+    ball.direction = -math.pi / 2 + 0.01
+    ball.speed = 900
+    s.update(0.01)
+    game.telemetry.close()
+
+    events = load(game.telemetry.path)
+    assert [event["event"] for event in events] == ["reset", "bounce", "bounce"]
+    assert math.sin(events[-1]["direction"]) < 0
+
+
+@mock.patch("pyglet.window.Window")
+@mock.patch("pyglet.app.run", new=MagicMock())
+def test_telemetry_option(window_mock, tmp_path):
+    window_mock.return_value = Window(visible=False)
+    path = str(tmp_path / "events.jsonl.gz")
+    with mock.patch("pong.telemetry.Telemetry") as telemetry_mock:
+        main(["--telemetry", path])
+    telemetry_mock.assert_called_with(path)
+    telemetry_mock.return_value.close.assert_called_once()
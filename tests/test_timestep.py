@@ -0,0 +1,25 @@
+import pytest
+from pong.timestep import FixedTimestep
+
+
+def test_whole_steps_are_run():
+    timestep = FixedTimestep(0.01)
+    assert timestep.advance(0.005) == 0
+    assert timestep.alpha == pytest.approx(0.5)
+    assert timestep.advance(0.016) == 2
+    assert timestep.alpha == pytest.approx(0.1)
+
+
+def test_catch_up_is_capped():
+    timestep = FixedTimestep(0.01, max_steps=5)
+    assert timestep.advance(1.0) == 5
+    assert 0 <= timestep.alpha < 1
+    assert timestep.advance(0.01) == 1
+
+
+def test_steps_are_independent_of_frame_rate():
+    slow = FixedTimestep(0.01)
+    fast = FixedTimestep(0.01)
+    slow_steps = sum(slow.advance(1 / 30) for _ in range(30))
+    fast_steps = sum(fast.advance(1 / 144) for _ in range(144))
+    assert abs(slow_steps - fast_steps) <= 1
@@ -0,0 +1,284 @@
+import json
+import subprocess
+import sys
+import zlib
+
+import pytest
+from pong import main as pong_main
+from pong import tournament
+from pong.ai import ComputerController
+from pong.controller import Controller
+from pong.tournament import PLAYERS, Game, elo, load, play, player, score, summary
+
+
+def stubborn(seed):
+    return Controller(0, 0)
+
+
+def result(round, left, right, left_score, right_score):
+    game = Game(round, left, right)
+    return {
+        "id": game.id,
+        "round": round,
+        "left": left,
+        "right": right,
+        "left_score": left_score,
+        "right_score": right_score,
+        "ticks": 100,
+        "rallies": [3] * (left_score + right_score),
+    }
+
+
+def test_player_lookup():
+    assert player("normal")(3) == ComputerController(
+        reaction_ticks=10, error=20, seed=3
+    )
+    assert player("tests.test_tournament:stubborn")(0) == Controller(0, 0)
+    with pytest.raises(ValueError):
+        player("nobody")
+    with pytest.raises(AttributeError):
+        player("tests.test_tournament:nobody")
+
+
+def test_game_id_and_seed():
+    game = Game(2, "easy", "hard")
+    assert game.id == "2:easy:hard"
+    assert game.seed == zlib.crc32(b"2:easy:hard")
+
+
+def test_play_to_points():
+    outcome = play(Game(1, "perfect", "idle"), points=2, max_ticks=100000)
+    assert (outcome["left_score"], outcome["right_score"]) == (2, 0)
+    assert outcome["rallies"] == [0, 0]
+    # The same game always plays out the same way
+    assert play(Game(1, "perfect", "idle"), points=2, max_ticks=100000) == outcome
+
+
+def test_play_counts_rallies():
+    outcome = play(Game(1, "idle", "easy"), points=1, max_ticks=100000)
+    # The ball is hit 22 times before the easy player misses it
+    assert outcome["left_score"] == 1
+    assert outcome["rallies"] == [22]
+
+
+def test_play_stops_at_max_ticks():
+    outcome = play(Game(1, "perfect", "perfect"), points=5, max_ticks=10)
+    assert outcome["ticks"] == 10
+    assert outcome["rallies"] == []
+    assert score(outcome, "perfect") == 0.5
+
+
+def test_score():
+    won = result(1, "a", "b", 3, 1)
+    assert (score(won, "a"), score(won, "b")) == (1.0, 0.0)
+    lost = result(1, "a", "b", 0, 2)
+    assert (score(lost, "a"), score(lost, "b")) == (0.0, 1.0)
+
+
+def test_round_robin():
+    games = tournament.round_robin(["a", "b", "c"], 2)
+    assert [game.id for game in games] == [
+        "1:a:b",
+        "1:a:c",
+        "1:b:c",
+        "2:b:a",
+        "2:c:a",
+        "2:c:b",
+    ]
+
+
+def test_swiss_pairs_by_score():
+    players = ["a", "b", "c", "d"]
+    assert tournament.swiss_round(players, 1, {}) == [
+        Game(1, "a", "b"),
+        Game(1, "c", "d"),
+    ]
+    results = {
+        r["id"]: r for r in (result(1, "a", "b", 0, 1), result(1, "c", "d", 0, 1))
+    }
+    # Winners meet winners, and sides are swapped each round
+    assert tournament.swiss_round(players, 2, results) == [
+        Game(2, "d", "b"),
+        Game(2, "c", "a"),
+    ]
+    # Later rounds are ignored
+    assert tournament.swiss_round(players, 1, results) == tournament.swiss_round(
+        players, 1, {}
+    )
+
+
+def test_swiss_avoids_rematches():
+    players = ["a", "b", "c", "d"]
+    results = {
+        r["id"]: r
+        for r in (
+            result(1, "a", "b", 1, 0),
+            result(1, "c", "d", 1, 0),
+            result(2, "c", "a", 1, 0),
+            result(2, "d", "b", 1, 0),
+        )
+    }
+    # c leads, and a is next, ahead of d by the order given, but they have met
+    assert tournament.swiss_round(players, 3, results) == [
+        Game(3, "c", "b"),
+        Game(3, "a", "d"),
+    ]
+
+
+def test_swiss_byes():
+    players = ["a", "b", "c"]
+    assert tournament.swiss_round(players, 1, {}) == [Game(1, "a", "b")]
+    results = {r["id"]: r for r in (result(1, "a", "b", 1, 0),)}
+    # c sat out the first round, so b, now ranked last, sits out the second
+    assert tournament.swiss_round(players, 2, results) == [Game(2, "c", "a")]
+
+
+def test_run_tournament_and_resume(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    players = ["perfect", "idle", "tests.test_tournament:stubborn"]
+    results = tournament.run_tournament(players, path, rounds=1, points=1, workers=2)
+    assert [r["id"] for r in results] == [
+        g.id for g in tournament.round_robin(players, 1)
+    ]
+    with open(path) as file:
+        first = file.read()
+    # The settings, then a line per game
+    assert len(first.splitlines()) == 4
+    settings = json.loads(first.splitlines()[0])["settings"]
+    assert settings == {
+        "players": players,
+        "format": "round-robin",
+        "rounds": 1,
+        "points": 1,
+        "max_ticks": 100000,
+    }
+
+    # An unfinished line, as left by an interrupted run, is discarded
+    with open(path, "a") as file:
+        file.write('{"id": "2:idle:perfect", "ro')
+    assert len(load(path, settings)) == 3
+
+    results = tournament.run_tournament(players, path, rounds=2, points=1, workers=2)
+    assert len(results) == 6
+    with open(path) as file:
+        lines = file.read()
+    assert lines.startswith(first)
+    assert len(lines.splitlines()) == 7
+    assert sorted(json.loads(line)["id"] for line in lines.splitlines()[1:]) == sorted(
+        r["id"] for r in results
+    )
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"points": 5},
+        {"max_ticks": 10},
+        {"system": "swiss"},
+        {"players": ["perfect", "easy"]},
+    ],
+)
+def test_resume_needs_same_settings(tmp_path, changes):
+    path = str(tmp_path / "results.jsonl")
+    settings = {"players": ["perfect", "idle"], "points": 1, "workers": 1}
+    tournament.run_tournament(path=path, **settings)
+    with open(path) as file:
+        written = file.read()
+    with pytest.raises(ValueError):
+        tournament.run_tournament(path=path, **{**settings, **changes})
+    with open(path) as file:
+        assert file.read() == written
+
+
+def test_load_checks_file(tmp_path):
+    path = tmp_path / "results.jsonl"
+    settings = {"players": ["easy", "hard"], "format": "swiss", "rounds": 3}
+    path.write_text("")
+    assert load(str(path), settings) == {}
+    # Files without settings are not resumed from
+    path.write_text(json.dumps(result(1, "easy", "hard", 1, 0)) + "\n")
+    with pytest.raises(ValueError):
+        load(str(path), settings)
+    # Results of other players are left out, so that they cannot be paired
+    lines = [{"settings": {**settings, "rounds": 1}}]
+    lines += [result(1, "easy", "hard", 1, 0), result(1, "easy", "idle", 1, 0)]
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines))
+    assert list(load(str(path), settings)) == ["1:easy:hard"]
+    assert tournament.swiss_round(settings["players"], 2, load(str(path), settings))
+
+
+def test_run_swiss_tournament(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    players = ["perfect", "easy", "idle", "tests.test_tournament:stubborn"]
+    results = tournament.run_tournament(
+        players, path, system="swiss", rounds=2, points=1, workers=2
+    )
+    assert [r["round"] for r in results] == [1, 1, 2, 2]
+    # The players that won the first round meet in the second
+    winners = {r["left"] if score(r, r["left"]) else r["right"] for r in results[:2]}
+    assert {results[2]["left"], results[2]["right"]} == winners
+
+
+def test_elo():
+    ratings = elo(["a", "b"], [result(1, "a", "b", 1, 0)])
+    assert ratings == {"a": 1516.0, "b": 1484.0}
+    ratings = elo(["a", "b"], [result(1, "a", "b", 1, 0), result(2, "b", "a", 1, 1)])
+    assert ratings["a"] == pytest.approx(1516 + 32 * (0.5 - 1 / (1 + 10 ** -0.08)))
+    assert ratings["a"] + ratings["b"] == pytest.approx(3000)
+
+
+def test_summary():
+    results = [result(1, "a", "b", 5, 0), result(2, "b", "c", 1, 1)]
+    results[1]["rallies"] = [0, 200]
+    lines = summary(["a", "b", "c"], results).splitlines()
+    assert lines[1].split() == ["a", "1", "1", "0", "100.0%", "1516"]
+    assert lines[5:] == [
+        "hits per point",
+        "       0       1 ########",
+        "       1       0",
+        "     2-3       5 ########################################",
+        "     4-7       0",
+        "    8-15       0",
+        "   16-31       0",
+        "   32-63       0",
+        "  64-127       0",
+        "    128+       1 ########",
+    ]
+    assert summary(["a", "b"], []).splitlines()[1].split()[-2] == "0.0%"
+
+
+def test_tournament_command(tmp_path, capsys):
+    path = str(tmp_path / "results.jsonl")
+    pong_main.main(
+        ["tournament", "perfect", "idle", "--points", "1", "--rounds", "1"]
+        + ["--results", path, "--workers", "1"]
+    )
+    output = capsys.readouterr().out
+    assert output.splitlines()[1].split()[:3] == ["perfect", "1", "1"]
+    assert "hits per point" in output
+
+
+def test_tournament_command_refuses_other_settings(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    arguments = ["tournament", "perfect", "idle", "--rounds", "1", "--workers", "1"]
+    pong_main.main(arguments + ["--points", "1", "--results", path])
+    with pytest.raises(SystemExit, match="other points"):
+        pong_main.main(arguments + ["--points", "5", "--results", path])
+
+
+@pytest.mark.parametrize(
+    "players", [["idle"], ["idle", "idle"], ["idle", "nobody"], ["idle", "pong:x"]]
+)
+def test_tournament_command_errors(players):
+    with pytest.raises(SystemExit):
+        pong_main.main(["tournament"] + players)
+
+
+def test_tournament_does_not_import_pyglet():
+    code = "import sys, pong.main; assert 'pyglet' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_players_are_controllers():
+    for factory in PLAYERS.values():
+        assert isinstance(factory(0), Controller)
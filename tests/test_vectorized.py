@@ -0,0 +1,75 @@
+import math
+import random
+
+import numpy as np
+
+import pytest
+from pong.controller import Controller
+from pong.simulation import Match
+from pong.vectorized import MatchBatch
+
+WIDTH = 1024
+HEIGHT = 768
+
+
+def scalar_matches(count):
+    return [
+        Match(WIDTH, HEIGHT, [Controller(0, 1), Controller(2, 3)], continuous=False)
+        for _ in range(count)
+    ]
+
+
+def assert_equivalent(batch, matches):
+    for i, match in enumerate(matches):
+        ball = match.ball
+        assert batch.ball_x[i] == pytest.approx(ball.x, abs=1e-9)
+        assert batch.ball_y[i] == pytest.approx(ball.y, abs=1e-9)
+        assert batch.ball_speed[i] == ball.speed
+        assert batch.ball_direction[i] == ball.direction
+        assert list(batch.paddle_y[i]) == [obj.y for obj in match.game_objects[1:3]]
+        assert batch.left_score[i] == match.left_score
+        assert batch.right_score[i] == match.right_score
+
+
+def test_batch_construction():
+    batch = MatchBatch(3, WIDTH, HEIGHT)
+    assert_equivalent(batch, scalar_matches(3))
+
+
+def test_batch_matches_scalar_rules_tick_for_tick():
+    rng = random.Random(1234)
+    count = 16
+    batch = MatchBatch(count, WIDTH, HEIGHT)
+    matches = scalar_matches(count)
+
+    # Start each match with a different ball trajectory
+    for i, match in enumerate(matches):
+        direction = rng.uniform(-math.pi, math.pi)
+        match.ball.direction = direction
+        batch.ball_direction[i] = direction
+
+    for _ in range(3000):
+        for i, match in enumerate(matches):
+            for side, paddle in enumerate(match.game_objects[1:3]):
+                up = rng.random() < 0.4
+                down = rng.random() < 0.4
+                paddle.controller.player_up = up
+                paddle.controller.player_down = down
+                batch.player_up[i, side] = up
+                batch.player_down[i, side] = down
+            match.update()
+        batch.update()
+        assert_equivalent(batch, matches)
+
+    # The run should have exercised scoring and paddle hits
+    assert batch.left_score.sum() + batch.right_score.sum() > 0
+    assert (batch.ball_speed > 5).any()
+
+
+def test_batch_reset_subset():
+    batch = MatchBatch(2, WIDTH, HEIGHT)
+    for _ in range(10):
+        batch.update()
+    batch.reset(np.array([True, False]))
+    assert batch.ball_x[0] == WIDTH // 2
+    assert batch.ball_x[1] != WIDTH // 2
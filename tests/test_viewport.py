@@ -0,0 +1,23 @@
+from pong.viewport import Viewport
+
+
+def test_fit_same_size():
+    viewport = Viewport(640, 480)
+    assert not viewport.fit(640, 480)
+    assert (viewport.scale, viewport.x, viewport.y) == (1.0, 0, 0)
+    assert viewport.point(10, 20) == (10, 20)
+
+
+def test_fit_letterboxes():
+    viewport = Viewport(640, 480)
+    # Wider than the play area: bars on the left and right
+    assert viewport.fit(1920, 1080)
+    assert (viewport.scale, viewport.x, viewport.y) == (2.25, 240, 0)
+    assert viewport.point(0, 480) == (240, 1080)
+    # Taller than the play area: bars at the top and bottom
+    assert viewport.fit(320, 480)
+    assert (viewport.scale, viewport.x, viewport.y) == (0.5, 0, 120)
+    assert viewport.point(640, 0) == (320, 120)
+    # Only the bars change
+    assert not viewport.fit(320, 500)
+    assert viewport.y == 130